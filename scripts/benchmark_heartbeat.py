@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+import argparse
+import asyncio
+import multiprocessing
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, List, Tuple
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+BENCHMARK_ENV = {
+    "JWT_SECRET": "benchmark-heartbeat-secret-0123456789abcdef",
+    "MCP_SERVER_HOST": "127.0.0.1",
+    "MCP_SERVER_PORT": "18801",
+    "LOG_LEVEL": "WARNING",
+    "CLIENT_CACHE_ENABLED": "false",
+    "LINK_MONITOR_ENABLED": "false",
+    "FILE_INDEX_ENABLED": "false",
+    "DOCUMENT_INDEX_ENABLED": "false",
+    "MCP_METRICS_PORT": "0",
+    "LOG_FILE": os.path.join(tempfile.gettempdir(), "mcp_benchmark_heartbeat.log")
+}
+for key, value in BENCHMARK_ENV.items():
+    os.environ.setdefault(key, value)
+
+import jwt
+
+from src.client.mcp_client import MCPClient
+from src.core.config import settings
+
+Sample = Tuple[float, float]
+
+
+def make_token() -> str:
+    payload = {"client_id": "benchmark-heartbeat", "exp": datetime.utcnow() + timedelta(hours=1)}
+    return jwt.encode(payload, settings.security.jwt_secret, algorithm="HS256")
+
+
+def heartbeat_worker(interval: float, stop, samples):
+    async def run():
+        client = MCPClient("127.0.0.1", settings.mcp.server_port, make_token())
+        if not await client.connect():
+            return
+        try:
+            while not stop.is_set():
+                rtt_ms = await client.pool.primary.measure_rtt()
+                if rtt_ms is not None:
+                    samples.put((time.time(), rtt_ms))
+                await asyncio.sleep(interval)
+        finally:
+            await client.disconnect()
+    
+    asyncio.run(run())
+
+
+def wait_for_port(port: int, timeout: float = 15.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        with socket.socket() as sock:
+            if sock.connect_ex(("127.0.0.1", port)) == 0:
+                return
+        time.sleep(0.1)
+    raise RuntimeError(f"Servidor não respondeu na porta {port}")
+
+
+def record_failures(failures: List[str], name: str, results: List[Any]):
+    for result in results:
+        if isinstance(result, dict) and "error" in result:
+            failures.append(f"{name}: {result['error']}")
+
+
+async def run_load(args, workdir: Path) -> Tuple[List[Tuple[str, float, float]], List[str]]:
+    large = workdir / "large.bin"
+    with open(large, "wb") as f:
+        f.truncate(args.size_mb * 1024 * 1024)
+    text = workdir / "text.txt"
+    text.write_text("linha de texto para leitura\n" * (args.read_mb * 1024 * 1024 // 28))
+    
+    client = MCPClient("127.0.0.1", settings.mcp.server_port, make_token())
+    if not await client.connect():
+        raise RuntimeError("Não foi possível conectar ao servidor")
+    
+    phases = []
+    failures: List[str] = []
+    try:
+        started = time.time()
+        await asyncio.sleep(args.idle)
+        phases.append(("ocioso", started, time.time()))
+        
+        started = time.time()
+        result = await client.download(str(large), str(workdir / "download.bin"))
+        record_failures(failures, "download", [result])
+        phases.append((f"download {args.size_mb} MB", started, time.time()))
+        (workdir / "download.bin").unlink(missing_ok=True)
+        
+        started = time.time()
+        for _ in range(args.reads):
+            result = await client.read_file(str(text))
+            record_failures(failures, "read_file", [result])
+        phases.append((f"read_file {args.read_mb} MB x{args.reads}", started, time.time()))
+        
+        started = time.time()
+        results = await client.batch([("list_files", {"path": str(ROOT), "recursive": True})] * 4)
+        record_failures(failures, "list_files", results)
+        record_failures(failures, "get_system_info", [await client.get_system_info()])
+        phases.append(("list_files + psutil", started, time.time()))
+    finally:
+        await client.disconnect()
+    return phases, failures
+
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mede a latência de heartbeat do servidor MCP durante I/O pesado")
+    parser.add_argument("--size-mb", type=int, default=2048, help="Tamanho do arquivo baixado via stream")
+    parser.add_argument("--read-mb", type=int, default=32, help="Tamanho do arquivo lido com read_file")
+    parser.add_argument("--reads", type=int, default=4)
+    parser.add_argument("--idle", type=float, default=2.0)
+    parser.add_argument("--interval", type=float, default=0.01)
+    parser.add_argument("--budget-ms", type=float, default=5.0, help="p99 máximo de heartbeat sob carga")
+    args = parser.parse_args()
+    
+    server = subprocess.Popen([sys.executable, "-m", "src.server.mcp_server"], cwd=ROOT, env=os.environ.copy())
+    context = multiprocessing.get_context("spawn")
+    stop = context.Event()
+    samples = context.Queue()
+    heartbeat = None
+    try:
+        wait_for_port(settings.mcp.server_port)
+        heartbeat = context.Process(target=heartbeat_worker, args=(args.interval, stop, samples))
+        heartbeat.start()
+        time.sleep(0.5)
+        
+        with tempfile.TemporaryDirectory(prefix="mcp_heartbeat_") as workdir:
+            phases, failures = asyncio.run(run_load(args, Path(workdir)))
+    finally:
+        stop.set()
+        if heartbeat is not None:
+            heartbeat.join(timeout=5)
+        server.terminate()
+        server.wait(timeout=10)
+    
+    collected: List[Sample] = []
+    while not samples.empty():
+        collected.append(samples.get())
+    
+    print(f"{'fase':<28}{'amostras':>9}{'p50 ms':>9}{'p99 ms':>9}{'máx ms':>9}")
+    over_budget = []
+    for name, started, finished in phases:
+        rtts = [rtt for ts, rtt in collected if started <= ts <= finished]
+        if not rtts:
+            print(f"{name:<28}{0:>9}")
+            continue
+        p99 = percentile(rtts, 0.99)
+        print(f"{name:<28}{len(rtts):>9}{percentile(rtts, 0.5):>9.2f}{p99:>9.2f}{max(rtts):>9.2f}")
+        if p99 > args.budget_ms:
+            over_budget.append(name)
+    
+    if failures:
+        print(f"\n{len(failures)} operação(ões) de carga falharam:")
+        for line in failures:
+            print(f"  {line}")
+    if over_budget:
+        print(f"\nHeartbeat p99 acima de {args.budget_ms} ms em: {', '.join(over_budget)}")
+    if failures or over_budget:
+        sys.exit(1)
+    print(f"\nHeartbeat p99 dentro de {args.budget_ms} ms em todas as fases")
+
+if __name__ == "__main__":
+    main()
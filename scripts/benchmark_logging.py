@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+import argparse
+import logging
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from rich.console import Console
+
+import src.utils.logger as logger_module
+from src.utils.logger import RequestLogFilter, setup_logger, stop_logging
+
+MODES = [
+    ("sync", False, False, 0),
+    ("queue", True, False, 0),
+    ("queue-json", True, True, 0),
+    ("queue-rate-100", True, False, 100)
+]
+
+
+def run_mode(name: str, use_queue: bool, json_format: bool, rate: float, calls: int, workdir: Path):
+    log_file = workdir / f"{name}.log"
+    logger = setup_logger(f"benchmark_{name}", "INFO", str(log_file), use_queue=use_queue, json_format=json_format)
+    logger.propagate = False
+    logger.filters.clear()
+    if rate:
+        logger.addFilter(RequestLogFilter(rate, 1.0))
+    
+    durations = []
+    started = time.perf_counter()
+    for i in range(calls):
+        call_started = time.perf_counter()
+        logger.info("Processed tool: get_system_info", extra={
+            "request_id": f"req_{i}",
+            "tool": "get_system_info",
+            "client_id": "127.0.0.1:50000",
+            "duration_ms": 0.25
+        })
+        durations.append((time.perf_counter() - call_started) * 1_000_000)
+    issued = time.perf_counter() - started
+    
+    stop_logging()
+    drained = time.perf_counter() - started
+    for handler in logger.handlers:
+        handler.close()
+    
+    durations.sort()
+    lines = sum(1 for _ in open(log_file)) if log_file.exists() else 0
+    return {
+        "mode": name,
+        "mean_us": statistics.fmean(durations),
+        "p50_us": durations[len(durations) // 2],
+        "p99_us": durations[int(len(durations) * 0.99)],
+        "issue_s": issued,
+        "drain_s": drained,
+        "lines": lines
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mede o custo por requisição do logging no thread chamador")
+    parser.add_argument("--calls", type=int, default=20000)
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as workdir:
+        workdir = Path(workdir)
+        console_output = open(workdir / "console.txt", "w")
+        logger_module.console = Console(file=console_output, width=120, force_terminal=True)
+        
+        results = [run_mode(*mode, args.calls, workdir) for mode in MODES]
+        console_output.close()
+    
+    print(f"{'modo':<16}{'média µs':>10}{'p50 µs':>10}{'p99 µs':>10}{'emissão s':>11}{'total s':>9}{'linhas':>9}")
+    for result in results:
+        print(
+            f"{result['mode']:<16}{result['mean_us']:>10.1f}{result['p50_us']:>10.1f}{result['p99_us']:>10.1f}"
+            f"{result['issue_s']:>11.3f}{result['drain_s']:>9.3f}{result['lines']:>9}"
+        )
+    
+    baseline = results[0]["mean_us"]
+    for result in results[1:]:
+        print(f"{result['mode']}: {baseline / result['mean_us']:.1f}x menos custo no thread chamador que sync")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+BENCHMARK_ENV = {
+    "JWT_SECRET": "benchmark-loopback-secret-0123456789abcdef",
+    "MCP_SERVER_HOST": "127.0.0.1",
+    "MCP_SERVER_PORT": "18800",
+    "LOG_LEVEL": "WARNING",
+    "CLIENT_CACHE_ENABLED": "false",
+    "LINK_MONITOR_ENABLED": "false",
+    "FILE_INDEX_ENABLED": "false",
+    "DOCUMENT_INDEX_ENABLED": "false",
+    "MCP_METRICS_PORT": "0",
+    "LOG_FILE": os.path.join(tempfile.gettempdir(), "mcp_benchmark_loopback.log")
+}
+for key, value in BENCHMARK_ENV.items():
+    os.environ.setdefault(key, value)
+
+from src.client.mcp_client import MCPClient
+from src.core.config import settings
+from src.server.mcp_server import MCPServer
+
+FILE_SIZES = {"1KB": 1024, "64KB": 64 * 1024, "1MB": 1024 * 1024}
+DEFAULT_BASELINE = ROOT / "scripts" / "benchmarks" / "loopback_baseline.json"
+Case = Callable[[MCPClient, int, int], Awaitable[Dict[str, Any]]]
+
+
+def build_fixtures(root: Path) -> Dict[str, Path]:
+    small = root / "tree_small"
+    small.mkdir()
+    for i in range(100):
+        (small / f"file_{i:03d}.txt").write_text(f"small file {i}\n")
+    
+    large = root / "tree_large"
+    for d in range(20):
+        directory = large / f"dir_{d:02d}" / "nested"
+        directory.mkdir(parents=True)
+        for i in range(100):
+            (directory / f"file_{i:03d}.{'py' if i % 4 == 0 else 'txt'}").write_text(
+                f"module {d} file {i}\n" + ("lorem ipsum dolor sit amet\n" * 20)
+            )
+    
+    files = root / "files"
+    files.mkdir()
+    for label, size in FILE_SIZES.items():
+        (files / f"read_{label}.txt").write_text("x" * size)
+    
+    (root / "writes").mkdir()
+    return {"root": root, "small": small, "large": large, "files": files, "writes": root / "writes"}
+
+
+def build_cases(fixtures: Dict[str, Path]) -> Dict[str, Case]:
+    cases: Dict[str, Case] = {
+        "list_files_small": lambda client, c, i: client.list_files(str(fixtures["small"])),
+        "list_files_large_recursive": lambda client, c, i: client.list_files(str(fixtures["large"]), recursive=True),
+        "search_files_glob": lambda client, c, i: client.search_files(str(fixtures["large"]), "*.py"),
+        "search_files_content": lambda client, c, i: client.search_files(
+            str(fixtures["large"]), "*.py", content_search=True, query="module 7"
+        ),
+        "execute_command": lambda client, c, i: client.execute_command("echo ok"),
+    }
+    
+    for label, size in FILE_SIZES.items():
+        read_path = str(fixtures["files"] / f"read_{label}.txt")
+        content = "y" * size
+        cases[f"read_file_{label}"] = lambda client, c, i, path=read_path: client.read_file(path)
+        cases[f"write_file_{label}"] = lambda client, c, i, label=label, content=content: client.write_file(
+            str(fixtures["writes"] / f"write_{label}_{c}_{i % 4}.txt"), content
+        )
+    return cases
+
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+async def run_case(clients: List[MCPClient], case: Case, iterations: int) -> Dict[str, Any]:
+    latencies: List[float] = []
+    errors = 0
+    
+    async def worker(client_index: int, client: MCPClient):
+        nonlocal errors
+        for i in range(iterations):
+            started = time.perf_counter()
+            try:
+                result = await case(client, client_index, i)
+                if isinstance(result, dict) and "error" in result:
+                    errors += 1
+            except Exception:
+                errors += 1
+            latencies.append((time.perf_counter() - started) * 1000)
+    
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(index, client) for index, client in enumerate(clients)))
+    elapsed = time.perf_counter() - started
+    
+    return {
+        "ops": len(latencies),
+        "errors": errors,
+        "throughput_ops": round(len(latencies) / elapsed, 2),
+        "mean_ms": round(statistics.fmean(latencies), 3),
+        "p50_ms": round(percentile(latencies, 0.5), 3),
+        "p99_ms": round(percentile(latencies, 0.99), 3)
+    }
+
+
+def compare(
+    results: Dict[str, Dict[str, Any]],
+    baseline: Dict[str, Dict[str, Any]],
+    threshold: float,
+    tolerances: Dict[str, float]
+) -> List[str]:
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        tolerance = tolerances.get(name, threshold)
+        if current["p50_ms"] > previous["p50_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p50 {previous['p50_ms']} -> {current['p50_ms']} ms (tolerância {tolerance:.0%})")
+    return regressions
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+async def run(args) -> Dict[str, Any]:
+    with tempfile.TemporaryDirectory(prefix="mcp_bench_") as workdir:
+        fixtures = build_fixtures(Path(workdir))
+        cases = build_cases(fixtures)
+        selected = [name for name in cases if not args.only or any(part in name for part in args.only)]
+        
+        server = MCPServer()
+        server_task = asyncio.create_task(server.start())
+        await asyncio.sleep(0.2)
+        
+        token = server.generate_token("benchmark-loopback")
+        clients = [MCPClient("127.0.0.1", settings.mcp.server_port, token) for _ in range(args.clients)]
+        try:
+            for client in clients:
+                if not await client.connect():
+                    raise RuntimeError("Could not connect benchmark client to local server")
+            
+            results = {}
+            for name in selected:
+                await run_case(clients, cases[name], args.warmup)
+                results[name] = await run_case(clients, cases[name], args.iterations)
+                print(
+                    f"{name:<28}{results[name]['throughput_ops']:>12.1f}{results[name]['p50_ms']:>10.2f}"
+                    f"{results[name]['p99_ms']:>10.2f}{results[name]['errors']:>8}"
+                )
+        finally:
+            for client in clients:
+                await client.disconnect()
+            server_task.cancel()
+            await asyncio.gather(server_task, return_exceptions=True)
+    
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "clients": args.clients,
+            "iterations": args.iterations
+        },
+        "results": results
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de loopback do MCPServer/MCPClient")
+    parser.add_argument("--clients", type=int, default=4)
+    parser.add_argument("--iterations", type=int, default=50, help="Chamadas por cliente em cada caso")
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--only", nargs="*", help="Roda apenas casos cujo nome contenha um destes termos")
+    parser.add_argument("--output", default=os.path.join(tempfile.gettempdir(), "mcp_benchmark_loopback.json"))
+    parser.add_argument(
+        "--baseline",
+        default=str(DEFAULT_BASELINE),
+        help="JSON de uma execução anterior; em CI prefira uma execução da revisão base na mesma máquina"
+    )
+    parser.add_argument(
+        "--threshold", type=float, default=0.30,
+        help="Aumento tolerado do p50 (0.30 = 30%%); o baseline pode definir tolerâncias por caso"
+    )
+    parser.add_argument("--ci", action="store_true", help="Falha se o baseline não existir")
+    args = parser.parse_args()
+    
+    print(f"{'caso':<28}{'ops/s':>12}{'p50 ms':>10}{'p99 ms':>10}{'erros':>8}")
+    report = asyncio.run(run(args))
+    
+    Path(args.output).write_text(json.dumps(report, indent=2))
+    print(f"\nResultados gravados em {args.output}")
+    
+    baseline_path = Path(args.baseline)
+    if not baseline_path.exists():
+        if args.ci:
+            print(f"Baseline {baseline_path} não encontrado")
+            sys.exit(1)
+        print(f"Baseline {baseline_path} não encontrado; nada a comparar")
+        return
+    
+    baseline = json.loads(baseline_path.read_text())
+    revision = baseline.get("meta", {}).get("revision")
+    regressions = compare(report["results"], baseline.get("results", {}), args.threshold, baseline.get("tolerances", {}))
+    if regressions:
+        print(f"\nREGRESSÕES de p50 em relação a {revision}:")
+        for line in regressions:
+            print(f"  {line}")
+        sys.exit(1)
+    print(f"\nSem regressões de p50 em relação a {revision}")
+
+if __name__ == "__main__":
+    main()
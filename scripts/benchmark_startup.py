@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+os.environ.setdefault("JWT_SECRET", "benchmark-startup-secret-0123456789abcdef")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+import websockets
+
+from src.server.mcp_server import MCPServer
+
+HEAVY_MODULES = ("crewai", "langchain", "langchain_openai", "openai")
+DEFERRED_MODULES = ("src.client.mcp_client", "src.core.config", "pydantic", "websockets")
+
+CHILD = """
+import time
+started = time.perf_counter()
+import asyncio, json, sys
+sys.path.insert(0, {root!r})
+from src.client.cli import VPNConnectionCLI
+imported = time.perf_counter()
+cli = VPNConnectionCLI({host!r}, {token!r})
+built = time.perf_counter()
+eager = [name for name in {deferred!r} if name in sys.modules]
+connected = None
+if {connect!r}:
+    async def run():
+        try:
+            return await cli.connect()
+        finally:
+            await cli.disconnect()
+    connected = asyncio.run(run())
+finished = time.perf_counter()
+print(json.dumps({{
+    "import_ms": (imported - started) * 1000,
+    "init_ms": (built - imported) * 1000,
+    "connect_ms": (finished - built) * 1000 if {connect!r} else 0.0,
+    "connected": connected,
+    "eager_modules": eager,
+    "heavy_modules": [name for name in {heavy!r} if name in sys.modules]
+}}))
+"""
+
+
+async def run_once(host: str, port: int, token: str, connect: bool) -> dict:
+    code = CHILD.format(
+        root=str(ROOT), host=host, token=token, connect=connect, heavy=HEAVY_MODULES, deferred=DEFERRED_MODULES
+    )
+    env = {**os.environ, "MCP_SERVER_PORT": str(port)}
+    
+    started = time.perf_counter()
+    process = await asyncio.create_subprocess_exec(
+        sys.executable, "-c", code,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        env=env
+    )
+    stdout, stderr = await process.communicate()
+    total_ms = (time.perf_counter() - started) * 1000
+    
+    if process.returncode != 0:
+        raise RuntimeError(f"Startup run failed:\n{stderr.decode(errors='replace')}")
+    
+    result = json.loads(stdout.decode().strip().splitlines()[-1])
+    result["total_ms"] = total_ms
+    result["menu_ms"] = total_ms - result["connect_ms"]
+    return result
+
+
+async def main():
+    parser = argparse.ArgumentParser(
+        description="Mede o tempo até o menu do CLI ficar visível; a conexão acontece no primeiro comando e é medida à parte"
+    )
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=300.0)
+    parser.add_argument("--port", type=int, default=18790)
+    parser.add_argument("--no-connect", action="store_true", help="Não mede a conexão do primeiro comando")
+    args = parser.parse_args()
+    
+    server = MCPServer()
+    token = server.generate_token("benchmark-startup")
+    connect = not args.no_connect
+    
+    async with websockets.serve(server.handle_client, "127.0.0.1", args.port):
+        await run_once("127.0.0.1", args.port, token, connect)
+        runs = [await run_once("127.0.0.1", args.port, token, connect) for _ in range(args.runs)]
+    
+    for key in ("import_ms", "init_ms", "menu_ms", "connect_ms", "total_ms"):
+        values = [run[key] for run in runs]
+        print(f"{key:>11}: median {statistics.median(values):8.1f}  min {min(values):8.1f}  max {max(values):8.1f}")
+    
+    heavy = sorted({name for run in runs for name in run["heavy_modules"]})
+    if connect and not all(run["connected"] for run in runs):
+        print("AVISO: o cliente não conseguiu conectar ao servidor local")
+    if heavy:
+        print(f"AVISO: módulos de agentes carregados na inicialização: {', '.join(heavy)}")
+    eager = sorted({name for run in runs for name in run["eager_modules"]})
+    if eager:
+        print(f"AVISO: módulos carregados antes do primeiro comando: {', '.join(eager)}")
+    
+    median_menu = statistics.median(run["menu_ms"] for run in runs)
+    within_budget = median_menu <= args.budget_ms and not heavy and not eager
+    print(f"\nOrçamento {args.budget_ms:.0f} ms até o menu: {'OK' if within_budget else 'EXCEDIDO'} ({median_menu:.1f} ms)")
+    sys.exit(0 if within_budget else 1)
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,95 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from ..core.config import settings
+from ..utils.logger import setup_logger
+
+logger = setup_logger("connection_status", settings.log.level, settings.log.log_file)
+
+
+class ConnectionStatusService:
+    def __init__(
+        self,
+        probe: Callable[[bool], Awaitable[Dict[str, Any]]],
+        ttl: float,
+        refresh_interval: float
+    ):
+        self.probe = probe
+        self.ttl = ttl
+        self.refresh_interval = refresh_interval
+        self.status: Optional[Dict[str, Any]] = None
+        self.expires = 0.0
+        self.hits = 0
+        self.probes = 0
+        self.invalidations = 0
+        self._force_refresh = False
+        self._lock: Optional[asyncio.Lock] = None
+        self._task: Optional[asyncio.Task] = None
+    
+    @staticmethod
+    def is_reachable(status: Dict[str, Any]) -> bool:
+        return bool(status.get("can_reach") or status.get("success"))
+    
+    def peek(self) -> Optional[Dict[str, Any]]:
+        if self.status is not None and time.monotonic() < self.expires:
+            return self.status
+        return None
+    
+    async def get(self, refresh: bool = False) -> Dict[str, Any]:
+        self.start()
+        status = None if refresh else self.peek()
+        if status is not None:
+            self.hits += 1
+            return status
+        return await self._refresh(refresh)
+    
+    async def _refresh(self, force: bool = False) -> Dict[str, Any]:
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        probes = self.probes
+        
+        async with self._lock:
+            if self.probes != probes and not self._force_refresh and self.status is not None:
+                return self.status
+            
+            force = force or self._force_refresh
+            self._force_refresh = False
+            status = await self.probe(force)
+            self.probes += 1
+            self.status = status
+            self.expires = time.monotonic() + self.ttl if self.is_reachable(status) else 0.0
+            return status
+    
+    def invalidate(self, reason: str = "transport error"):
+        if self.status is not None:
+            logger.info(f"Connection status invalidated: {reason}")
+        self.invalidations += 1
+        self.expires = 0.0
+        self._force_refresh = True
+    
+    def start(self):
+        if self._task is None and self.refresh_interval > 0:
+            self._task = asyncio.create_task(self._run())
+    
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+    
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await self._refresh()
+            except Exception as e:
+                logger.error(f"Error refreshing connection status: {e}")
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "cached": self.peek() is not None,
+            "hits": self.hits,
+            "probes": self.probes,
+            "invalidations": self.invalidations
+        }
@@ -1,11 +1,14 @@
-from typing import Dict, Any, Optional
-from crewai import Agent, Task, Crew
-from langchain_openai import ChatOpenAI
+from functools import cached_property
+from typing import TYPE_CHECKING, Dict, Any, Optional
 
+from .llm_pool import get_llm_pool
 from ..core.config import settings
 from ..utils.logger import setup_logger
 from ..utils.network_detector import NetworkDetector
 
+if TYPE_CHECKING:
+    from crewai import Agent, Task
+
 logger = setup_logger("connectivity_agent", settings.log.level, settings.log.log_file)
 
 class ConnectivityAgent:
@@ -14,16 +17,21 @@ class ConnectivityAgent:
         self.network_detector = NetworkDetector(
             settings.network.local_subnet,
             ubuntu_ip,
-            settings.network.connection_timeout
-        )
-        
-        self.llm = ChatOpenAI(
-            model=settings.ai.model,
-            temperature=settings.ai.temperature,
-            api_key=settings.ai.openai_api_key
+            settings.network.connection_timeout,
+            port=settings.mcp.server_port,
+            candidates=settings.network.server_candidates(),
+            cache_ttl=settings.network.path_cache_ttl
         )
-        
-        self.agent = Agent(
+        self.link_monitor = None
+    
+    @property
+    def llm(self):
+        return get_llm_pool().client()
+    
+    @cached_property
+    def agent(self) -> "Agent":
+        from crewai import Agent
+        return Agent(
             role="Network Connectivity Specialist",
             goal="Ensure stable and optimal connection between MacBook and Ubuntu server",
             backstory="""You are an expert in network connectivity and VPN management.
@@ -34,18 +42,23 @@ class ConnectivityAgent:
             llm=self.llm
         )
     
-    async def check_connection(self) -> Dict[str, Any]:
-        status = await self.network_detector.detect_network_status()
+    async def check_connection(self, refresh: bool = False) -> Dict[str, Any]:
+        status = await self.network_detector.detect_network_status(refresh)
         
         logger.info(f"Connection check: {status.connection_type}")
         
-        return {
+        result = {
             "status": status.connection_type,
             "is_local": status.is_local_network,
             "can_reach": status.can_reach_ubuntu,
             "local_ip": status.local_ip,
+            "server_address": status.server_address,
+            "rtt_ms": status.rtt_ms,
             "recommendation": self._get_recommendation(status)
         }
+        if self.link_monitor is not None:
+            result["link"] = self.link_monitor.stats()
+        return result
     
     def _get_recommendation(self, status) -> str:
         if status.connection_type == "local":
@@ -73,7 +86,8 @@ class ConnectivityAgent:
                 "message": "Failed to establish connection. Please check network settings."
             }
     
-    def create_monitoring_task(self) -> Task:
+    def create_monitoring_task(self) -> "Task":
+        from crewai import Task
         return Task(
             description="""Monitor the network connection between MacBook and Ubuntu server.
             Check if we're on the same local network or need to use VPN.
@@ -1,21 +1,29 @@
-from typing import Dict, Any, List, Optional
-from crewai import Agent, Task
-from langchain_openai import ChatOpenAI
+import time
+from functools import cached_property
+from typing import TYPE_CHECKING, Dict, Any, List, Optional
 
+from .llm_pool import get_llm_pool
 from ..core.config import settings
 from ..utils.logger import setup_logger
 
+if TYPE_CHECKING:
+    from crewai import Agent, Task
+    from ..client.mcp_client import MCPClient
+
 logger = setup_logger("file_agent", settings.log.level, settings.log.log_file)
 
 class FileAgent:
-    def __init__(self):
-        self.llm = ChatOpenAI(
-            model=settings.ai.model,
-            temperature=settings.ai.temperature,
-            api_key=settings.ai.openai_api_key
-        )
-        
-        self.agent = Agent(
+    def __init__(self, client: Optional["MCPClient"] = None):
+        self.client = client
+    
+    @property
+    def llm(self):
+        return get_llm_pool().client()
+    
+    @cached_property
+    def agent(self) -> "Agent":
+        from crewai import Agent
+        return Agent(
             role="File Management Specialist",
             goal="Efficiently manage, search, and organize files on the Ubuntu system",
             backstory="""You are an expert in file systems and data organization.
@@ -27,7 +35,8 @@ class FileAgent:
             llm=self.llm
         )
     
-    def create_search_task(self, query: str, base_path: str = "~") -> Task:
+    def create_search_task(self, query: str, base_path: str = "~") -> "Task":
+        from crewai import Task
         return Task(
             description=f"""Search for files matching the query: '{query}'
             Starting from base path: {base_path}
@@ -36,7 +45,8 @@ class FileAgent:
             expected_output="List of relevant files with paths and descriptions"
         )
     
-    def create_organization_task(self, path: str) -> Task:
+    def create_organization_task(self, path: str) -> "Task":
+        from crewai import Task
         return Task(
             description=f"""Analyze the file structure at: {path}
             Provide recommendations for better organization if needed.
@@ -45,12 +55,42 @@ class FileAgent:
             expected_output="File organization analysis and recommendations"
         )
     
-    async def smart_search(self, query: str, base_path: str = "~") -> Dict[str, Any]:
+    async def smart_search(
+        self,
+        query: str,
+        base_path: str = "~",
+        regex: bool = False,
+        max_results: int = 20
+    ) -> Dict[str, Any]:
         logger.info(f"Smart search for: {query} in {base_path}")
         
-        return {
-            "query": query,
-            "base_path": base_path,
-            "status": "search_initiated",
-            "message": "File search agent is processing your request"
-        }
+        try:
+            if self.client is None:
+                raise ConnectionError("MCP client is not connected")
+            
+            started = time.perf_counter()
+            result = await self.client.document_search(query, base_path, regex, max_results)
+            if "error" in result:
+                raise RuntimeError(result["error"])
+            return {
+                "query": query,
+                "base_path": base_path,
+                "status": "completed",
+                "results": result["results"],
+                "count": result["count"],
+                "index_ready": result["ready"],
+                "elapsed_ms": round((time.perf_counter() - started) * 1000, 2)
+            }
+        except Exception as e:
+            logger.error(f"Error in smart search: {e}")
+            return {
+                "query": query,
+                "base_path": base_path,
+                "status": "failed",
+                "error": str(e)
+            }
+    
+    async def refresh_index(self) -> Dict[str, Any]:
+        if self.client is None:
+            return {"error": "MCP client is not connected"}
+        return await self.client.refresh_document_index()
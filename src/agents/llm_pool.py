@@ -0,0 +1,234 @@
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+from ..core.config import settings
+from ..utils.logger import setup_logger
+
+logger = setup_logger("llm_pool", settings.log.level, settings.log.log_file)
+
+LOCAL_RESPONSE = "Local model response (offline mode)"
+
+
+def _openai_client(model: str, temperature: float, api_key: str):
+    from langchain_openai import ChatOpenAI
+    return ChatOpenAI(model=model, temperature=temperature, api_key=api_key)
+
+
+def _local_client(model: str, temperature: float, api_key: str):
+    from langchain_core.language_models.fake_chat_models import FakeListChatModel
+    return FakeListChatModel(responses=[LOCAL_RESPONSE])
+
+
+PROVIDERS: Dict[str, Callable[[str, float, str], Any]] = {
+    "openai": _openai_client,
+    "local": _local_client
+}
+
+
+def register_provider(name: str, factory: Callable[[str, float, str], Any]):
+    PROVIDERS[name] = factory
+
+
+def context_hash(context: Any) -> str:
+    return hashlib.sha256(json.dumps(context, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class LLMResponseCache:
+    def __init__(self, path: str, ttl: float, max_bytes: int):
+        self.path = Path(path).expanduser()
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+    
+    def key(self, model: str, prompt: str, context: str) -> str:
+        return hashlib.sha256(json.dumps([model, prompt, context]).encode()).hexdigest()
+    
+    def _entry_path(self, key: str) -> Path:
+        return self.path / f"{key}.json"
+    
+    def get(self, key: str) -> Optional[str]:
+        entry_path = self._entry_path(key)
+        try:
+            with open(entry_path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except (OSError, ValueError):
+            entry_path.unlink(missing_ok=True)
+            self.misses += 1
+            return None
+        
+        try:
+            expired = time.time() - entry["created"] > self.ttl
+            response = entry["response"]
+        except (KeyError, TypeError) as e:
+            logger.warning(f"Discarding malformed LLM cache entry {key}: {e}")
+            expired, response = True, None
+        if expired or not isinstance(response, str):
+            entry_path.unlink(missing_ok=True)
+            self.misses += 1
+            return None
+        
+        try:
+            os.utime(entry_path)
+        except OSError:
+            pass
+        self.hits += 1
+        return response
+    
+    def put(self, key: str, model: str, response: str):
+        data = json.dumps({"model": model, "created": time.time(), "response": response}).encode()
+        if len(data) > self.max_bytes:
+            return
+        
+        try:
+            self.path.mkdir(parents=True, exist_ok=True)
+            temp_path = self.path / f".{key}.{uuid.uuid4().hex}.tmp"
+            temp_path.write_bytes(data)
+            os.replace(temp_path, self._entry_path(key))
+            self._evict()
+        except OSError as e:
+            logger.warning(f"Could not persist LLM response: {e}")
+    
+    def _entries(self):
+        entries = []
+        for entry_path in self.path.glob("*.json"):
+            try:
+                stat = entry_path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry_path))
+        return entries
+    
+    def _evict(self):
+        with self._lock:
+            entries = sorted(self._entries())
+            total = sum(size for _, size, _ in entries)
+            now = time.time()
+            for mtime, size, entry_path in entries:
+                if total <= self.max_bytes and now - mtime <= self.ttl:
+                    continue
+                entry_path.unlink(missing_ok=True)
+                total -= size
+    
+    def clear(self):
+        for _, _, entry_path in self._entries():
+            entry_path.unlink(missing_ok=True)
+    
+    def stats(self) -> Dict[str, Any]:
+        entries = self._entries() if self.path.exists() else []
+        return {
+            "entries": len(entries),
+            "bytes": sum(size for _, size, _ in entries),
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+
+class LLMPool:
+    def __init__(
+        self,
+        provider: str,
+        model: str,
+        temperature: float,
+        api_key: str,
+        max_concurrency: int,
+        cache: Optional[LLMResponseCache] = None
+    ):
+        if provider not in PROVIDERS:
+            raise ValueError(f"Unknown LLM provider: {provider}")
+        self.provider = provider
+        self.model = model
+        self.temperature = temperature
+        self.api_key = api_key
+        self.max_concurrency = max_concurrency
+        self.cache = cache
+        self.calls = 0
+        self.active = 0
+        self._clients: Dict[Tuple[str, float], Any] = {}
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+    
+    def client(self, temperature: Optional[float] = None):
+        key = (self.model, self.temperature if temperature is None else temperature)
+        with self._lock:
+            if key not in self._clients:
+                self._clients[key] = PROVIDERS[self.provider](key[0], key[1], self.api_key)
+            return self._clients[key]
+    
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        with self._slots:
+            with self._lock:
+                self.active += 1
+                self.calls += 1
+            try:
+                yield
+            finally:
+                with self._lock:
+                    self.active -= 1
+    
+    async def run(self, prompt: str, context: Any, call: Callable[[], Any]) -> Tuple[str, bool]:
+        key = self.cache.key(f"{self.provider}/{self.model}", prompt, context_hash(context)) if self.cache else None
+        if key:
+            cached = await asyncio.to_thread(self.cache.get, key)
+            if cached is not None:
+                return cached, True
+        
+        def limited():
+            with self.slot():
+                return str(call())
+        
+        response = await asyncio.to_thread(limited)
+        if key:
+            await asyncio.to_thread(self.cache.put, key, self.model, response)
+        return response, False
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "provider": self.provider,
+            "model": self.model,
+            "clients": len(self._clients),
+            "max_concurrency": self.max_concurrency,
+            "active": self.active,
+            "calls": self.calls,
+            "cache": self.cache.stats() if self.cache else None
+        }
+
+
+_pool: Optional[LLMPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_llm_pool() -> LLMPool:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            cache = None
+            if settings.ai.cache_enabled:
+                cache = LLMResponseCache(
+                    settings.ai.cache_path,
+                    settings.ai.cache_ttl,
+                    settings.ai.cache_max_bytes
+                )
+            _pool = LLMPool(
+                settings.ai.provider,
+                settings.ai.model,
+                settings.ai.temperature,
+                settings.ai.openai_api_key,
+                settings.ai.max_concurrency,
+                cache
+            )
+        return _pool
@@ -1,32 +1,60 @@
-from typing import Dict, Any, List
-from crewai import Crew, Process
-from langchain_openai import ChatOpenAI
+from functools import cached_property
+from typing import TYPE_CHECKING, Dict, Any, List, Optional
 
+from .connection_status import ConnectionStatusService
 from .connectivity_agent import ConnectivityAgent
-from .file_agent import FileAgent
-from .project_agent import ProjectAgent
+from .llm_pool import get_llm_pool
 from ..core.config import settings
 from ..utils.logger import setup_logger
 
+if TYPE_CHECKING:
+    from crewai import Crew
+    from ..client.mcp_client import MCPClient
+    from .file_agent import FileAgent
+    from .project_agent import ProjectAgent
+
 logger = setup_logger("orchestrator", settings.log.level, settings.log.log_file)
 
 class AgentOrchestrator:
     def __init__(self, ubuntu_ip: str):
         self.ubuntu_ip = ubuntu_ip
+        self.client: Optional["MCPClient"] = None
         
         self.connectivity_agent = ConnectivityAgent(ubuntu_ip)
-        self.file_agent = FileAgent()
-        self.project_agent = ProjectAgent()
-        
-        self.llm = ChatOpenAI(
-            model=settings.ai.model,
-            temperature=settings.ai.temperature,
-            api_key=settings.ai.openai_api_key
+        self.llm_pool = get_llm_pool()
+        self.status_service = ConnectionStatusService(
+            self._probe_connection,
+            settings.network.status_ttl,
+            settings.network.status_refresh_interval
         )
     
-    async def check_and_ensure_connection(self) -> Dict[str, Any]:
+    @cached_property
+    def file_agent(self) -> "FileAgent":
+        from .file_agent import FileAgent
+        return FileAgent(self.client)
+    
+    @cached_property
+    def project_agent(self) -> "ProjectAgent":
+        from .project_agent import ProjectAgent
+        return ProjectAgent()
+    
+    def attach_client(self, client: "MCPClient"):
+        self.client = client
+        self.connectivity_agent.link_monitor = client.monitor
+        client.transport_listeners.append(self.status_service.invalidate)
+        if "file_agent" in self.__dict__:
+            self.file_agent.client = client
+    
+    @property
+    def llm(self):
+        return self.llm_pool.client()
+    
+    async def check_and_ensure_connection(self, refresh: bool = False) -> Dict[str, Any]:
+        return await self.status_service.get(refresh)
+    
+    async def _probe_connection(self, refresh: bool) -> Dict[str, Any]:
         logger.info("Checking connection status...")
-        connection_status = await self.connectivity_agent.check_connection()
+        connection_status = await self.connectivity_agent.check_connection(refresh)
         
         if not connection_status["can_reach"]:
             logger.warning("Connection not available, attempting to establish...")
@@ -70,7 +98,9 @@ class AgentOrchestrator:
         
         return {"error": f"Unknown operation: {operation}"}
     
-    def create_crew_for_task(self, task_type: str, **kwargs) -> Crew:
+    def create_crew_for_task(self, task_type: str, **kwargs) -> "Crew":
+        from crewai import Crew, Process
+        
         agents = []
         tasks = []
         
@@ -103,13 +133,17 @@ class AgentOrchestrator:
         logger.info(f"Executing intelligent task: {task_type}")
         
         try:
-            crew = self.create_crew_for_task(task_type, **kwargs)
-            result = crew.kickoff()
+            result, cached = await self.llm_pool.run(
+                task_type,
+                {"task_type": task_type, "params": kwargs},
+                lambda: self.create_crew_for_task(task_type, **kwargs).kickoff()
+            )
             
             return {
                 "task_type": task_type,
                 "status": "completed",
-                "result": str(result)
+                "result": result,
+                "cached": cached
             }
         except Exception as e:
             logger.error(f"Error executing task: {e}")
@@ -118,3 +152,6 @@ class AgentOrchestrator:
                 "status": "failed",
                 "error": str(e)
             }
+    
+    async def close(self):
+        await self.status_service.stop()
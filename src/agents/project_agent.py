@@ -1,21 +1,24 @@
-from typing import Dict, Any, List
-from crewai import Agent, Task
-from langchain_openai import ChatOpenAI
+from functools import cached_property
+from typing import TYPE_CHECKING, Dict, Any, List
 
+from .llm_pool import get_llm_pool
 from ..core.config import settings
 from ..utils.logger import setup_logger
 
+if TYPE_CHECKING:
+    from crewai import Agent, Task
+
 logger = setup_logger("project_agent", settings.log.level, settings.log.log_file)
 
 class ProjectAgent:
-    def __init__(self):
-        self.llm = ChatOpenAI(
-            model=settings.ai.model,
-            temperature=settings.ai.temperature,
-            api_key=settings.ai.openai_api_key
-        )
-        
-        self.agent = Agent(
+    @property
+    def llm(self):
+        return get_llm_pool().client()
+    
+    @cached_property
+    def agent(self) -> "Agent":
+        from crewai import Agent
+        return Agent(
             role="Development Project Manager",
             goal="Manage and organize development projects and coding environments",
             backstory="""You are an expert in software development project management.
@@ -27,7 +30,8 @@ class ProjectAgent:
             llm=self.llm
         )
     
-    def create_project_analysis_task(self, project_path: str) -> Task:
+    def create_project_analysis_task(self, project_path: str) -> "Task":
+        from crewai import Task
         return Task(
             description=f"""Analyze the development project at: {project_path}
             Identify:
@@ -40,7 +44,8 @@ class ProjectAgent:
             expected_output="Comprehensive project analysis report"
         )
     
-    def create_dependency_check_task(self, project_path: str) -> Task:
+    def create_dependency_check_task(self, project_path: str) -> "Task":
+        from crewai import Task
         return Task(
             description=f"""Check dependencies for project at: {project_path}
             Verify:
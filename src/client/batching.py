@@ -0,0 +1,83 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+Call = Tuple[str, Dict[str, Any]]
+
+
+class RequestBatcher:
+    def __init__(
+        self,
+        send_single: Callable[[str, Dict[str, Any]], Awaitable[Any]],
+        send_batch: Callable[[List[Call]], Awaitable[List[Dict[str, Any]]]],
+        window: float,
+        max_calls: int
+    ):
+        self.send_single = send_single
+        self.send_batch = send_batch
+        self.window = window
+        self.max_calls = max_calls
+        self.batches_sent = 0
+        self.calls_coalesced = 0
+        self._pending: List[Tuple[Call, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks = set()
+    
+    async def submit(self, tool: str, params: Dict[str, Any]) -> Any:
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append(((tool, params), future))
+        
+        if len(self._pending) >= self.max_calls:
+            self._flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.window, self._flush)
+        
+        return await future
+    
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        
+        pending, self._pending = self._pending, []
+        pending = [(call, future) for call, future in pending if not future.done()]
+        if not pending:
+            return
+        
+        task = asyncio.get_running_loop().create_task(self._dispatch(pending))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+    
+    async def _dispatch(self, pending: List[Tuple[Call, asyncio.Future]]):
+        if len(pending) == 1:
+            (tool, params), future = pending[0]
+            try:
+                result = await self.send_single(tool, params)
+            except Exception as e:
+                _settle(future, error=e)
+            else:
+                _settle(future, result=result)
+            return
+        
+        self.batches_sent += 1
+        self.calls_coalesced += len(pending)
+        try:
+            items = await self.send_batch([call for call, _ in pending])
+        except Exception as e:
+            for _, future in pending:
+                _settle(future, error=e)
+            return
+        
+        for (_, future), item in zip(pending, items):
+            if "error" in item:
+                _settle(future, error=Exception(item["error"]))
+            else:
+                _settle(future, result=item.get("result"))
+
+
+def _settle(future: asyncio.Future, result: Any = None, error: Optional[BaseException] = None):
+    if future.done():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
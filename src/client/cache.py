@@ -0,0 +1,104 @@
+import json
+import os
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from ..utils.logger import setup_logger
+from ..core.config import settings
+from ..core.protocol import JsonCodec, ProtocolError
+
+logger = setup_logger("client_cache", settings.log.level, settings.log.log_file)
+
+CACHE_VERSION = 2
+
+
+def cache_key(tool: str, params: Dict[str, Any]) -> str:
+    return f"{tool}:{json.dumps(params, sort_keys=True, default=str)}"
+
+
+class ResponseCache:
+    def __init__(self, max_bytes: int, persist_path: Optional[str] = None):
+        self.max_bytes = max_bytes
+        self.persist_path = Path(persist_path).expanduser() if persist_path else None
+        self.entries: "OrderedDict[str, Tuple[str, Any, int]]" = OrderedDict()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._dirty = False
+        self._codec = JsonCodec()
+    
+    def get(self, key: str) -> Optional[Tuple[str, Any]]:
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        self.entries.move_to_end(key)
+        return entry[0], entry[1]
+    
+    def put(self, key: str, etag: str, value: Any):
+        self.discard(key)
+        try:
+            size = len(self._codec.encode(value))
+        except (TypeError, ValueError):
+            return
+        if size > self.max_bytes:
+            return
+        
+        self.entries[key] = (etag, value, size)
+        self.current_bytes += size
+        self._dirty = True
+        
+        while self.current_bytes > self.max_bytes:
+            _, (_, _, evicted_size) = self.entries.popitem(last=False)
+            self.current_bytes -= evicted_size
+    
+    def discard(self, key: str):
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.current_bytes -= entry[2]
+            self._dirty = True
+    
+    def record(self, hit: bool):
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self.entries),
+            "bytes": self.current_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses
+        }
+    
+    def load(self):
+        if not self.persist_path or not self.persist_path.exists():
+            return
+        try:
+            with open(self.persist_path, "r", encoding="utf-8") as f:
+                state = self._codec.decode(f.read())
+            if state.get("version") != CACHE_VERSION:
+                return
+            for key, (etag, value, _) in state["entries"].items():
+                self.put(key, etag, value)
+        except (OSError, UnicodeDecodeError, ProtocolError, AttributeError, KeyError, TypeError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable client cache: {e}")
+            self.entries.clear()
+            self.current_bytes = 0
+        self._dirty = False
+    
+    def save(self):
+        if not self.persist_path or not self._dirty:
+            return
+        try:
+            self.persist_path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = self.persist_path.with_suffix(".tmp")
+            with open(temp_path, "w", encoding="utf-8") as f:
+                for part in self._codec.iter_encode({"version": CACHE_VERSION, "entries": self.entries}):
+                    f.write(part)
+            os.replace(temp_path, self.persist_path)
+            self._dirty = False
+        except OSError as e:
+            logger.warning(f"Could not persist client cache: {e}")
@@ -1,40 +1,62 @@
 import asyncio
+import signal
+from functools import cached_property
+from typing import TYPE_CHECKING, Optional
 import click
 from rich.console import Console
 from rich.table import Table
 from rich.panel import Panel
 from rich.prompt import Prompt
+from rich.markup import escape
 
-from ..client.mcp_client import MCPClient
-from ..agents.orchestrator import AgentOrchestrator
-from ..core.config import settings
-from ..utils.logger import setup_logger
+if TYPE_CHECKING:
+    from ..agents.orchestrator import AgentOrchestrator
+    from ..client.mcp_client import MCPClient
 
 console = Console()
-logger = setup_logger("cli", settings.log.level, settings.log.log_file)
+
+LIST_PAGE_SIZE = 50
+CONTENT_SEARCH_LIMIT = 100
 
 class VPNConnectionCLI:
     def __init__(self, server_ip: str, token: str):
         self.server_ip = server_ip
         self.token = token
-        self.client = None
-        self.orchestrator = AgentOrchestrator(server_ip)
+        self.client: Optional["MCPClient"] = None
+        self.orchestrator: Optional["AgentOrchestrator"] = None
+    
+    @cached_property
+    def logger(self):
+        from ..core.config import settings
+        from ..utils.logger import setup_logger
+        return setup_logger("cli", settings.log.level, settings.log.log_file)
     
     async def connect(self):
+        if self.client is not None:
+            return True
+        
         console.print("[bold blue]Conectando ao servidor Ubuntu...[/bold blue]")
+        from ..agents.orchestrator import AgentOrchestrator
+        from ..client.mcp_client import MCPClient
+        from ..core.config import settings
         
+        if self.orchestrator is None:
+            self.orchestrator = AgentOrchestrator(self.server_ip)
         connection_status = await self.orchestrator.check_and_ensure_connection()
         
         if connection_status.get("success") or connection_status.get("can_reach"):
             console.print(f"[bold green]✓[/bold green] {connection_status.get('message', 'Conectado com sucesso')}")
             console.print(f"[dim]Tipo de conexão: {connection_status.get('connection_type', 'unknown')}[/dim]")
             
-            self.client = MCPClient(self.server_ip, settings.mcp.server_port, self.token)
-            connected = await self.client.connect()
+            client = MCPClient(self.server_ip, settings.mcp.server_port, self.token)
+            connected = await client.connect()
             
             if connected:
                 console.print("[bold green]✓ Cliente MCP conectado[/bold green]")
+                self.client = client
+                self.orchestrator.attach_client(client)
                 return True
+            await client.disconnect()
         
         console.print("[bold red]✗ Falha na conexão[/bold red]")
         return False
@@ -44,23 +66,37 @@ class VPNConnectionCLI:
         recursive = Prompt.ask("Busca recursiva?", choices=["sim", "não"], default="não") == "sim"
         
         console.print(f"[dim]Listando arquivos em {path}...[/dim]")
-        result = await self.client.list_files(path, recursive)
-        
-        if "error" in result:
-            console.print(f"[bold red]Erro: {result['error']}[/bold red]")
-            return
-        
-        table = Table(title=f"Arquivos em {path}")
-        table.add_column("Nome", style="cyan")
-        table.add_column("Tipo", style="magenta")
-        table.add_column("Tamanho", style="green")
+        total = 0
         
-        for file in result.get("files", [])[:50]:
-            size = f"{file.get('size', 0):,} bytes" if file.get('size') else "N/A"
-            table.add_row(file["name"], file["type"], size)
+        async for result in self.client.iter_list_pages(path, recursive, page_size=LIST_PAGE_SIZE):
+            if "error" in result:
+                console.print(f"[bold red]Erro: {result['error']}[/bold red]")
+                return
+            
+            if result.get("type") == "file":
+                console.print(f"[cyan]{result['path']}[/cyan] ({result.get('size', 0):,} bytes)")
+                return
+            
+            table = Table(title=f"Arquivos em {path}")
+            table.add_column("Nome", style="cyan")
+            table.add_column("Tipo", style="magenta")
+            table.add_column("Tamanho", style="green")
+            
+            for file in result.get("files", []):
+                size = f"{file.get('size', 0):,} bytes" if file.get('size') else "N/A"
+                table.add_row(file["name"], file["type"], size)
+            
+            console.print(table)
+            total += result.get("count", 0)
+            
+            if not result.get("next_cursor"):
+                break
+            
+            if Prompt.ask("Mostrar mais?", choices=["sim", "não"], default="sim") != "sim":
+                console.print(f"[dim]Exibidos: {total} arquivos (há mais)[/dim]")
+                return
         
-        console.print(table)
-        console.print(f"[dim]Total: {result.get('count', 0)} arquivos[/dim]")
+        console.print(f"[dim]Total: {total} arquivos[/dim]")
     
     async def read_file_interactive(self):
         path = Prompt.ask("Digite o caminho do arquivo")
@@ -81,6 +117,11 @@ class VPNConnectionCLI:
     async def search_files_interactive(self):
         path = Prompt.ask("Digite o caminho base", default="~")
         pattern = Prompt.ask("Digite o padrão de busca (ex: *.py)")
+        query = Prompt.ask("Texto a buscar no conteúdo (opcional)", default="")
+        
+        if query:
+            await self.search_content_interactive(path, pattern, query)
+            return
         
         console.print(f"[dim]Buscando arquivos...[/dim]")
         result = await self.client.search_files(path, pattern)
@@ -95,6 +136,19 @@ class VPNConnectionCLI:
         
         console.print(f"[dim]Total: {result.get('count', 0)} arquivos encontrados[/dim]")
     
+    async def search_content_interactive(self, path: str, pattern: str, query: str):
+        console.print(f"[dim]Buscando '{query}' no conteúdo...[/dim]")
+        stream = await self.client.search_content(path, query, pattern, max_results=CONTENT_SEARCH_LIMIT)
+        
+        async with stream:
+            async for match in stream:
+                console.print(
+                    f"[cyan]{escape(match['path'])}[/cyan]:[green]{match['line']}[/green]: {escape(match['snippet'])}"
+                )
+        
+        result = stream.result
+        console.print(f"[dim]Total: {result.get('count', 0)} ocorrências em {result.get('files_scanned', 0)} arquivos analisados[/dim]")
+    
     async def get_system_info_interactive(self):
         console.print("[dim]Obtendo informações do sistema...[/dim]")
         result = await self.client.get_system_info()
@@ -120,20 +174,113 @@ class VPNConnectionCLI:
         command = Prompt.ask("Digite o comando")
         cwd = Prompt.ask("Diretório de trabalho (opcional)", default="")
         
-        console.print(f"[dim]Executando comando: {command}...[/dim]")
-        result = await self.client.execute_command(command, cwd if cwd else None)
+        console.print(f"[dim]Executando comando: {command}... (Ctrl-C interrompe)[/dim]")
+        stream = await self.client.execute_command_stream(command, cwd if cwd else None)
         
-        if "error" in result:
-            console.print(f"[bold red]Erro: {result['error']}[/bold red]")
-            return
+        loop = asyncio.get_running_loop()
+        signals_sent = []
         
+        def interrupt():
+            signal_name = "SIGTERM" if not signals_sent else "SIGKILL"
+            console.print(f"\n[bold yellow]Enviando {signal_name} ao comando (Ctrl-C novamente força o encerramento)[/bold yellow]")
+            signals_sent.append(asyncio.create_task(self.client.signal_command(stream.request_id, signal_name)))
+        
+        previous_handler = signal.getsignal(signal.SIGINT)
+        try:
+            loop.add_signal_handler(signal.SIGINT, interrupt)
+        except (NotImplementedError, RuntimeError):
+            previous_handler = None
+        
+        try:
+            async with stream:
+                async for event in stream:
+                    console.out(
+                        event["data"],
+                        end="",
+                        style="red" if event["stream"] == "stderr" else None,
+                        highlight=False
+                    )
+        finally:
+            if previous_handler is not None:
+                loop.remove_signal_handler(signal.SIGINT)
+                signal.signal(signal.SIGINT, previous_handler)
+            await asyncio.gather(*signals_sent, return_exceptions=True)
+        
+        result = stream.result
         console.print(f"[bold]Return Code:[/bold] {result.get('returncode')}")
         
-        if result.get("stdout"):
-            console.print(Panel(result["stdout"], title="STDOUT", border_style="green"))
+        if result.get("timed_out"):
+            console.print("[bold yellow]Comando interrompido por timeout[/bold yellow]")
+        
+        if result.get("truncated"):
+            console.print("[dim]... (saída truncada)[/dim]")
+    
+    async def sync_directory_interactive(self):
+        local_root = Prompt.ask("Diretório local", default="~/projetos")
+        remote_root = Prompt.ask("Diretório remoto", default=local_root)
+        direction = Prompt.ask("Direção", choices=["enviar", "receber"], default="enviar")
+        exclude = Prompt.ask("Padrões a excluir (separados por vírgula)", default=".git,node_modules,__pycache__")
+        delete = Prompt.ask("Remover arquivos que não existem na origem?", choices=["sim", "não"], default="não") == "sim"
+        
+        from .sync import DirectorySync
+        
+        sync = DirectorySync(
+            self.client,
+            local_root,
+            remote_root,
+            direction="push" if direction == "enviar" else "pull",
+            exclude=[pattern.strip() for pattern in exclude.split(",") if pattern.strip()],
+            delete=delete
+        )
+        
+        console.print("[dim]Comparando manifestos...[/dim]")
+        preview = await sync.run(dry_run=True)
+        console.print(
+            f"[bold]{preview['copies']}[/bold] arquivo(s) a copiar ({preview['bytes_to_copy']} bytes), "
+            f"[bold]{preview['deletes']}[/bold] a remover, {preview['unchanged']} sem alteração"
+        )
+        for rel_path in preview["copy_paths"][:20]:
+            console.print(f"  [green]+[/green] {escape(rel_path)}")
+        for rel_path in preview["delete_paths"][:20]:
+            console.print(f"  [red]-[/red] {escape(rel_path)}")
         
-        if result.get("stderr"):
-            console.print(Panel(result["stderr"], title="STDERR", border_style="red"))
+        if not preview["copies"] and not preview["deletes"]:
+            return
+        if Prompt.ask("Executar sincronização?", choices=["sim", "não"], default="sim") != "sim":
+            return
+        
+        report = await sync.run()
+        console.print(
+            f"[bold green]✓[/bold green] {report['copied']} copiado(s), {report['deleted']} removido(s) "
+            f"em {report['elapsed_ms']} ms"
+        )
+        for rel_path, error in list(report["errors"].items())[:20]:
+            console.print(f"  [red]✗[/red] {escape(rel_path)}: {escape(error)}")
+    
+    async def connection_status_interactive(self):
+        status = dict(await self.orchestrator.check_and_ensure_connection())
+        status.pop("link", None)
+        link = self.client.link_stats() if self.client else None
+        console.print(Panel(str(status), title="Status da Conexão", border_style="blue"))
+        
+        if not link:
+            return
+        
+        rtt = link["rtt_ms"] or {}
+        throughput = link["throughput_bps"]
+        loss = link["ping_loss"]
+        
+        table = Table(title="Qualidade do Link")
+        table.add_column("Métrica", style="cyan")
+        table.add_column("Valor", style="green")
+        table.add_row("Caminho", f"{link['path']} ({link['connection_type']})")
+        for key in ("last", "min", "avg", "p95", "jitter"):
+            table.add_row(f"RTT {key} (ms)", str(rtt.get(key, "-")))
+        table.add_row("Perda de ping", f"{loss:.1%}" if loss is not None else "-")
+        table.add_row("Vazão", f"{throughput / (1024 * 1024):.2f} MiB/s" if throughput else "-")
+        table.add_row("Amostras", str(link["samples"]))
+        table.add_row("Trocas de caminho", str(link["path_switches"]))
+        console.print(table)
     
     async def show_menu(self):
         while True:
@@ -144,14 +291,18 @@ class VPNConnectionCLI:
             console.print("4. Informações do sistema")
             console.print("5. Executar comando")
             console.print("6. Status da conexão")
+            console.print("7. Sincronizar diretório")
             console.print("0. Sair")
             
-            choice = Prompt.ask("Escolha uma opção", choices=["0", "1", "2", "3", "4", "5", "6"])
+            choice = Prompt.ask("Escolha uma opção", choices=["0", "1", "2", "3", "4", "5", "6", "7"])
+            
+            if choice == "0":
+                break
             
             try:
-                if choice == "0":
-                    break
-                elif choice == "1":
+                if not await self.connect():
+                    continue
+                if choice == "1":
                     await self.list_files_interactive()
                 elif choice == "2":
                     await self.read_file_interactive()
@@ -162,23 +313,28 @@ class VPNConnectionCLI:
                 elif choice == "5":
                     await self.execute_command_interactive()
                 elif choice == "6":
-                    status = await self.orchestrator.check_and_ensure_connection()
-                    console.print(Panel(str(status), title="Status da Conexão", border_style="blue"))
+                    await self.connection_status_interactive()
+                elif choice == "7":
+                    await self.sync_directory_interactive()
             except Exception as e:
                 console.print(f"[bold red]Erro: {e}[/bold red]")
-                logger.error(f"Error in menu: {e}")
+                self.logger.error(f"Error in menu: {e}")
     
     async def disconnect(self):
+        if self.orchestrator:
+            await self.orchestrator.close()
         if self.client:
             await self.client.disconnect()
-        console.print("[bold yellow]Desconectado[/bold yellow]")
+            console.print("[bold yellow]Desconectado[/bold yellow]")
 
 @click.command()
 @click.option('--server-ip', default=None, help='IP do servidor Ubuntu')
 @click.option('--token', default=None, help='Token de autenticação')
 def main(server_ip, token):
     if not server_ip:
-        server_ip = settings.network.ubuntu_tailscale_ip or Prompt.ask("Digite o IP do servidor Ubuntu")
+        from ..core.config import settings
+        candidates = settings.network.server_candidates()
+        server_ip = candidates[0] if candidates else Prompt.ask("Digite o IP do servidor Ubuntu")
     
     if not token:
         token = Prompt.ask("Digite o token de autenticação", password=True)
@@ -187,8 +343,7 @@ def main(server_ip, token):
     
     async def run():
         try:
-            if await cli.connect():
-                await cli.show_menu()
+            await cli.show_menu()
         finally:
             await cli.disconnect()
     
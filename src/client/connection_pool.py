@@ -0,0 +1,430 @@
+import asyncio
+import json
+import struct
+import time
+import zlib
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+import websockets
+from websockets.client import WebSocketClientProtocol
+
+from ..core.config import settings
+from ..core.compression import CompressionStats, Compressor
+from ..core.protocol import (
+    DEFAULT_CODEC,
+    Frame,
+    ProtocolError,
+    available_encodings,
+    encode_fragments,
+    get_codec,
+    is_chunk_frame,
+    unpack_chunk,
+)
+from ..utils.logger import setup_logger
+
+logger = setup_logger("connection_pool", settings.log.level, settings.log.log_file)
+
+PING_TIMEOUT = 5.0
+CONNECTION_LOST = "Connection to server lost"
+
+
+class MCPConnection:
+    def __init__(self, client, lane: str):
+        self.client = client
+        self.lane = lane
+        self.websocket: Optional[WebSocketClientProtocol] = None
+        self.codec = DEFAULT_CODEC
+        self.compressor = Compressor()
+        self.session_id: Optional[str] = None
+        self.inflight: Dict[str, Optional[Dict[str, Any]]] = {}
+        self.uploads: Set[str] = set()
+        self.last_used = time.monotonic()
+        self.reconnects = 0
+        self.closed = False
+        self.reconnecting = False
+        self._uri = ""
+        self._token = ""
+        self._compression: List[str] = []
+        self._ready = asyncio.Event()
+        self._receiver: Optional[asyncio.Task] = None
+    
+    @property
+    def is_open(self) -> bool:
+        return self.websocket is not None and not self.closed and not self.reconnecting
+    
+    @property
+    def busy(self) -> bool:
+        return bool(self.inflight) or bool(self.uploads)
+    
+    @property
+    def load(self) -> int:
+        return len(self.inflight) + len(self.uploads)
+    
+    async def open(self, uri: str, token: str, compression: List[str]) -> bool:
+        self._uri = uri
+        self._token = token
+        self._compression = compression
+        auth_result = await self._handshake()
+        
+        if auth_result.get("status") != "authenticated":
+            logger.error(f"Authentication failed: {auth_result}")
+            await self.websocket.close()
+            self.closed = True
+            return False
+        
+        logger.info(
+            f"Opened {self.lane} connection: wire encoding {self.codec.name}, "
+            f"compression {self.compressor.algorithm or 'off'}"
+        )
+        self._start()
+        return True
+    
+    async def _handshake(self) -> Dict[str, Any]:
+        self.websocket = await websockets.connect(
+            self._uri,
+            max_size=settings.mcp.max_message_size,
+            compression=None,
+            open_timeout=settings.network.connection_timeout
+        )
+        
+        await self.websocket.send(json.dumps({
+            "token": self._token,
+            "encodings": available_encodings(settings.mcp.wire_encodings),
+            "compression": self._compression,
+            "session_id": self.session_id
+        }))
+        auth_result = json.loads(await self.websocket.recv())
+        
+        if auth_result.get("status") == "authenticated":
+            self.codec = get_codec(auth_result.get("encoding", "json"))
+            self.compressor = Compressor(auth_result.get("compression"), max_size=settings.mcp.max_message_size)
+            self.session_id = auth_result.get("session_id")
+        return auth_result
+    
+    def _start(self):
+        self.last_used = time.monotonic()
+        self._ready.set()
+        self._receiver = asyncio.create_task(self._receive_messages())
+    
+    async def _wait_ready(self):
+        if self.reconnecting:
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout=settings.mcp.reconnect_max_delay * 2)
+            except asyncio.TimeoutError:
+                pass
+        if self.closed or self.reconnecting:
+            raise ConnectionError(CONNECTION_LOST)
+    
+    async def send(self, payload: Dict[str, Any]):
+        await self._wait_ready()
+        self.last_used = time.monotonic()
+        frames = encode_fragments(self.codec, payload)
+        try:
+            if isinstance(frames, (str, bytes)):
+                await self.websocket.send(self.compressor.compress_frame(frames))
+            else:
+                await self.websocket.send(self.compressor.compress_fragments(frames))
+        except websockets.exceptions.ConnectionClosed:
+            if payload.get("request_id") not in self.inflight:
+                raise ConnectionError(CONNECTION_LOST)
+    
+    async def send_frame(self, frame: bytes):
+        await self._wait_ready()
+        self.last_used = time.monotonic()
+        try:
+            await self.websocket.send(self.compressor.compress_frame(frame))
+        except websockets.exceptions.ConnectionClosed:
+            raise ConnectionError(CONNECTION_LOST)
+    
+    async def ping(self) -> bool:
+        return await self.measure_rtt() is not None
+    
+    async def measure_rtt(self) -> Optional[float]:
+        try:
+            started = time.perf_counter()
+            pong = await self.websocket.ping()
+            await asyncio.wait_for(pong, timeout=PING_TIMEOUT)
+            return round((time.perf_counter() - started) * 1000, 2)
+        except Exception:
+            return None
+    
+    def drop(self):
+        if self.websocket is not None and self.websocket.transport is not None:
+            self.websocket.transport.abort()
+    
+    async def close(self):
+        self.closed = True
+        self._ready.set()
+        if self.websocket:
+            try:
+                await self.websocket.close()
+            except Exception:
+                pass
+        if self._receiver and self._receiver is not asyncio.current_task():
+            await asyncio.gather(self._receiver, return_exceptions=True)
+    
+    async def _receive_messages(self):
+        client = self.client
+        try:
+            async for message in self.websocket:
+                self.last_used = time.monotonic()
+                try:
+                    self._dispatch(message)
+                except (ProtocolError, zlib.error, ValueError, struct.error, UnicodeDecodeError) as e:
+                    logger.warning(f"Dropping undecodable frame on {self.lane} connection: {e}")
+        except websockets.exceptions.ConnectionClosed:
+            if not self.closed:
+                logger.warning(f"{self.lane.capitalize()} connection closed by server")
+        except Exception as e:
+            logger.error(f"Error receiving messages: {e}")
+        
+        if self.closed:
+            self._fail_uploads()
+            await self._fail(list(self.inflight))
+        else:
+            client._transport_error(f"{self.lane} connection lost")
+            await self._fail([
+                request_id for request_id, replay in self.inflight.items()
+                if replay is None and request_id in client.pending_requests
+            ])
+            await self._reconnect()
+    
+    def _dispatch(self, message: Frame):
+        client = self.client
+        message = self.compressor.decompress_frame(message)
+        if is_chunk_frame(message):
+            request_id, offset, data = unpack_chunk(message)
+            stream = client.streams.get(request_id)
+            if stream:
+                stream.put_chunk(offset, data)
+            return
+        
+        data = self.codec.decode(message)
+        if not isinstance(data, dict):
+            raise ProtocolError(f"Expected a message object, got {type(data).__name__}")
+        request_id = data.get("request_id")
+        
+        if data.get("type") == "upload_ack":
+            tracker = client.uploads.get(data.get("upload_id"))
+            if tracker:
+                tracker.ack(data.get("offset"), data.get("error"))
+        elif request_id in client.streams:
+            stream = client.streams[request_id]
+            if "event" in data:
+                stream.put_event(data["event"])
+            else:
+                client.streams.pop(request_id, None)
+                client._unbind(request_id)
+                stream.finish(data.get("result"), data.get("error"))
+        elif request_id in client.pending_requests:
+            future = client.pending_requests.pop(request_id)
+            if future.done():
+                return
+            if "error" in data:
+                future.set_exception(Exception(data["error"]))
+            else:
+                future.set_result(data.get("result"))
+    
+    async def _reconnect(self):
+        self.reconnecting = True
+        self._ready.clear()
+        self._fail_uploads()
+        started = time.monotonic()
+        
+        for attempt in range(settings.mcp.reconnect_attempts):
+            if attempt:
+                delay = settings.mcp.reconnect_backoff * 2 ** (attempt - 1)
+                await asyncio.sleep(min(delay, settings.mcp.reconnect_max_delay))
+            if self.closed:
+                break
+            
+            try:
+                if attempt:
+                    self._uri = await self.client._server_uri(refresh=True)
+                auth_result = await self._handshake()
+            except Exception as e:
+                logger.debug(f"Reconnect attempt {attempt + 1} failed: {e}")
+                continue
+            
+            if auth_result.get("status") != "authenticated":
+                logger.error(f"Re-authentication failed: {auth_result}")
+                break
+            
+            self.reconnecting = False
+            self.reconnects += 1
+            resumed = auth_result.get("resumed", False)
+            logger.info(
+                f"Reconnected {self.lane} connection in {(time.monotonic() - started) * 1000:.0f} ms "
+                f"({'session resumed' if resumed else 'new session'})"
+            )
+            self._start()
+            await self._recover(resumed, set(auth_result.get("known_requests", [])))
+            return
+        
+        logger.error(f"Could not reconnect {self.lane} connection")
+        self.client._transport_error(f"could not reconnect {self.lane} connection")
+        self.reconnecting = False
+        self.closed = True
+        self._ready.set()
+        self._fail_uploads()
+        await self._fail(list(self.inflight))
+    
+    async def _recover(self, resumed: bool, known_requests: Set[str]):
+        lost = [request_id for request_id in self.inflight if not (resumed and request_id in known_requests)]
+        failed = []
+        
+        for request_id in lost:
+            payload = self.inflight.get(request_id)
+            if payload is None or request_id not in self.client.pending_requests:
+                failed.append(request_id)
+                continue
+            try:
+                await self.send(payload)
+                logger.debug(f"Replayed request {request_id}")
+            except ConnectionError:
+                failed.append(request_id)
+        
+        await self._fail(failed)
+    
+    async def _fail(self, request_ids: List[str]):
+        client = self.client
+        for request_id in request_ids:
+            client._unbind(request_id)
+            future = client.pending_requests.pop(request_id, None)
+            if future and not future.done():
+                future.set_exception(ConnectionError(CONNECTION_LOST))
+            stream = client.streams.pop(request_id, None)
+            if stream:
+                stream.finish(None, CONNECTION_LOST)
+    
+    def _fail_uploads(self):
+        for upload_id in self.uploads:
+            tracker = self.client.uploads.get(upload_id)
+            if tracker:
+                tracker.ack(error=CONNECTION_LOST)
+
+
+class ConnectionPool:
+    def __init__(
+        self,
+        open_connection: Callable[[str], Awaitable[Optional[MCPConnection]]],
+        size: int,
+        idle_timeout: float
+    ):
+        self.open_connection = open_connection
+        self.size = max(1, size)
+        self.idle_timeout = idle_timeout
+        self.primary: Optional[MCPConnection] = None
+        self.bulk: List[MCPConnection] = []
+        self.draining: List[MCPConnection] = []
+        self.reaped = 0
+        self.migrations = 0
+        self._opening = asyncio.Lock()
+        self._reaper: Optional[asyncio.Task] = None
+    
+    @property
+    def connected(self) -> bool:
+        return self.primary is not None and not self.primary.closed
+    
+    @property
+    def connections(self) -> List[MCPConnection]:
+        return [connection for connection in [self.primary, *self.bulk, *self.draining] if connection]
+    
+    async def start(self) -> bool:
+        self.primary = await self.open_connection("interactive")
+        if self.primary is None:
+            return False
+        if self.idle_timeout > 0:
+            self._reaper = asyncio.create_task(self._reap_idle())
+        return True
+    
+    async def acquire(self, lane: str) -> MCPConnection:
+        if lane != "bulk" or self.size == 1:
+            return self.primary
+        
+        candidates = [connection for connection in self.bulk if not connection.closed]
+        least_loaded = min(candidates, key=lambda connection: connection.load, default=None)
+        if least_loaded and not least_loaded.busy:
+            return least_loaded
+        
+        async with self._opening:
+            self.bulk = [connection for connection in self.bulk if not connection.closed]
+            if len(self.bulk) < self.size - 1:
+                try:
+                    connection = await self.open_connection("bulk")
+                except Exception as e:
+                    logger.warning(f"Could not open bulk connection: {e}")
+                    connection = None
+                if connection:
+                    self.bulk.append(connection)
+                    return connection
+        
+        return least_loaded or self.primary
+    
+    async def migrate(self) -> bool:
+        connection = await self.open_connection("interactive")
+        if connection is None:
+            return False
+        
+        previous, self.primary = self.primary, connection
+        self.draining.extend(c for c in [previous, *self.bulk] if c and not c.closed)
+        self.bulk = []
+        self.migrations += 1
+        await self._drain()
+        return True
+    
+    async def _drain(self):
+        for connection in list(self.draining):
+            if connection.closed or not connection.busy:
+                self.draining.remove(connection)
+                await connection.close()
+    
+    async def _reap_idle(self):
+        interval = max(1.0, self.idle_timeout / 2)
+        while True:
+            await asyncio.sleep(interval)
+            now = time.monotonic()
+            await self._drain()
+            
+            for connection in list(self.bulk):
+                if connection.closed:
+                    self.bulk.remove(connection)
+                elif not connection.busy and now - connection.last_used > self.idle_timeout:
+                    self.bulk.remove(connection)
+                    self.reaped += 1
+                    await connection.close()
+                    logger.debug("Reaped idle bulk connection")
+            
+            primary = self.primary
+            if primary and primary.is_open and not primary.busy and now - primary.last_used > interval:
+                if not await primary.ping():
+                    logger.warning("Interactive connection failed health check, reconnecting")
+                    primary.drop()
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "size": self.size,
+            "open": int(self.connected) + sum(connection.is_open for connection in self.bulk),
+            "bulk_open": sum(connection.is_open for connection in self.bulk),
+            "inflight": sum(connection.load for connection in self.connections),
+            "draining": len(self.draining),
+            "migrations": self.migrations,
+            "reaped": self.reaped,
+            "reconnects": sum(connection.reconnects for connection in self.connections)
+        }
+    
+    def compression_stats(self) -> Dict[str, Any]:
+        total = CompressionStats()
+        for connection in self.connections:
+            for name, value in connection.compressor.stats.__dict__.items():
+                setattr(total, name, getattr(total, name) + value)
+        return total.to_dict()
+    
+    async def close(self):
+        if self._reaper:
+            self._reaper.cancel()
+            await asyncio.gather(self._reaper, return_exceptions=True)
+        for connection in self.connections:
+            await connection.close()
+        self.bulk = []
+        self.draining = []
@@ -0,0 +1,114 @@
+import asyncio
+import statistics
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple
+
+from ..core.config import settings
+from ..utils.logger import setup_logger
+from ..utils.network_detector import NetworkPath
+
+logger = setup_logger("link_monitor", settings.log.level, settings.log.log_file)
+
+FAILURES_BEFORE_RECONNECT = 2
+RTT_SWITCH_RATIO = 0.5
+
+
+class LinkMonitor:
+    def __init__(self, client, interval: float, window: int, path_check_interval: float):
+        self.client = client
+        self.interval = interval
+        self.path_check_interval = path_check_interval
+        self.rtt_samples: Deque[Tuple[float, Optional[float]]] = deque(maxlen=window)
+        self.transfers: Deque[Tuple[float, int, float]] = deque(maxlen=window)
+        self.path_switches = 0
+        self._consecutive_failures = 0
+        self._last_path_check = time.monotonic()
+        self._task: Optional[asyncio.Task] = None
+    
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+    
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+    
+    def record_transfer(self, nbytes: int, seconds: float):
+        if nbytes > 0 and seconds > 0:
+            self.transfers.append((time.monotonic(), nbytes, seconds))
+    
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.sample()
+                if time.monotonic() - self._last_path_check >= self.path_check_interval:
+                    self._last_path_check = time.monotonic()
+                    await self.check_path()
+            except Exception as e:
+                logger.error(f"Error monitoring link: {e}")
+    
+    async def sample(self):
+        pool = self.client.pool
+        primary = pool.primary if pool else None
+        if primary is None or not primary.is_open:
+            return
+        
+        rtt_ms = await primary.measure_rtt()
+        self.rtt_samples.append((time.monotonic(), rtt_ms))
+        
+        if rtt_ms is not None:
+            self._consecutive_failures = 0
+            return
+        
+        self._consecutive_failures += 1
+        if self._consecutive_failures >= FAILURES_BEFORE_RECONNECT:
+            logger.warning("Link unresponsive, forcing reconnect")
+            self._consecutive_failures = 0
+            primary.drop()
+    
+    async def check_path(self):
+        path = await self.client.network_detector.select_path(refresh=True)
+        if path is None or path.address == self.client.server_address:
+            return
+        
+        if self._is_better(path):
+            previous = self.client.server_address
+            if await self.client.switch_path(path):
+                self.path_switches += 1
+                self.rtt_samples.clear()
+                logger.info(f"Switched path {previous} -> {path.address} ({path.connection_type}, {path.rtt_ms} ms)")
+    
+    def _is_better(self, path: NetworkPath) -> bool:
+        if path.connection_type == "local" and self.client.connection_type != "local":
+            return True
+        current = self._rtt_values()
+        return bool(current) and path.rtt_ms < statistics.median(current) * RTT_SWITCH_RATIO
+    
+    def _rtt_values(self):
+        return [rtt for _, rtt in self.rtt_samples if rtt is not None]
+    
+    def stats(self) -> Dict[str, Any]:
+        rtts = self._rtt_values()
+        pings = len(self.rtt_samples)
+        transferred = sum(nbytes for _, nbytes, _ in self.transfers)
+        transfer_seconds = sum(seconds for _, _, seconds in self.transfers)
+        
+        return {
+            "path": self.client.server_address,
+            "connection_type": self.client.connection_type,
+            "rtt_ms": {
+                "last": rtts[-1],
+                "min": min(rtts),
+                "avg": round(statistics.fmean(rtts), 2),
+                "p95": round(sorted(rtts)[int(0.95 * (len(rtts) - 1))], 2),
+                "jitter": round(statistics.pstdev(rtts), 2)
+            } if rtts else None,
+            "ping_loss": round((pings - len(rtts)) / pings, 3) if pings else None,
+            "throughput_bps": round(transferred / transfer_seconds) if transfer_seconds else None,
+            "samples": pings,
+            "path_switches": self.path_switches
+        }
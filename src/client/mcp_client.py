@@ -1,106 +1,478 @@
 import asyncio
-import json
-from typing import Any, Dict, Optional
+import hashlib
+import time
+from pathlib import Path
+from typing import Any, AsyncIterator, BinaryIO, Callable, Dict, List, Optional, Set, Tuple, Union
 import websockets
 from websockets.client import WebSocketClientProtocol
 
 from ..core.config import settings
+from ..core.compression import Compressor, available_algorithms
+from ..core.protocol import DEFAULT_CODEC, MAX_CHUNK_SIZE, JsonCodec, MsgpackCodec, pack_chunk
+from ..utils.delta import DeltaError, apply_delta, compute_delta, file_signatures
 from ..utils.logger import setup_logger
-from ..utils.network_detector import NetworkDetector
+from ..utils.network_detector import NetworkDetector, NetworkPath
+from .batching import RequestBatcher
+from .cache import ResponseCache, cache_key
+from .connection_pool import CONNECTION_LOST, ConnectionPool, MCPConnection
+from .link_monitor import LinkMonitor
+from .streams import StreamError, StreamHandle, UploadTracker
 
 logger = setup_logger("mcp_client", settings.log.level, settings.log.log_file)
 
+UPLOAD_WINDOW_SIZE = 8 * 1024 * 1024
+UPLOAD_RETRIES = 3
+RECONNECT_POLL_INTERVAL = 0.5
+BATCHABLE_TOOLS = {"get_system_info", "get_connection_stats", "get_metrics"}
+IDEMPOTENT_TOOLS = {
+    "list_files", "read_file", "get_system_info", "get_connection_stats", "get_metrics", "search_files",
+    "file_signatures", "file_delta", "directory_manifest", "document_search"
+}
+BULK_TOOLS = {"read_file_stream", "file_signatures", "file_delta", "apply_delta", "directory_manifest"}
+
 class MCPClient:
     def __init__(self, server_ip: str, server_port: int, token: str):
         self.server_ip = server_ip
         self.server_port = server_port
         self.token = token
-        self.websocket: Optional[WebSocketClientProtocol] = None
+        self.pool: Optional[ConnectionPool] = None
         self.request_counter = 0
         self.pending_requests: Dict[str, asyncio.Future] = {}
+        self.streams: Dict[str, StreamHandle] = {}
+        self.uploads: Dict[str, UploadTracker] = {}
+        self.routes: Dict[str, MCPConnection] = {}
+        self.transport_listeners: List[Callable[[str], None]] = []
+        self._compression_offer: List[str] = []
+        self.cache: Optional[ResponseCache] = None
+        if settings.cache.enabled:
+            self.cache = ResponseCache(
+                settings.cache.max_bytes,
+                settings.cache.path if settings.cache.persist else None
+            )
+            self.cache.load()
+        self.batcher: Optional[RequestBatcher] = None
+        if settings.mcp.batch_window_ms > 0:
+            self.batcher = RequestBatcher(
+                self._request,
+                self._send_batch,
+                settings.mcp.batch_window_ms / 1000,
+                settings.mcp.batch_max_calls
+            )
+        self._background_tasks: Set[asyncio.Task] = set()
+        self.server_address = server_ip
+        self.connection_type = "unknown"
+        self.monitor: Optional[LinkMonitor] = None
+        if settings.network.link_monitor_enabled:
+            self.monitor = LinkMonitor(
+                self,
+                settings.network.link_monitor_interval,
+                settings.network.link_monitor_window,
+                settings.network.path_check_interval
+            )
         self.network_detector = NetworkDetector(
             settings.network.local_subnet,
             server_ip,
-            settings.network.connection_timeout
+            settings.network.connection_timeout,
+            port=server_port,
+            candidates=settings.network.server_candidates(),
+            cache_ttl=settings.network.path_cache_ttl
         )
     
+    @property
+    def websocket(self) -> Optional[WebSocketClientProtocol]:
+        if self.pool is None or not self.pool.connected:
+            return None
+        return self.pool.primary.websocket
+    
+    @property
+    def codec(self) -> Union[JsonCodec, MsgpackCodec]:
+        return self.pool.primary.codec if self.pool and self.pool.primary else DEFAULT_CODEC
+    
+    @property
+    def compressor(self) -> Compressor:
+        return self.pool.primary.compressor if self.pool and self.pool.primary else Compressor()
+    
     async def connect(self) -> bool:
         try:
             network_status = await self.network_detector.detect_network_status()
-            logger.info(f"Network status: {network_status.connection_type}")
+            logger.info(
+                f"Network status: {network_status.connection_type} via "
+                f"{network_status.server_address} ({network_status.rtt_ms} ms)"
+            )
             
             if not network_status.can_reach_ubuntu:
                 logger.error("Cannot reach Ubuntu server")
                 return False
             
-            uri = f"ws://{self.server_ip}:{self.server_port}"
-            self.websocket = await websockets.connect(uri)
+            self.server_address = network_status.server_address or self.server_ip
+            self.connection_type = network_status.connection_type
             
-            auth_message = json.dumps({"token": self.token})
-            await self.websocket.send(auth_message)
-            
-            response = await self.websocket.recv()
-            auth_result = json.loads(response)
-            
-            if auth_result.get("status") == "authenticated":
+            self._compression_offer = self._offered_compression(network_status.connection_type)
+            self.pool = ConnectionPool(
+                self._open_connection,
+                settings.mcp.pool_size,
+                settings.mcp.pool_idle_timeout
+            )
+            if await self.pool.start():
                 logger.info("Successfully authenticated with MCP server")
-                asyncio.create_task(self._receive_messages())
+                if self.monitor:
+                    self.monitor.start()
                 return True
-            else:
-                logger.error(f"Authentication failed: {auth_result}")
-                return False
-                
+            return False
+        
         except Exception as e:
             logger.error(f"Connection error: {e}")
             return False
     
-    async def _receive_messages(self):
-        try:
-            async for message in self.websocket:
-                data = json.loads(message)
-                request_id = data.get("request_id")
-                
-                if request_id in self.pending_requests:
-                    future = self.pending_requests.pop(request_id)
-                    if "error" in data:
-                        future.set_exception(Exception(data["error"]))
-                    else:
-                        future.set_result(data.get("result"))
-        except websockets.exceptions.ConnectionClosed:
-            logger.warning("Connection closed by server")
-        except Exception as e:
-            logger.error(f"Error receiving messages: {e}")
+    async def _open_connection(self, lane: str) -> Optional[MCPConnection]:
+        connection = MCPConnection(self, lane)
+        if await connection.open(await self._server_uri(), self.token, self._compression_offer):
+            return connection
+        return None
     
-    async def _send_request(self, tool: str, params: Dict[str, Any]) -> Any:
-        if not self.websocket:
-            raise ConnectionError("Not connected to server")
+    async def _server_uri(self, refresh: bool = False) -> str:
+        if refresh:
+            path = await self.network_detector.select_path(refresh=True)
+            if path:
+                self.server_address = path.address
+        host = f"[{self.server_address}]" if ":" in self.server_address else self.server_address
+        return f"ws://{host}:{self.server_port}"
+    
+    async def switch_path(self, path: NetworkPath) -> bool:
+        previous = (self.server_address, self.connection_type, self._compression_offer)
+        self.server_address = path.address
+        self.connection_type = path.connection_type
+        self._compression_offer = self._offered_compression(path.connection_type)
+        
+        if self.pool and await self.pool.migrate():
+            return True
         
+        self.server_address, self.connection_type, self._compression_offer = previous
+        logger.warning(f"Could not migrate to {path.address}, staying on {self.server_address}")
+        return False
+    
+    async def _connection(self, lane: str) -> MCPConnection:
+        if self.pool is None or not self.pool.connected:
+            raise ConnectionError("Not connected to server")
+        return await self.pool.acquire(lane)
+    
+    def _bind(self, request_id: str, connection: MCPConnection, replay: Optional[Dict[str, Any]] = None):
+        self.routes[request_id] = connection
+        connection.inflight[request_id] = replay
+    
+    def _unbind(self, request_id: str) -> Optional[MCPConnection]:
+        connection = self.routes.pop(request_id, None)
+        if connection:
+            connection.inflight.pop(request_id, None)
+        return connection
+    
+    def _transport_error(self, reason: str):
+        self.network_detector.invalidate()
+        for listener in self.transport_listeners:
+            listener(reason)
+    
+    def _offered_compression(self, connection_type: str) -> List[str]:
+        mode = settings.mcp.compression
+        if mode == "always" or (mode == "auto" and connection_type == "vpn"):
+            return available_algorithms(settings.mcp.compression_algorithms)
+        return []
+    
+    def _next_request_id(self) -> str:
         self.request_counter += 1
-        request_id = f"req_{self.request_counter}"
+        return f"req_{self.request_counter}"
+    
+    async def _send_request(self, tool: str, params: Dict[str, Any]) -> Any:
+        if self.batcher is not None and _is_batchable(tool, params):
+            return await self.batcher.submit(tool, params)
+        return await self._request(tool, params)
+    
+    async def _send_batch(self, calls: List[Tuple[str, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        result = await self._request("batch", _batch_params(calls, None))
+        return result["results"]
+    
+    async def _request(
+        self,
+        tool: str,
+        params: Dict[str, Any],
+        connection: Optional[MCPConnection] = None
+    ) -> Any:
+        connection = connection or await self._connection(_lane(tool))
+        request_id = self._next_request_id()
         
-        message = json.dumps({
+        payload = {
             "request_id": request_id,
             "tool": tool,
             "params": params
-        })
+        }
         
-        future = asyncio.Future()
+        future = asyncio.get_running_loop().create_future()
         self.pending_requests[request_id] = future
-        
-        await self.websocket.send(message)
+        self._bind(request_id, connection, payload if _is_idempotent(tool, params) else None)
         
         try:
-            result = await asyncio.wait_for(future, timeout=60.0)
-            return result
+            await connection.send(payload)
+            timeout = settings.mcp.request_timeout or None
+            waited_for_link = False
+            while True:
+                try:
+                    return await asyncio.wait_for(asyncio.shield(future), timeout=timeout)
+                except asyncio.TimeoutError:
+                    route = self.routes.get(request_id)
+                    if route is not None and route.reconnecting:
+                        timeout, waited_for_link = RECONNECT_POLL_INTERVAL, True
+                    elif waited_for_link:
+                        timeout, waited_for_link = settings.mcp.request_timeout, False
+                    else:
+                        raise
         except asyncio.TimeoutError:
-            self.pending_requests.pop(request_id, None)
+            future.cancel()
+            self._schedule_cancel(request_id)
             raise TimeoutError(f"Request {request_id} timed out")
+        except asyncio.CancelledError:
+            future.cancel()
+            self._schedule_cancel(request_id)
+            raise
+        finally:
+            self.pending_requests.pop(request_id, None)
+            if not future.cancelled():
+                self._unbind(request_id)
+    
+    async def _cached_request(self, tool: str, params: Dict[str, Any]) -> Any:
+        if self.cache is None:
+            return await self._send_request(tool, params)
+        
+        key = cache_key(tool, params)
+        cached = self.cache.get(key)
+        request_params = {**params, "if_none_match": cached[0]} if cached else params
+        result = await self._send_request(tool, request_params)
+        
+        if cached and result.get("not_modified"):
+            self.cache.record(hit=True)
+            return cached[1]
+        
+        self.cache.record(hit=False)
+        if "error" in result or "etag" not in result:
+            self.cache.discard(key)
+        else:
+            self.cache.put(key, result["etag"], result)
+        return result
+    
+    async def _open_stream(
+        self,
+        tool: str,
+        params: Dict[str, Any],
+        idle_timeout: Optional[float] = 60.0
+    ) -> StreamHandle:
+        connection = await self._connection(_lane(tool))
+        request_id = self._next_request_id()
+        stream = StreamHandle(request_id, self._abort_stream, idle_timeout=idle_timeout, on_credit=self._grant_credit)
+        self.streams[request_id] = stream
+        self._bind(request_id, connection)
+        
+        try:
+            await connection.send({
+                "request_id": request_id,
+                "tool": tool,
+                "params": params,
+                "window": stream.window
+            })
+        except Exception:
+            self.streams.pop(request_id, None)
+            self._unbind(request_id)
+            raise
+        
+        return stream
+    
+    async def _grant_credit(self, request_id: str, nbytes: int):
+        connection = self.routes.get(request_id)
+        if connection is None or not connection.is_open:
+            return
+        try:
+            await connection.send({"type": "credit", "request_id": request_id, "bytes": nbytes})
+        except ConnectionError:
+            pass
+    
+    def _abort_stream(self, request_id: str):
+        self.streams.pop(request_id, None)
+        self._schedule_cancel(request_id)
     
-    async def list_files(self, path: str, recursive: bool = False) -> Dict[str, Any]:
-        return await self._send_request("list_files", {"path": path, "recursive": recursive})
+    def _schedule_cancel(self, request_id: str):
+        task = asyncio.create_task(self.cancel_request(request_id))
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+    
+    async def cancel_request(self, request_id: str) -> bool:
+        future = self.pending_requests.pop(request_id, None)
+        if future and not future.done():
+            future.cancel()
+        
+        connection = self._unbind(request_id)
+        if connection is None or not connection.is_open:
+            return False
+        
+        try:
+            await connection.send({"type": "cancel", "request_id": request_id})
+            return True
+        except (ConnectionError, websockets.exceptions.ConnectionClosed):
+            return False
+    
+    async def list_files(
+        self,
+        path: str,
+        recursive: bool = False,
+        page_size: Optional[int] = None,
+        cursor: Optional[str] = None
+    ) -> Dict[str, Any]:
+        params = {"path": path, "recursive": recursive}
+        if page_size is not None:
+            params["page_size"] = page_size
+        if cursor is not None:
+            params["cursor"] = cursor
+        if page_size is None and cursor is None:
+            return await self._cached_request("list_files", params)
+        return await self._send_request("list_files", params)
+    
+    async def iter_list_pages(
+        self,
+        path: str,
+        recursive: bool = False,
+        page_size: int = 500
+    ) -> AsyncIterator[Dict[str, Any]]:
+        page = await self.list_files(path, recursive, page_size=page_size)
+        while True:
+            yield page
+            cursor = page.get("next_cursor")
+            if "error" in page or not cursor:
+                return
+            page = await self.list_files(path, recursive, page_size=page_size, cursor=cursor)
     
     async def read_file(self, path: str, encoding: str = "utf-8") -> Dict[str, Any]:
-        return await self._send_request("read_file", {"path": path, "encoding": encoding})
+        return await self._cached_request("read_file", {"path": path, "encoding": encoding})
+    
+    async def iter_file(
+        self,
+        path: str,
+        offset: int = 0,
+        length: Optional[int] = None,
+        chunk_size: Optional[int] = None
+    ) -> AsyncIterator[memoryview]:
+        stream = await self._open_stream("read_file_stream", {
+            "path": path,
+            "offset": offset,
+            "length": length,
+            "chunk_size": chunk_size
+        })
+        
+        async with stream:
+            async for _, data in stream:
+                yield data
+    
+    async def download(
+        self,
+        path: str,
+        dest: str,
+        offset: int = 0,
+        length: Optional[int] = None
+    ) -> Dict[str, Any]:
+        dest_path = Path(dest).expanduser()
+        await asyncio.to_thread(dest_path.parent.mkdir, parents=True, exist_ok=True)
+        mode = "r+b" if offset and await asyncio.to_thread(dest_path.exists) else "wb"
+        
+        stream = await self._open_stream("read_file_stream", {
+            "path": path,
+            "offset": offset,
+            "length": length
+        })
+        
+        written = 0
+        started = time.perf_counter()
+        async with stream:
+            f = await asyncio.to_thread(open, dest_path, mode)
+            try:
+                async for chunk_offset, data in stream:
+                    await asyncio.to_thread(_write_at, f, chunk_offset, data)
+                    written += len(data)
+                
+                if length is None:
+                    await asyncio.to_thread(f.truncate)
+            finally:
+                await asyncio.to_thread(f.close)
+        
+        self._record_transfer(written, started)
+        return {**stream.result, "dest": str(dest_path), "written": written}
+    
+    async def delta_download(self, path: str, dest: str) -> Dict[str, Any]:
+        dest_path = Path(dest).expanduser()
+        if not await asyncio.to_thread(dest_path.is_file):
+            return await self.download(path, dest)
+        
+        signatures = await asyncio.to_thread(file_signatures, dest_path)
+        delta = await self._send_request("file_delta", {"path": path, "signatures": signatures})
+        if "error" in delta:
+            return delta
+        if delta.get("too_large"):
+            return await self.download(path, dest)
+        
+        try:
+            size = await asyncio.to_thread(
+                apply_delta, dest_path, delta["ops"], delta["block_size"], dest_path, delta["sha256"]
+            )
+        except DeltaError as e:
+            logger.warning(f"Delta download of {path} failed, falling back to full transfer: {e}")
+            return await self.download(path, dest)
+        
+        return {
+            "path": delta["path"],
+            "dest": str(dest_path),
+            "size": size,
+            "literal_bytes": delta["literal_bytes"],
+            "copied_bytes": size - delta["literal_bytes"]
+        }
+    
+    async def delta_upload(self, local_path: str, remote_path: str, mtime_ns: Optional[int] = None) -> Dict[str, Any]:
+        source = Path(local_path).expanduser()
+        signatures = await self._send_request("file_signatures", {"path": remote_path})
+        if "error" in signatures:
+            return await self.upload(local_path, remote_path, mtime_ns=mtime_ns)
+        
+        ops, literal_bytes, sha256 = await asyncio.to_thread(compute_delta, source, signatures)
+        if literal_bytes > settings.mcp.max_message_size // 2:
+            return await self.upload(local_path, remote_path, mtime_ns=mtime_ns)
+        
+        params = {
+            "path": remote_path,
+            "ops": ops,
+            "block_size": signatures["block_size"],
+            "sha256": sha256
+        }
+        if mtime_ns is not None:
+            params["mtime_ns"] = mtime_ns
+        result = await self._send_request("apply_delta", params)
+        if "error" in result:
+            return result
+        
+        return {
+            **result,
+            "literal_bytes": literal_bytes,
+            "copied_bytes": result["size"] - literal_bytes
+        }
+    
+    async def directory_manifest(
+        self,
+        path: str,
+        include: Optional[List[str]] = None,
+        exclude: Optional[List[str]] = None,
+        checksum: bool = False
+    ) -> Dict[str, Any]:
+        return await self._send_request("directory_manifest", {
+            "path": path,
+            "include": include,
+            "exclude": exclude,
+            "checksum": checksum
+        })
+    
+    async def remove_files(self, path: str, files: List[str]) -> Dict[str, Any]:
+        return await self._send_request("remove_files", {"path": path, "files": files})
     
     async def write_file(self, path: str, content: str, encoding: str = "utf-8") -> Dict[str, Any]:
         return await self._send_request("write_file", {
@@ -109,25 +481,224 @@ class MCPClient:
             "encoding": encoding
         })
     
+    async def upload(
+        self,
+        local_path: str,
+        remote_path: str,
+        upload_id: Optional[str] = None,
+        chunk_size: Optional[int] = None,
+        mtime_ns: Optional[int] = None
+    ) -> Dict[str, Any]:
+        source = Path(local_path).expanduser()
+        source_stat = source.stat()
+        chunk_size = min(chunk_size or settings.mcp.stream_chunk_size, MAX_CHUNK_SIZE)
+        
+        if upload_id is None:
+            fingerprint = f"{source.resolve()}|{remote_path}|{source_stat.st_size}|{source_stat.st_mtime_ns}"
+            upload_id = hashlib.sha1(fingerprint.encode()).hexdigest()
+        
+        resumed_from = None
+        for attempt in range(UPLOAD_RETRIES):
+            try:
+                result, start = await self._upload_once(source, remote_path, upload_id, chunk_size, mtime_ns)
+            except (ConnectionError, StreamError) as e:
+                if attempt == UPLOAD_RETRIES - 1 or str(e) != CONNECTION_LOST:
+                    raise
+                logger.warning(f"Upload {upload_id} interrupted, resuming")
+                continue
+            
+            if resumed_from is None:
+                resumed_from = start
+            if "error" not in result:
+                result["resumed_from"] = resumed_from
+            return result
+    
+    async def _upload_once(
+        self,
+        source: Path,
+        remote_path: str,
+        upload_id: str,
+        chunk_size: int,
+        mtime_ns: Optional[int]
+    ) -> Tuple[Dict[str, Any], int]:
+        connection = await self._connection("bulk")
+        connection.uploads.add(upload_id)
+        try:
+            opened = await self._request(
+                "upload_open",
+                {"path": remote_path, "upload_id": upload_id},
+                connection=connection
+            )
+            if "error" in opened:
+                return opened, 0
+            
+            start = opened["offset"]
+            digest = hashlib.sha256()
+            if start:
+                await asyncio.to_thread(_hash_prefix, digest, source, start)
+            tracker = UploadTracker(upload_id, start)
+            self.uploads[upload_id] = tracker
+            
+            try:
+                position = start
+                started = time.perf_counter()
+                f = await asyncio.to_thread(open, source, "rb")
+                try:
+                    while True:
+                        data = await asyncio.to_thread(_read_at, f, position, chunk_size)
+                        if not data:
+                            break
+                        
+                        await tracker.wait_for(position + len(data) - UPLOAD_WINDOW_SIZE)
+                        await connection.send_frame(pack_chunk(upload_id, position, data))
+                        digest.update(data)
+                        position += len(data)
+                finally:
+                    await asyncio.to_thread(f.close)
+                
+                await tracker.wait_for(position)
+                self._record_transfer(position - start, started)
+            finally:
+                self.uploads.pop(upload_id, None)
+            
+            result = await self._request("upload_commit", {
+                "upload_id": upload_id,
+                "size": position,
+                "sha256": digest.hexdigest(),
+                "mtime_ns": mtime_ns
+            }, connection=connection)
+            return result, start
+        finally:
+            connection.uploads.discard(upload_id)
+    
+    def _record_transfer(self, nbytes: int, started: float):
+        if self.monitor:
+            self.monitor.record_transfer(nbytes, time.perf_counter() - started)
+    
     async def execute_command(self, command: str, cwd: Optional[str] = None) -> Dict[str, Any]:
         return await self._send_request("execute_command", {"command": command, "cwd": cwd})
     
+    async def execute_command_stream(
+        self,
+        command: str,
+        cwd: Optional[str] = None,
+        timeout: Optional[float] = None,
+        max_output: Optional[int] = None
+    ) -> StreamHandle:
+        return await self._open_stream("execute_command_stream", {
+            "command": command,
+            "cwd": cwd,
+            "timeout": timeout,
+            "max_output": max_output
+        }, idle_timeout=None)
+    
+    async def signal_command(self, request_id: str, signal_name: str = "SIGTERM") -> Dict[str, Any]:
+        return await self._request("signal_command", {
+            "request_id": request_id,
+            "signal_name": signal_name
+        }, connection=self.routes.get(request_id))
+    
     async def get_system_info(self) -> Dict[str, Any]:
         return await self._send_request("get_system_info", {})
     
-    async def search_files(self, path: str, pattern: str, content_search: bool = False) -> Dict[str, Any]:
-        return await self._send_request("search_files", {
+    async def get_connection_stats(self) -> Dict[str, Any]:
+        if self.pool is None or not self.pool.connected:
+            return {"connected": False, "link": self.link_stats()}
+        
+        remote = await self._send_request("get_connection_stats", {})
+        primary = self.pool.primary
+        if primary is None:
+            return {"connected": False, "link": self.link_stats(), "remote": remote}
+        
+        return {
+            "connected": True,
+            "encoding": primary.codec.name,
+            "compression": primary.compressor.algorithm,
+            "local": self.pool.compression_stats(),
+            "pool": self.pool.stats(),
+            "link": self.link_stats(),
+            "remote": remote
+        }
+    
+    async def get_metrics(self) -> Dict[str, Any]:
+        return await self._send_request("get_metrics", {})
+    
+    async def search_files(
+        self,
+        path: str,
+        pattern: str,
+        content_search: bool = False,
+        substring: bool = False,
+        max_results: Optional[int] = None,
+        query: Optional[str] = None,
+        regex: bool = False
+    ) -> Dict[str, Any]:
+        params = {
             "path": path,
             "pattern": pattern,
             "content_search": content_search
+        }
+        if substring:
+            params["substring"] = substring
+        if max_results is not None:
+            params["max_results"] = max_results
+        if query is not None:
+            params["query"] = query
+            params["regex"] = regex
+        return await self._send_request("search_files", params)
+    
+    async def document_search(
+        self,
+        query: str,
+        base_path: Optional[str] = None,
+        regex: bool = False,
+        max_results: int = 20
+    ) -> Dict[str, Any]:
+        return await self._send_request("document_search", {
+            "query": query,
+            "base_path": base_path,
+            "regex": regex,
+            "max_results": max_results
         })
     
+    async def refresh_document_index(self) -> Dict[str, Any]:
+        return await self._send_request("refresh_document_index", {})
+    
+    async def search_content(
+        self,
+        path: str,
+        query: str,
+        pattern: str = "*",
+        regex: bool = False,
+        ignore_case: bool = False,
+        max_results: Optional[int] = None
+    ) -> StreamHandle:
+        return await self._open_stream("search_content", {
+            "path": path,
+            "query": query,
+            "pattern": pattern,
+            "regex": regex,
+            "ignore_case": ignore_case,
+            "max_results": max_results
+        })
+    
+    async def batch(self, calls: List[Tuple[str, Dict[str, Any]]], max_concurrency: Optional[int] = None) -> List[Dict[str, Any]]:
+        result = await self._request("batch", _batch_params(calls, max_concurrency))
+        return result["results"]
+    
+    async def batch_stream(self, calls: List[Tuple[str, Dict[str, Any]]], max_concurrency: Optional[int] = None) -> StreamHandle:
+        return await self._open_stream("batch_stream", _batch_params(calls, max_concurrency))
+    
+    def link_stats(self) -> Optional[Dict[str, Any]]:
+        return self.monitor.stats() if self.monitor else None
+    
     async def disconnect(self):
-        if self.websocket:
-            try:
-                await self.websocket.close()
-            except:
-                pass
+        if self.monitor:
+            await self.monitor.stop()
+        if self.pool:
+            await self.pool.close()
+        if self.cache:
+            self.cache.save()
         logger.info("Disconnected from MCP server")
     
     async def __aenter__(self):
@@ -136,3 +707,48 @@ class MCPClient:
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         await self.disconnect()
+
+
+def _hash_prefix(digest: "hashlib._Hash", path: Path, length: int):
+    with open(path, "rb") as f:
+        while length > 0:
+            block = f.read(min(length, 1024 * 1024))
+            if not block:
+                break
+            digest.update(block)
+            length -= len(block)
+
+
+def _read_at(f: BinaryIO, offset: int, size: int) -> bytes:
+    f.seek(offset)
+    return f.read(size)
+
+
+def _write_at(f: BinaryIO, offset: int, data: memoryview):
+    f.seek(offset)
+    f.write(data)
+
+
+def _batch_params(calls: List[Tuple[str, Dict[str, Any]]], max_concurrency: Optional[int]) -> Dict[str, Any]:
+    params: Dict[str, Any] = {"calls": [{"tool": tool, "params": params} for tool, params in calls]}
+    if max_concurrency is not None:
+        params["max_concurrency"] = max_concurrency
+    return params
+
+
+def _is_batchable(tool: str, params: Dict[str, Any]) -> bool:
+    if tool == "list_files":
+        return not params.get("recursive") or "page_size" in params or "cursor" in params
+    return tool in BATCHABLE_TOOLS
+
+
+def _is_idempotent(tool: str, params: Dict[str, Any]) -> bool:
+    if tool == "batch":
+        return all(_is_idempotent(call["tool"], call.get("params", {})) for call in params["calls"])
+    if tool == "list_files" and "cursor" in params:
+        return False
+    return tool in IDEMPOTENT_TOOLS
+
+
+def _lane(tool: str) -> str:
+    return "bulk" if tool in BULK_TOOLS else "interactive"
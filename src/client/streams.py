@@ -0,0 +1,111 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Optional
+
+STREAM_WINDOW = 4 * 1024 * 1024
+
+
+class StreamError(Exception):
+    pass
+
+
+class StreamHandle:
+    def __init__(
+        self,
+        request_id: str,
+        on_abort: Callable[[str], None],
+        idle_timeout: Optional[float] = 60.0,
+        on_credit: Optional[Callable[[str, int], Awaitable[None]]] = None,
+        window: int = STREAM_WINDOW
+    ):
+        self.request_id = request_id
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.result: Optional[Any] = None
+        self.finished = False
+        self.window = window
+        self._on_abort = on_abort
+        self._on_credit = on_credit
+        self._idle_timeout = idle_timeout
+        self._consumed = 0
+    
+    def put_chunk(self, offset: int, data: memoryview):
+        self.queue.put_nowait(("chunk", (offset, data)))
+    
+    def put_event(self, event: Any):
+        self.queue.put_nowait(("event", event))
+    
+    def finish(self, result: Any = None, error: Optional[str] = None):
+        if error is not None:
+            self.queue.put_nowait(("error", error))
+        else:
+            self.queue.put_nowait(("result", result))
+    
+    def __aiter__(self):
+        return self
+    
+    async def __anext__(self) -> Any:
+        if self.finished:
+            raise StopAsyncIteration
+        
+        try:
+            if self._idle_timeout is None:
+                kind, payload = await self.queue.get()
+            else:
+                kind, payload = await asyncio.wait_for(self.queue.get(), timeout=self._idle_timeout)
+        except asyncio.TimeoutError:
+            await self.aclose()
+            raise TimeoutError(f"Stream {self.request_id} timed out")
+        
+        if kind == "result":
+            self.finished = True
+            self.result = payload
+            if isinstance(payload, dict) and "error" in payload:
+                raise StreamError(payload["error"])
+            raise StopAsyncIteration
+        
+        if kind == "error":
+            self.finished = True
+            raise StreamError(payload)
+        
+        if kind == "chunk" and self._on_credit is not None:
+            self._consumed += len(payload[1])
+            if self._consumed >= self.window // 2:
+                consumed, self._consumed = self._consumed, 0
+                await self._on_credit(self.request_id, consumed)
+        return payload
+    
+    async def aclose(self):
+        if not self.finished:
+            self.finished = True
+            self._on_abort(self.request_id)
+    
+    async def __aenter__(self) -> "StreamHandle":
+        return self
+    
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.aclose()
+
+
+class UploadTracker:
+    def __init__(self, upload_id: str, offset: int):
+        self.upload_id = upload_id
+        self.acked = offset
+        self.error: Optional[str] = None
+        self._changed = asyncio.Event()
+    
+    def ack(self, offset: Optional[int] = None, error: Optional[str] = None):
+        if error is not None:
+            self.error = error
+        elif offset is not None:
+            self.acked = max(self.acked, offset)
+        self._changed.set()
+    
+    async def wait_for(self, offset: int, timeout: float = 60.0):
+        while self.acked < offset and self.error is None:
+            self._changed.clear()
+            try:
+                await asyncio.wait_for(self._changed.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                raise TimeoutError(f"Upload {self.upload_id} stalled at offset {self.acked}")
+        
+        if self.error is not None:
+            raise StreamError(self.error)
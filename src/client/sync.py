@@ -0,0 +1,182 @@
+import asyncio
+import os
+import posixpath
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from ..core.config import settings
+from ..utils.logger import setup_logger
+from ..utils.manifest import scan_manifest
+
+logger = setup_logger("sync", settings.log.level, settings.log.log_file)
+
+
+@dataclass
+class SyncPlan:
+    copies: List[str] = field(default_factory=list)
+    deletes: List[str] = field(default_factory=list)
+    unchanged: int = 0
+    bytes_to_copy: int = 0
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "copies": len(self.copies),
+            "deletes": len(self.deletes),
+            "unchanged": self.unchanged,
+            "bytes_to_copy": self.bytes_to_copy
+        }
+
+
+class DirectorySync:
+    def __init__(
+        self,
+        client,
+        local_root: str,
+        remote_root: str,
+        direction: str = "push",
+        include: Optional[List[str]] = None,
+        exclude: Optional[List[str]] = None,
+        delete: bool = False,
+        checksum: bool = False,
+        workers: Optional[int] = None
+    ):
+        if direction not in ("push", "pull"):
+            raise ValueError(f"Invalid sync direction: {direction}")
+        
+        self.client = client
+        self.local_root = Path(local_root).expanduser()
+        self.remote_root = remote_root
+        self.direction = direction
+        self.include = include or []
+        self.exclude = exclude or []
+        self.delete = delete
+        self.checksum = checksum
+        self.workers = workers or settings.sync.workers
+        self._source: Dict[str, List] = {}
+        self._target: Dict[str, List] = {}
+    
+    async def plan(self) -> SyncPlan:
+        local_entries, remote = await asyncio.gather(
+            asyncio.to_thread(scan_manifest, self.local_root, self.include, self.exclude, self.checksum),
+            self.client.directory_manifest(self.remote_root, self.include, self.exclude, self.checksum)
+        )
+        if "error" in remote:
+            raise RuntimeError(remote["error"])
+        remote_entries = remote["entries"]
+        
+        if self.direction == "push":
+            source, target = local_entries, remote_entries
+        else:
+            source, target = remote_entries, local_entries
+        
+        plan = SyncPlan()
+        for rel_path, record in source.items():
+            existing = target.get(rel_path)
+            if existing is not None and _same_file(record, existing, self.checksum):
+                plan.unchanged += 1
+            else:
+                plan.copies.append(rel_path)
+                plan.bytes_to_copy += record[0]
+        
+        if self.delete:
+            plan.deletes = [rel_path for rel_path in target if rel_path not in source]
+        
+        self._source = source
+        self._target = target
+        return plan
+    
+    async def run(self, dry_run: bool = False) -> Dict[str, Any]:
+        start = time.perf_counter()
+        plan = await self.plan()
+        report = {
+            "direction": self.direction,
+            "dry_run": dry_run,
+            **plan.to_dict(),
+            "copied": 0,
+            "deleted": 0,
+            "bytes_copied": 0,
+            "errors": {}
+        }
+        
+        if dry_run:
+            report["copy_paths"] = plan.copies
+            report["delete_paths"] = plan.deletes
+        else:
+            semaphore = asyncio.Semaphore(self.workers)
+            
+            async def transfer(rel_path: str):
+                async with semaphore:
+                    try:
+                        result = await self._copy(rel_path)
+                    except Exception as e:
+                        result = {"error": str(e)}
+                if "error" in result:
+                    report["errors"][rel_path] = result["error"]
+                else:
+                    report["copied"] += 1
+                    report["bytes_copied"] += result.get("literal_bytes", self._source[rel_path][0])
+            
+            await asyncio.gather(*(transfer(rel_path) for rel_path in plan.copies))
+            
+            if plan.deletes:
+                deleted, errors = await self._delete(plan.deletes)
+                report["deleted"] = deleted
+                report["errors"].update(errors)
+        
+        report["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        logger.info(
+            f"Sync {self.direction} {self.local_root} <-> {self.remote_root}: "
+            f"{report['copied']} copied, {report['deleted']} deleted, {plan.unchanged} unchanged"
+        )
+        return report
+    
+    async def _copy(self, rel_path: str) -> Dict[str, Any]:
+        local_path = self.local_root / rel_path
+        remote_path = posixpath.join(self.remote_root, rel_path)
+        size, mtime_ns = self._source[rel_path][:2]
+        use_delta = rel_path in self._target and size >= settings.sync.delta_min_size
+        
+        if self.direction == "push":
+            if use_delta:
+                return await self.client.delta_upload(str(local_path), remote_path, mtime_ns=mtime_ns)
+            return await self.client.upload(str(local_path), remote_path, mtime_ns=mtime_ns)
+        
+        await asyncio.to_thread(local_path.parent.mkdir, parents=True, exist_ok=True)
+        if use_delta:
+            result = await self.client.delta_download(remote_path, str(local_path))
+        else:
+            result = await self.client.download(remote_path, str(local_path))
+        if "error" not in result:
+            await asyncio.to_thread(os.utime, local_path, ns=(mtime_ns, mtime_ns))
+        return result
+    
+    async def _delete(self, rel_paths: List[str]):
+        if self.direction == "push":
+            result = await self.client.remove_files(self.remote_root, rel_paths)
+            if "error" in result:
+                return 0, {rel_path: result["error"] for rel_path in rel_paths}
+            return result["removed"], result["errors"]
+        
+        return await asyncio.to_thread(_unlink_all, self.local_root, rel_paths)
+
+
+def _unlink_all(root: Path, rel_paths: List[str]):
+    deleted = 0
+    errors = {}
+    for rel_path in rel_paths:
+        try:
+            (root / rel_path).unlink()
+            deleted += 1
+        except OSError as e:
+            errors[rel_path] = str(e)
+    return deleted, errors
+
+
+def _same_file(source: List, target: List, checksum: bool) -> bool:
+    if source[0] != target[0]:
+        return False
+    if checksum:
+        return source[2] == target[2]
+    return source[1] == target[1]
@@ -0,0 +1,202 @@
+import time
+import zlib
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from .protocol import CHUNK_FRAME, Frame, ProtocolError, chunk_payload_offset
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+COMPRESSED_FRAME = 0x03
+JSON_FRAME = 0x04
+
+MIN_COMPRESS_SIZE = 1024
+PROBE_SIZE = 4096
+PROBE_RATIO = 0.95
+
+ALGORITHM_IDS = {"zstd": 1, "deflate": 2}
+ALGORITHM_NAMES = {algorithm_id: name for name, algorithm_id in ALGORITHM_IDS.items()}
+
+COMPRESSED_SIGNATURES = (
+    b"\x1f\x8b",
+    b"PK\x03\x04",
+    b"\x89PNG",
+    b"\xff\xd8\xff",
+    b"GIF8",
+    b"\x28\xb5\x2f\xfd",
+    b"\xfd7zXZ\x00",
+    b"BZh",
+    b"7z\xbc\xaf\x27\x1c",
+    b"Rar!",
+    b"OggS",
+    b"ID3",
+)
+
+
+def available_algorithms(preferred: Iterable[str]) -> List[str]:
+    return [
+        name for name in preferred
+        if name == "deflate" or (name == "zstd" and zstandard is not None)
+    ]
+
+
+def negotiate_algorithm(offered: Optional[Iterable[str]], allowed: Iterable[str]) -> Optional[str]:
+    allowed = set(available_algorithms(allowed))
+    for name in offered or ():
+        if name in allowed:
+            return name
+    return None
+
+
+def looks_compressed(data: memoryview) -> bool:
+    head = bytes(data[:16])
+    if head.startswith(COMPRESSED_SIGNATURES):
+        return True
+    if head[4:8] == b"ftyp" or (head.startswith(b"RIFF") and head[8:12] in (b"WEBP", b"AVI ", b"WAVE")):
+        return True
+    
+    sample = data[:PROBE_SIZE]
+    return len(zlib.compress(sample, 1)) > len(sample) * PROBE_RATIO
+
+
+@dataclass
+class CompressionStats:
+    frames_compressed: int = 0
+    frames_skipped: int = 0
+    frames_decompressed: int = 0
+    bytes_before: int = 0
+    bytes_after: int = 0
+    bytes_received: int = 0
+    bytes_decompressed: int = 0
+    compress_seconds: float = 0.0
+    decompress_seconds: float = 0.0
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            **self.__dict__,
+            "ratio": round(self.bytes_after / self.bytes_before, 4) if self.bytes_before else None,
+        }
+
+
+class Compressor:
+    def __init__(self, algorithm: Optional[str] = None, level: int = 3, max_size: Optional[int] = None):
+        self.algorithm = algorithm
+        self.level = level
+        self.max_size = max_size
+        self.stats = CompressionStats()
+    
+    @property
+    def enabled(self) -> bool:
+        return self.algorithm is not None
+    
+    def compress_frame(self, frame: Frame) -> Frame:
+        if not self.enabled:
+            return frame
+        
+        inner = self._inner(frame)
+        if len(inner) < MIN_COMPRESS_SIZE or (
+            frame[0] == CHUNK_FRAME and looks_compressed(memoryview(inner)[chunk_payload_offset(inner):])
+        ):
+            self.stats.frames_skipped += 1
+            return frame
+        
+        started = time.thread_time()
+        compressor = self._compressobj()
+        compressed = b"".join((self._header(), compressor.compress(inner), compressor.flush()))
+        self._record(len(inner), len(compressed), started)
+        return compressed
+    
+    def compress_fragments(self, fragments: Iterator[Frame]) -> Iterator[Frame]:
+        if not self.enabled:
+            yield from fragments
+            return
+        
+        compressor = self._compressobj()
+        before = 0
+        after = 0
+        started = time.thread_time()
+        first = True
+        
+        header = self._header()
+        after += len(header)
+        pending = [header]
+        for fragment in fragments:
+            inner = self._inner(fragment) if first else (
+                fragment.encode() if isinstance(fragment, str) else fragment
+            )
+            first = False
+            before += len(inner)
+            output = compressor.compress(inner)
+            if output:
+                after += len(output)
+                pending.append(output)
+                self._add_seconds(started)
+                yield b"".join(pending)
+                pending = []
+                started = time.thread_time()
+        
+        output = compressor.flush()
+        after += len(output)
+        pending.append(output)
+        self._record(before, after, started)
+        yield b"".join(pending)
+    
+    def decompress_frame(self, frame: Frame) -> Frame:
+        if isinstance(frame, str) or not frame or frame[0] != COMPRESSED_FRAME:
+            return frame
+        
+        started = time.thread_time()
+        algorithm = ALGORITHM_NAMES.get(frame[1]) if len(frame) > 1 else None
+        if algorithm is None:
+            raise ProtocolError("Unknown compression algorithm")
+        
+        payload = memoryview(frame)[2:]
+        if algorithm == "zstd":
+            if zstandard is None:
+                raise ProtocolError("zstd frame received but zstandard is not installed")
+            try:
+                with zstandard.ZstdDecompressor().stream_reader(payload) as reader:
+                    inner = reader.read(self.max_size + 1) if self.max_size else reader.readall()
+            except zstandard.ZstdError as e:
+                raise ProtocolError(f"Invalid zstd frame: {e}")
+            if self.max_size and len(inner) > self.max_size:
+                raise ProtocolError("Decompressed frame exceeds size limit")
+        else:
+            decompressor = zlib.decompressobj()
+            inner = decompressor.decompress(payload, self.max_size or 0)
+            if decompressor.unconsumed_tail:
+                raise ProtocolError("Decompressed frame exceeds size limit")
+        
+        self.stats.frames_decompressed += 1
+        self.stats.bytes_received += len(frame)
+        self.stats.bytes_decompressed += len(inner)
+        self.stats.decompress_seconds += time.thread_time() - started
+        
+        if inner and inner[0] == JSON_FRAME:
+            return inner[1:].decode()
+        return inner
+    
+    def _inner(self, frame: Frame) -> bytes:
+        if isinstance(frame, str):
+            return bytes((JSON_FRAME,)) + frame.encode()
+        return frame
+    
+    def _header(self) -> bytes:
+        return bytes((COMPRESSED_FRAME, ALGORITHM_IDS[self.algorithm]))
+    
+    def _compressobj(self) -> Any:
+        if self.algorithm == "zstd":
+            return zstandard.ZstdCompressor(level=self.level).compressobj()
+        return zlib.compressobj(self.level)
+    
+    def _add_seconds(self, started: float):
+        self.stats.compress_seconds += time.thread_time() - started
+    
+    def _record(self, before: int, after: int, started: float):
+        self.stats.frames_compressed += 1
+        self.stats.bytes_before += before
+        self.stats.bytes_after += after
+        self._add_seconds(started)
@@ -1,22 +1,62 @@
 import os
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
 from pydantic import BaseModel, Field
 from dotenv import load_dotenv
 
 load_dotenv()
 
+DEFAULT_DOCUMENT_EXTENSIONS = ".txt,.md,.rst,.csv,.json,.yaml,.yml,.toml,.ini,.py,.js,.ts,.html,.tex,.sql,.sh,.log"
+
+def _split_list(value: str) -> List[str]:
+    return [item.strip() for item in value.split(",") if item.strip()]
+
 class NetworkConfig(BaseModel):
     local_subnet: str = Field(default="192.168.1.0/24")
     connection_timeout: int = Field(default=5)
     tailscale_enabled: bool = Field(default=True)
     ubuntu_tailscale_ip: Optional[str] = None
     macbook_tailscale_ip: Optional[str] = None
+    ubuntu_lan_ip: Optional[str] = None
+    ubuntu_hostnames: List[str] = Field(default_factory=list)
+    path_cache_ttl: float = Field(default=30.0)
+    link_monitor_enabled: bool = Field(default=True)
+    link_monitor_interval: float = Field(default=5.0)
+    link_monitor_window: int = Field(default=60)
+    path_check_interval: float = Field(default=30.0)
+    status_ttl: float = Field(default=15.0)
+    status_refresh_interval: float = Field(default=10.0)
+    
+    def server_candidates(self) -> List[str]:
+        return [host for host in [self.ubuntu_lan_ip, self.ubuntu_tailscale_ip, *self.ubuntu_hostnames] if host]
 
 class MCPConfig(BaseModel):
     server_host: str = Field(default="0.0.0.0")
     server_port: int = Field(default=8765)
     secret_key: str = Field(default="")
+    max_concurrent_requests: int = Field(default=16)
+    stream_chunk_size: int = Field(default=256 * 1024)
+    max_command_output: int = Field(default=10 * 1024 * 1024)
+    max_message_size: int = Field(default=64 * 1024 * 1024)
+    wire_encodings: List[str] = Field(default_factory=lambda: ["msgpack", "json"])
+    compression: str = Field(default="auto")
+    compression_algorithms: List[str] = Field(default_factory=lambda: ["zstd", "deflate"])
+    batch_concurrency: int = Field(default=8)
+    batch_window_ms: float = Field(default=2.0)
+    batch_max_calls: int = Field(default=64)
+    pool_size: int = Field(default=4)
+    pool_idle_timeout: float = Field(default=60.0)
+    session_grace_period: float = Field(default=30.0)
+    session_buffer_size: int = Field(default=16 * 1024 * 1024)
+    upload_part_ttl: float = Field(default=24 * 3600)
+    request_timeout: float = Field(default=60.0)
+    reconnect_attempts: int = Field(default=8)
+    reconnect_backoff: float = Field(default=0.1)
+    reconnect_max_delay: float = Field(default=5.0)
+    metrics_host: str = Field(default="127.0.0.1")
+    metrics_port: int = Field(default=0)
+    io_workers: int = Field(default=0)
+    cpu_workers: int = Field(default=0)
 
 class SecurityConfig(BaseModel):
     jwt_secret: str = Field(default="")
@@ -26,10 +66,47 @@ class AIConfig(BaseModel):
     openai_api_key: str = Field(default="")
     model: str = Field(default="gpt-4")
     temperature: float = Field(default=0.7)
+    provider: str = Field(default="openai")
+    max_concurrency: int = Field(default=2)
+    cache_enabled: bool = Field(default=True)
+    cache_path: str = Field(default="~/.cache/conexao_vpn/llm")
+    cache_ttl: float = Field(default=7 * 24 * 3600)
+    cache_max_bytes: int = Field(default=32 * 1024 * 1024)
 
 class LogConfig(BaseModel):
     level: str = Field(default="INFO")
     log_file: str = Field(default="logs/conexao_vpn.log")
+    queue: bool = Field(default=True)
+    format: str = Field(default="text")
+    traceback_locals: bool = Field(default=False)
+    request_rate: float = Field(default=100.0)
+    request_sample: float = Field(default=1.0)
+
+class IndexConfig(BaseModel):
+    file_index_enabled: bool = Field(default=True)
+    file_index_roots: List[str] = Field(default_factory=lambda: ["~"])
+    file_index_path: str = Field(default="~/.cache/conexao_vpn/file_index.gz")
+    file_index_exclude: List[str] = Field(default_factory=lambda: [".git", "node_modules", "__pycache__", ".cache"])
+    document_index_enabled: bool = Field(default=True)
+    document_roots: List[str] = Field(default_factory=lambda: ["~/Documents"])
+    document_index_path: str = Field(default="~/.cache/conexao_vpn/document_index.sqlite")
+    document_extensions: List[str] = Field(default_factory=lambda: DEFAULT_DOCUMENT_EXTENSIONS.split(","))
+    document_max_file_size: int = Field(default=2 * 1024 * 1024)
+    document_refresh_interval: float = Field(default=300.0)
+
+class SearchConfig(BaseModel):
+    content_max_file_size: int = Field(default=20 * 1024 * 1024)
+    content_max_results: int = Field(default=1000)
+
+class ClientCacheConfig(BaseModel):
+    enabled: bool = Field(default=True)
+    max_bytes: int = Field(default=64 * 1024 * 1024)
+    persist: bool = Field(default=True)
+    path: str = Field(default="~/.cache/conexao_vpn/client_cache.json")
+
+class SyncConfig(BaseModel):
+    workers: int = Field(default=8)
+    delta_min_size: int = Field(default=1024 * 1024)
 
 class Settings(BaseModel):
     network: NetworkConfig = Field(default_factory=NetworkConfig)
@@ -37,6 +114,10 @@ class Settings(BaseModel):
     security: SecurityConfig = Field(default_factory=SecurityConfig)
     ai: AIConfig = Field(default_factory=AIConfig)
     log: LogConfig = Field(default_factory=LogConfig)
+    index: IndexConfig = Field(default_factory=IndexConfig)
+    search: SearchConfig = Field(default_factory=SearchConfig)
+    cache: ClientCacheConfig = Field(default_factory=ClientCacheConfig)
+    sync: SyncConfig = Field(default_factory=SyncConfig)
     
     @classmethod
     def load_from_env(cls) -> "Settings":
@@ -47,11 +128,43 @@ class Settings(BaseModel):
                 tailscale_enabled=os.getenv("TAILSCALE_ENABLED", "true").lower() == "true",
                 ubuntu_tailscale_ip=os.getenv("UBUNTU_TAILSCALE_IP"),
                 macbook_tailscale_ip=os.getenv("MACBOOK_TAILSCALE_IP"),
+                ubuntu_lan_ip=os.getenv("UBUNTU_LAN_IP"),
+                ubuntu_hostnames=_split_list(os.getenv("UBUNTU_HOSTNAMES", "")),
+                path_cache_ttl=float(os.getenv("PATH_CACHE_TTL", "30")),
+                link_monitor_enabled=os.getenv("LINK_MONITOR_ENABLED", "true").lower() == "true",
+                link_monitor_interval=float(os.getenv("LINK_MONITOR_INTERVAL", "5")),
+                link_monitor_window=int(os.getenv("LINK_MONITOR_WINDOW", "60")),
+                path_check_interval=float(os.getenv("PATH_CHECK_INTERVAL", "30")),
+                status_ttl=float(os.getenv("CONNECTION_STATUS_TTL", "15")),
+                status_refresh_interval=float(os.getenv("CONNECTION_STATUS_REFRESH", "10")),
             ),
             mcp=MCPConfig(
                 server_host=os.getenv("MCP_SERVER_HOST", "0.0.0.0"),
                 server_port=int(os.getenv("MCP_SERVER_PORT", "8765")),
                 secret_key=os.getenv("MCP_SECRET_KEY", ""),
+                max_concurrent_requests=int(os.getenv("MCP_MAX_CONCURRENT_REQUESTS", "16")),
+                stream_chunk_size=int(os.getenv("MCP_STREAM_CHUNK_SIZE", str(256 * 1024))),
+                max_command_output=int(os.getenv("MCP_MAX_COMMAND_OUTPUT", str(10 * 1024 * 1024))),
+                max_message_size=int(os.getenv("MCP_MAX_MESSAGE_SIZE", str(64 * 1024 * 1024))),
+                wire_encodings=_split_list(os.getenv("MCP_WIRE_ENCODINGS", "msgpack,json")),
+                compression=os.getenv("MCP_COMPRESSION", "auto").lower(),
+                compression_algorithms=_split_list(os.getenv("MCP_COMPRESSION_ALGORITHMS", "zstd,deflate")),
+                batch_concurrency=int(os.getenv("MCP_BATCH_CONCURRENCY", "8")),
+                batch_window_ms=float(os.getenv("MCP_BATCH_WINDOW_MS", "2")),
+                batch_max_calls=int(os.getenv("MCP_BATCH_MAX_CALLS", "64")),
+                pool_size=int(os.getenv("MCP_POOL_SIZE", "4")),
+                pool_idle_timeout=float(os.getenv("MCP_POOL_IDLE_TIMEOUT", "60")),
+                session_grace_period=float(os.getenv("MCP_SESSION_GRACE_PERIOD", "30")),
+                session_buffer_size=int(os.getenv("MCP_SESSION_BUFFER_SIZE", str(16 * 1024 * 1024))),
+                upload_part_ttl=float(os.getenv("MCP_UPLOAD_PART_TTL", str(24 * 3600))),
+                request_timeout=float(os.getenv("MCP_REQUEST_TIMEOUT", "60")),
+                reconnect_attempts=int(os.getenv("MCP_RECONNECT_ATTEMPTS", "8")),
+                reconnect_backoff=float(os.getenv("MCP_RECONNECT_BACKOFF", "0.1")),
+                reconnect_max_delay=float(os.getenv("MCP_RECONNECT_MAX_DELAY", "5")),
+                metrics_host=os.getenv("MCP_METRICS_HOST", "127.0.0.1"),
+                metrics_port=int(os.getenv("MCP_METRICS_PORT", "0")),
+                io_workers=int(os.getenv("MCP_IO_WORKERS", "0")),
+                cpu_workers=int(os.getenv("MCP_CPU_WORKERS", "0")),
             ),
             security=SecurityConfig(
                 jwt_secret=os.getenv("JWT_SECRET", ""),
@@ -59,10 +172,47 @@ class Settings(BaseModel):
             ),
             ai=AIConfig(
                 openai_api_key=os.getenv("OPENAI_API_KEY", ""),
+                provider=os.getenv("AI_PROVIDER", "openai"),
+                max_concurrency=int(os.getenv("AI_MAX_CONCURRENCY", "2")),
+                cache_enabled=os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true",
+                cache_path=os.getenv("LLM_CACHE_PATH", "~/.cache/conexao_vpn/llm"),
+                cache_ttl=float(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 3600))),
+                cache_max_bytes=int(os.getenv("LLM_CACHE_MAX_BYTES", str(32 * 1024 * 1024))),
             ),
             log=LogConfig(
                 level=os.getenv("LOG_LEVEL", "INFO"),
                 log_file=os.getenv("LOG_FILE", "logs/conexao_vpn.log"),
+                queue=os.getenv("LOG_QUEUE", "true").lower() == "true",
+                format=os.getenv("LOG_FORMAT", "text").lower(),
+                traceback_locals=os.getenv("LOG_TRACEBACK_LOCALS", "false").lower() == "true",
+                request_rate=float(os.getenv("LOG_REQUEST_RATE", "100")),
+                request_sample=float(os.getenv("LOG_REQUEST_SAMPLE", "1.0")),
+            ),
+            index=IndexConfig(
+                file_index_enabled=os.getenv("FILE_INDEX_ENABLED", "true").lower() == "true",
+                file_index_roots=_split_list(os.getenv("FILE_INDEX_ROOTS", "~")),
+                file_index_path=os.getenv("FILE_INDEX_PATH", "~/.cache/conexao_vpn/file_index.gz"),
+                file_index_exclude=_split_list(os.getenv("FILE_INDEX_EXCLUDE", ".git,node_modules,__pycache__,.cache")),
+                document_index_enabled=os.getenv("DOCUMENT_INDEX_ENABLED", "true").lower() == "true",
+                document_roots=_split_list(os.getenv("DOCUMENT_INDEX_ROOTS", "~/Documents")),
+                document_index_path=os.getenv("DOCUMENT_INDEX_PATH", "~/.cache/conexao_vpn/document_index.sqlite"),
+                document_extensions=_split_list(os.getenv("DOCUMENT_INDEX_EXTENSIONS", DEFAULT_DOCUMENT_EXTENSIONS)),
+                document_max_file_size=int(os.getenv("DOCUMENT_INDEX_MAX_FILE_SIZE", str(2 * 1024 * 1024))),
+                document_refresh_interval=float(os.getenv("DOCUMENT_INDEX_REFRESH_INTERVAL", "300")),
+            ),
+            search=SearchConfig(
+                content_max_file_size=int(os.getenv("CONTENT_SEARCH_MAX_FILE_SIZE", str(20 * 1024 * 1024))),
+                content_max_results=int(os.getenv("CONTENT_SEARCH_MAX_RESULTS", "1000")),
+            ),
+            cache=ClientCacheConfig(
+                enabled=os.getenv("CLIENT_CACHE_ENABLED", "true").lower() == "true",
+                max_bytes=int(os.getenv("CLIENT_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+                persist=os.getenv("CLIENT_CACHE_PERSIST", "true").lower() == "true",
+                path=os.getenv("CLIENT_CACHE_PATH", "~/.cache/conexao_vpn/client_cache.json"),
+            ),
+            sync=SyncConfig(
+                workers=int(os.getenv("SYNC_WORKERS", "8")),
+                delta_min_size=int(os.getenv("SYNC_DELTA_MIN_SIZE", str(1024 * 1024))),
             ),
         )
 
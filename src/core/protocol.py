@@ -0,0 +1,182 @@
+import base64
+import itertools
+import json
+import struct
+from typing import Any, Dict, Iterable, Iterator, List, Tuple, Union
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+CHUNK_FRAME = 0x01
+MSGPACK_FRAME = 0x02
+
+MAX_FRAME_SIZE = 2 ** 20
+MAX_CHUNK_SIZE = MAX_FRAME_SIZE - 4096
+FRAGMENT_SIZE = 64 * 1024
+
+_CHUNK_HEADER = struct.Struct("!BH")
+_CHUNK_OFFSET = struct.Struct("!Q")
+
+Buffer = Union[bytes, bytearray, memoryview]
+Frame = Union[str, bytes]
+
+
+def pack_chunk(request_id: str, offset: int, data: Buffer) -> bytes:
+    rid = request_id.encode()
+    return b"".join((
+        _CHUNK_HEADER.pack(CHUNK_FRAME, len(rid)),
+        rid,
+        _CHUNK_OFFSET.pack(offset),
+        data,
+    ))
+
+
+def unpack_chunk(frame: bytes) -> Tuple[str, int, memoryview]:
+    kind, rid_length = _CHUNK_HEADER.unpack_from(frame, 0)
+    if kind != CHUNK_FRAME:
+        raise ValueError(f"Unexpected frame type: {kind}")
+    
+    start = _CHUNK_HEADER.size
+    request_id = frame[start:start + rid_length].decode()
+    start += rid_length
+    (offset,) = _CHUNK_OFFSET.unpack_from(frame, start)
+    start += _CHUNK_OFFSET.size
+    return request_id, offset, memoryview(frame)[start:]
+
+
+def chunk_payload_offset(frame: Buffer) -> int:
+    _, rid_length = _CHUNK_HEADER.unpack_from(frame, 0)
+    return _CHUNK_HEADER.size + rid_length + _CHUNK_OFFSET.size
+
+
+def is_chunk_frame(frame: Frame) -> bool:
+    return isinstance(frame, (bytes, bytearray)) and len(frame) > 0 and frame[0] == CHUNK_FRAME
+
+
+class ProtocolError(Exception):
+    pass
+
+
+class JsonCodec:
+    name = "json"
+    
+    def __init__(self):
+        self._encoder = json.JSONEncoder(default=self._default)
+    
+    def encode(self, payload: Dict[str, Any]) -> str:
+        return self._encoder.encode(payload)
+    
+    def iter_encode(self, payload: Dict[str, Any]) -> Iterator[str]:
+        return self._encoder.iterencode(payload)
+    
+    def decode(self, frame: Frame) -> Dict[str, Any]:
+        if not isinstance(frame, str):
+            raise ProtocolError("Expected a text frame")
+        try:
+            return json.loads(frame, object_hook=self._object_hook)
+        except json.JSONDecodeError as e:
+            raise ProtocolError(f"Invalid JSON: {e}")
+    
+    @staticmethod
+    def _default(value: Any) -> Any:
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            return {"$b64": base64.b64encode(value).decode("ascii")}
+        raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+    
+    @staticmethod
+    def _object_hook(value: Dict[str, Any]) -> Any:
+        if len(value) == 1 and "$b64" in value:
+            return base64.b64decode(value["$b64"])
+        return value
+
+
+class MsgpackCodec:
+    name = "msgpack"
+    
+    def encode(self, payload: Dict[str, Any]) -> bytes:
+        return bytes((MSGPACK_FRAME,)) + msgpack.packb(payload, use_bin_type=True, default=self._default)
+    
+    def iter_encode(self, payload: Dict[str, Any]) -> Iterator[bytes]:
+        packer = msgpack.Packer(use_bin_type=True, default=self._default)
+        yield bytes((MSGPACK_FRAME,))
+        yield from self._iter_pack(packer, payload, 0)
+    
+    def decode(self, frame: Frame) -> Dict[str, Any]:
+        if not isinstance(frame, (bytes, bytearray)) or not frame or frame[0] != MSGPACK_FRAME:
+            raise ProtocolError("Expected a msgpack frame")
+        try:
+            return msgpack.unpackb(memoryview(frame)[1:], raw=False)
+        except (ValueError, msgpack.ExtraData, msgpack.FormatError, msgpack.StackError) as e:
+            raise ProtocolError(f"Invalid msgpack: {e}")
+    
+    def _iter_pack(self, packer: "msgpack.Packer", value: Any, depth: int) -> Iterator[bytes]:
+        if isinstance(value, dict) and depth < 2:
+            yield packer.pack_map_header(len(value))
+            for key, item in value.items():
+                yield packer.pack(key)
+                yield from self._iter_pack(packer, item, depth + 1)
+        elif isinstance(value, list):
+            yield packer.pack_array_header(len(value))
+            for item in value:
+                yield packer.pack(item)
+        else:
+            yield packer.pack(value)
+    
+    @staticmethod
+    def _default(value: Any) -> Any:
+        if isinstance(value, memoryview):
+            return bytes(value)
+        raise TypeError(f"Object of type {type(value).__name__} is not msgpack serializable")
+
+
+CODECS = {"json": JsonCodec}
+if msgpack is not None:
+    CODECS["msgpack"] = MsgpackCodec
+
+DEFAULT_CODEC = JsonCodec()
+
+
+def available_encodings(preferred: Iterable[str]) -> List[str]:
+    return [name for name in preferred if name in CODECS]
+
+
+def negotiate_codec(offered: Iterable[str], allowed: Iterable[str]) -> Union[JsonCodec, MsgpackCodec]:
+    allowed = set(available_encodings(allowed))
+    for name in offered or ():
+        if name in allowed:
+            return CODECS[name]()
+    return JsonCodec()
+
+
+def get_codec(name: str) -> Union[JsonCodec, MsgpackCodec]:
+    codec = CODECS.get(name)
+    if codec is None:
+        raise ProtocolError(f"Unsupported encoding: {name}")
+    return codec()
+
+
+def encode_fragments(codec: Union[JsonCodec, MsgpackCodec], payload: Dict[str, Any]) -> Union[Frame, Iterator[Frame]]:
+    fragments = _coalesce(codec.iter_encode(payload), FRAGMENT_SIZE)
+    first = next(fragments)
+    second = next(fragments, None)
+    if second is None:
+        return first
+    return itertools.chain((first, second), fragments)
+
+
+def _coalesce(pieces: Iterator[Frame], size: int) -> Iterator[Frame]:
+    buffer: List[Frame] = []
+    buffered = 0
+    empty = None
+    for piece in pieces:
+        if empty is None:
+            empty = piece[:0]
+        buffer.append(piece)
+        buffered += len(piece)
+        if buffered >= size:
+            yield empty.join(buffer)
+            buffer, buffered = [], 0
+    if buffer or empty is None:
+        yield (empty if empty is not None else "").join(buffer)
@@ -0,0 +1,161 @@
+import asyncio
+import fnmatch
+import mmap
+import os
+import re
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from .executor import ToolExecutor
+
+BINARY_SNIFF_SIZE = 8192
+SNIPPET_LENGTH = 200
+FILES_PER_TASK = 32
+
+Match = Tuple[str, int, str]
+
+
+def scan_files(
+    paths: List[str],
+    query: str,
+    regex: bool,
+    ignore_case: bool,
+    max_file_size: int,
+    max_matches: int
+) -> Tuple[List[Match], int]:
+    compiled = re.compile(
+        query.encode() if regex else re.escape(query.encode()),
+        re.MULTILINE | (re.IGNORECASE if ignore_case else 0)
+    )
+    matches: List[Match] = []
+    scanned = 0
+    
+    for path in paths:
+        if len(matches) >= max_matches:
+            break
+        try:
+            matches.extend(_scan_file(path, compiled, max_file_size, max_matches - len(matches)))
+            scanned += 1
+        except (OSError, ValueError):
+            continue
+    
+    return matches, scanned
+
+
+def _scan_file(path: str, compiled: re.Pattern, max_file_size: int, limit: int) -> List[Match]:
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0 or size > max_file_size:
+            return []
+        
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            if b"\0" in mapped[:BINARY_SNIFF_SIZE]:
+                return []
+            
+            matches = []
+            line_number = 1
+            counted_to = 0
+            position = 0
+            while len(matches) < limit:
+                match = compiled.search(mapped, position)
+                if match is None:
+                    break
+                
+                line_start = mapped.rfind(b"\n", 0, match.start()) + 1
+                line_end = mapped.find(b"\n", match.end())
+                if line_end == -1:
+                    line_end = size
+                
+                line_number += mapped[counted_to:line_start].count(b"\n")
+                counted_to = line_start
+                snippet = mapped[line_start:min(line_end, line_start + SNIPPET_LENGTH)]
+                matches.append((path, line_number, snippet.decode("utf-8", errors="replace").strip()))
+                position = line_end + 1
+            
+            return matches
+
+
+def iter_candidate_files(root: str, pattern: str = "*") -> Iterator[str]:
+    match_path = "/" in pattern
+    pending = [root]
+    while pending:
+        directory = pending.pop()
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            pending.append(entry.path)
+                            continue
+                        if not entry.is_file():
+                            continue
+                    except OSError:
+                        continue
+                    
+                    name = os.path.relpath(entry.path, root) if match_path else entry.name
+                    if fnmatch.fnmatchcase(name, pattern):
+                        yield entry.path
+        except OSError:
+            continue
+
+
+class ContentSearchEngine:
+    def __init__(self, executor: "ToolExecutor", max_file_size: int = 20 * 1024 * 1024):
+        self.executor = executor
+        self.max_file_size = max_file_size
+    
+    async def search(
+        self,
+        candidates: Iterable[str],
+        query: str,
+        regex: bool = False,
+        ignore_case: bool = False,
+        max_results: int = 100,
+        on_match: Optional[Callable[[Match], Awaitable[None]]] = None
+    ) -> Dict[str, Any]:
+        if regex:
+            re.compile(query)
+        
+        candidates = iter(candidates)
+        pending = set()
+        found = 0
+        scanned = 0
+        exhausted = False
+        
+        def next_batch() -> List[str]:
+            return [path for _, path in zip(range(FILES_PER_TASK), candidates)]
+        
+        try:
+            while found < max_results:
+                while not exhausted and len(pending) < self.executor.cpu_workers * 2:
+                    batch = await self.executor.run_io(next_batch)
+                    if not batch:
+                        exhausted = True
+                        break
+                    pending.add(asyncio.ensure_future(self.executor.run_cpu(
+                        scan_files, batch, query, regex, ignore_case,
+                        self.max_file_size, max_results - found
+                    )))
+                
+                if not pending:
+                    break
+                
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    matches, batch_scanned = future.result()
+                    scanned += batch_scanned
+                    for match in matches:
+                        if found >= max_results:
+                            break
+                        found += 1
+                        if on_match:
+                            await on_match(match)
+        finally:
+            for future in pending:
+                future.cancel()
+        
+        return {
+            "count": found,
+            "files_scanned": scanned,
+            "truncated": found >= max_results
+        }
@@ -0,0 +1,378 @@
+import asyncio
+import contextlib
+import itertools
+import json
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+from array import array
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from ..core.config import settings
+from ..utils.logger import setup_logger
+
+logger = setup_logger("document_index", settings.log.level, settings.log.log_file)
+
+INDEX_VERSION = 2
+APPLY_BATCH_SIZE = 256
+SNIPPET_LENGTH = 160
+SEARCH_HIT_FACTOR = 4
+SEARCH_BYTE_BUDGET = 64 * 1024 * 1024
+REGEX_METACHARACTERS = set(".^$*+?{}[]()|")
+
+
+def trigrams(text: str) -> Set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def required_literals(pattern: str) -> List[str]:
+    if "|" in pattern:
+        return []
+    
+    literals = []
+    current: List[str] = []
+    depth = 0
+    i = 0
+    
+    def flush():
+        if depth == 0 and current:
+            literals.append("".join(current))
+        current.clear()
+    
+    while i < len(pattern):
+        char = pattern[i]
+        if char == "\\":
+            escaped = pattern[i + 1:i + 2]
+            if escaped and not escaped.isalnum():
+                current.append(escaped)
+            else:
+                flush()
+            i += 2
+            continue
+        
+        if char == "[":
+            flush()
+            end = pattern.find("]", i + 2)
+            i = len(pattern) if end == -1 else end + 1
+            continue
+        
+        if char == "{":
+            if current:
+                current.pop()
+            flush()
+            end = pattern.find("}", i + 1)
+            i = len(pattern) if end == -1 else end + 1
+            continue
+        
+        if char in "*?":
+            if current:
+                current.pop()
+            flush()
+        elif char == "(":
+            flush()
+            depth += 1
+        elif char == ")":
+            flush()
+            depth = max(depth - 1, 0)
+        elif char in REGEX_METACHARACTERS:
+            flush()
+        elif depth == 0:
+            current.append(char)
+        i += 1
+    
+    flush()
+    return [literal.lower() for literal in literals if len(literal) >= 3]
+
+
+class TrigramIndex:
+    def __init__(
+        self,
+        roots: Iterable[str],
+        index_path: str,
+        extensions: Iterable[str],
+        max_file_size: int = 2 * 1024 * 1024,
+        refresh_interval: float = 300.0
+    ):
+        self.roots = [str(Path(root).expanduser().resolve()) for root in roots]
+        self.index_path = Path(index_path).expanduser()
+        self.extensions = {ext.lower() for ext in extensions}
+        self.max_file_size = max_file_size
+        self.refresh_interval = refresh_interval
+        self.docs: Dict[int, Tuple[str, int, int]] = {}
+        self.paths: Dict[str, int] = {}
+        self.postings: Dict[str, array] = {}
+        self.next_id = 0
+        self.ready = False
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+    
+    async def start(self):
+        loaded = await asyncio.to_thread(self._load)
+        if loaded:
+            self.ready = True
+            logger.info(f"Loaded document index with {len(self.docs)} documents")
+        self._task = asyncio.create_task(self._refresh_loop())
+    
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+    
+    def search(
+        self,
+        query: str,
+        base_path: Optional[str] = None,
+        regex: bool = False,
+        max_results: int = 20
+    ) -> List[Dict[str, Any]]:
+        with self._lock:
+            candidates = self._candidates(required_literals(query) if regex else [query.lower()])
+            docs = [self.docs[doc_id] for doc_id in candidates if doc_id in self.docs]
+        
+        if base_path:
+            prefix = str(Path(base_path).expanduser().resolve()).rstrip("/") + "/"
+            docs = [doc for doc in docs if doc[0].startswith(prefix)]
+        
+        compiled = re.compile(query if regex else re.escape(query), re.IGNORECASE | re.MULTILINE)
+        needle = query.lower()
+        now = time.time()
+        
+        def prior(doc: Tuple[str, int, int]) -> float:
+            age_days = max(now - doc[1] / 1e9, 0) / 86400
+            score = 1.0 / (1.0 + age_days / 30)
+            if not regex and needle in os.path.basename(doc[0]).lower():
+                score += 2.0
+            return score
+        
+        docs.sort(key=prior, reverse=True)
+        hits = []
+        budget = SEARCH_BYTE_BUDGET
+        
+        for doc in docs:
+            if len(hits) >= max_results * SEARCH_HIT_FACTOR or budget <= 0:
+                break
+            path, _, size = doc
+            budget -= size
+            text = self._read(path)
+            if text is None:
+                continue
+            
+            matches = list(itertools.islice(compiled.finditer(text), 100))
+            if not matches:
+                continue
+            
+            score = math.log1p(len(matches)) + prior(doc)
+            
+            first = matches[0]
+            line_start = text.rfind("\n", 0, first.start()) + 1
+            line_end = text.find("\n", first.end())
+            hits.append({
+                "path": path,
+                "score": round(score, 4),
+                "matches": len(matches),
+                "line": text.count("\n", 0, first.start()) + 1,
+                "snippet": text[line_start:line_end if line_end != -1 else len(text)][:SNIPPET_LENGTH].strip()
+            })
+        
+        hits.sort(key=lambda hit: hit["score"], reverse=True)
+        return hits[:max_results]
+    
+    def refresh(self) -> Dict[str, int]:
+        with self._refresh_lock:
+            return self._refresh()
+    
+    async def _refresh_loop(self):
+        while True:
+            try:
+                stats = await asyncio.to_thread(self.refresh)
+                self.ready = True
+                if stats["added"] or stats["updated"] or stats["removed"]:
+                    logger.info(f"Document index refreshed: {stats}")
+            except Exception as e:
+                logger.error(f"Error refreshing document index: {e}")
+            await asyncio.sleep(self.refresh_interval)
+    
+    def _candidates(self, literals: List[str]) -> Iterable[int]:
+        required = set()
+        for literal in literals:
+            required.update(trigrams(literal))
+        
+        if not required:
+            return list(self.docs)
+        
+        postings = sorted((self.postings.get(trigram, array("I")) for trigram in required), key=len)
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            if not candidates:
+                break
+            candidates.intersection_update(posting)
+        return candidates
+    
+    def _refresh(self) -> Dict[str, int]:
+        with self._lock:
+            known = {path: (mtime_ns, size) for path, mtime_ns, size in self.docs.values()}
+        
+        seen = set()
+        pending: List[Tuple[str, int, int, Optional[Set[str]]]] = []
+        added = updated = 0
+        
+        for path, mtime_ns, size in self._iter_documents():
+            seen.add(path)
+            previous = known.get(path)
+            if previous == (mtime_ns, size):
+                continue
+            if previous is None:
+                added += 1
+            else:
+                updated += 1
+            
+            text = self._read(path)
+            pending.append((path, mtime_ns, size, trigrams(text.lower()) if text is not None else None))
+            if len(pending) >= APPLY_BATCH_SIZE:
+                self._apply(pending, [])
+                pending = []
+        
+        removed = [path for path in known if path not in seen]
+        self._apply(pending, removed)
+        
+        with self._lock:
+            if self._stale_ratio() > 0.5:
+                self._compact()
+        
+        if added or updated or removed:
+            self._save()
+        
+        return {"added": added, "updated": updated, "removed": len(removed), "documents": len(self.docs)}
+    
+    def _apply(self, changed: List[Tuple[str, int, int, Optional[Set[str]]]], removed: List[str]):
+        with self._lock:
+            for path in removed:
+                self._remove(path)
+            for path, mtime_ns, size, grams in changed:
+                self._remove(path)
+                if grams is not None:
+                    self._add(path, mtime_ns, size, grams)
+    
+    def _iter_documents(self) -> Iterator[Tuple[str, int, int]]:
+        pending = list(self.roots)
+        while pending:
+            directory = pending.pop()
+            try:
+                with os.scandir(directory) as it:
+                    for entry in it:
+                        if entry.name.startswith("."):
+                            continue
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                pending.append(entry.path)
+                                continue
+                            if os.path.splitext(entry.name)[1].lower() not in self.extensions:
+                                continue
+                            entry.path.encode()
+                            stat = entry.stat()
+                        except (OSError, UnicodeEncodeError):
+                            continue
+                        if 0 < stat.st_size <= self.max_file_size:
+                            yield entry.path, stat.st_mtime_ns, stat.st_size
+            except OSError:
+                continue
+    
+    def _add(self, path: str, mtime_ns: int, size: int, grams: Set[str]):
+        doc_id = self.next_id
+        self.next_id += 1
+        self.docs[doc_id] = (path, mtime_ns, size)
+        self.paths[path] = doc_id
+        for trigram in grams:
+            posting = self.postings.get(trigram)
+            if posting is None:
+                self.postings[trigram] = array("I", (doc_id,))
+            else:
+                posting.append(doc_id)
+    
+    def _remove(self, path: str):
+        doc_id = self.paths.pop(path, None)
+        if doc_id is not None:
+            self.docs.pop(doc_id, None)
+    
+    def _stale_ratio(self) -> float:
+        return 1.0 - len(self.docs) / self.next_id if self.next_id else 0.0
+    
+    def _compact(self):
+        live = {doc_id: index for index, doc_id in enumerate(sorted(self.docs))}
+        self.docs = {live[doc_id]: doc for doc_id, doc in self.docs.items()}
+        self.paths = {path: doc_id for doc_id, (path, _, _) in self.docs.items()}
+        postings = {}
+        for trigram, posting in self.postings.items():
+            remapped = array("I", (live[doc_id] for doc_id in posting if doc_id in live))
+            if remapped:
+                postings[trigram] = remapped
+        self.postings = postings
+        self.next_id = len(self.docs)
+    
+    def _read(self, path: str) -> Optional[str]:
+        try:
+            with open(path, "rb") as f:
+                data = f.read(self.max_file_size + 1)
+        except OSError:
+            return None
+        if b"\0" in data[:8192]:
+            return None
+        return data.decode("utf-8", errors="ignore")
+    
+    def _load(self) -> bool:
+        if not self.index_path.exists():
+            return False
+        try:
+            with contextlib.closing(sqlite3.connect(self.index_path)) as db:
+                meta = dict(db.execute("SELECT key, value FROM meta"))
+                if int(meta.get("version", 0)) != INDEX_VERSION or json.loads(meta.get("roots", "null")) != self.roots:
+                    return False
+                docs = {doc_id: (path, mtime_ns, size) for doc_id, path, mtime_ns, size in db.execute(
+                    "SELECT doc_id, path, mtime_ns, size FROM docs"
+                )}
+                postings = {}
+                for trigram, blob in db.execute("SELECT trigram, doc_ids FROM postings"):
+                    posting = array("I")
+                    posting.frombytes(blob)
+                    postings[trigram] = posting
+                next_id = int(meta["next_id"])
+        except (sqlite3.Error, ValueError, KeyError) as e:
+            logger.warning(f"Ignoring unreadable document index: {e}")
+            return False
+        
+        with self._lock:
+            self.docs = docs
+            self.postings = postings
+            self.next_id = next_id
+            self.paths = {path: doc_id for doc_id, (path, _, _) in docs.items()}
+        return True
+    
+    def _save(self):
+        with self._lock:
+            docs = [(doc_id, *doc) for doc_id, doc in self.docs.items()]
+            postings = [(trigram, posting.tobytes()) for trigram, posting in self.postings.items()]
+            next_id = self.next_id
+        
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.index_path.with_suffix(".tmp")
+        temp_path.unlink(missing_ok=True)
+        with contextlib.closing(sqlite3.connect(temp_path)) as db:
+            db.executescript("""
+                CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+                CREATE TABLE docs (doc_id INTEGER PRIMARY KEY, path TEXT, mtime_ns INTEGER, size INTEGER);
+                CREATE TABLE postings (trigram TEXT PRIMARY KEY, doc_ids BLOB);
+            """)
+            db.executemany("INSERT INTO meta VALUES (?, ?)", [
+                ("version", str(INDEX_VERSION)),
+                ("roots", json.dumps(self.roots)),
+                ("next_id", str(next_id))
+            ])
+            db.executemany("INSERT INTO docs VALUES (?, ?, ?, ?)", docs)
+            db.executemany("INSERT INTO postings VALUES (?, ?)", postings)
+            db.commit()
+        os.replace(temp_path, self.index_path)
@@ -0,0 +1,89 @@
+import asyncio
+import contextvars
+import functools
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from ..core.config import settings
+from ..utils.logger import setup_logger
+
+logger = setup_logger("executor", settings.log.level, settings.log.log_file)
+
+IO = "io"
+CPU = "cpu"
+ASYNC = "async"
+
+
+def blocking_io(func: Callable) -> Callable:
+    func.tool_kind = IO
+    return func
+
+
+def cpu_bound(func: Callable) -> Callable:
+    func.tool_kind = CPU
+    return func
+
+
+def tool_kind(func: Callable) -> str:
+    return getattr(func, "tool_kind", ASYNC)
+
+
+class ToolExecutor:
+    def __init__(self, io_workers: Optional[int] = None, cpu_workers: Optional[int] = None):
+        self.io_workers = io_workers or None
+        self.cpu_workers = cpu_workers or multiprocessing.cpu_count()
+        self.io_pool = ThreadPoolExecutor(max_workers=self.io_workers, thread_name_prefix="mcp-io")
+        self._cpu_pool: Optional[ProcessPoolExecutor] = None
+        self.pending = {IO: 0, CPU: 0}
+        self.completed = {IO: 0, CPU: 0}
+    
+    @property
+    def cpu_pool(self) -> ProcessPoolExecutor:
+        if self._cpu_pool is None:
+            self._cpu_pool = ProcessPoolExecutor(
+                max_workers=self.cpu_workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._cpu_pool
+    
+    def bind(self, func: Callable) -> Callable:
+        if tool_kind(func) != IO:
+            return func
+        if asyncio.iscoroutinefunction(func):
+            raise TypeError(f"{func.__name__} is a coroutine; only sync tools can be marked blocking_io")
+        
+        @functools.wraps(func)
+        async def call(*args, **kwargs):
+            return await self.run_io(func, *args, **kwargs)
+        return call
+    
+    async def run_io(self, func: Callable, *args, **kwargs) -> Any:
+        context = contextvars.copy_context()
+        return await self._submit(IO, self.io_pool, functools.partial(context.run, func, *args, **kwargs))
+    
+    async def run_cpu(self, func: Callable, *args) -> Any:
+        return await self._submit(CPU, self.cpu_pool, functools.partial(func, *args))
+    
+    async def _submit(self, kind: str, pool: Executor, call: Callable) -> Any:
+        self.pending[kind] += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(pool, call)
+        finally:
+            self.pending[kind] -= 1
+            self.completed[kind] += 1
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "io_workers": self.io_pool._max_workers,
+            "cpu_workers": self.cpu_workers,
+            "pending": dict(self.pending),
+            "completed": dict(self.completed)
+        }
+    
+    def shutdown(self):
+        self.io_pool.shutdown(wait=False, cancel_futures=True)
+        if self._cpu_pool is not None:
+            self._cpu_pool.shutdown(wait=False, cancel_futures=True)
+            self._cpu_pool = None
+        logger.debug("Tool executor shut down")
@@ -0,0 +1,300 @@
+import asyncio
+import gzip
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+from ..utils.logger import setup_logger
+from ..core.config import settings
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:
+    FileSystemEventHandler = object
+    Observer = None
+
+logger = setup_logger("file_index", settings.log.level, settings.log.log_file)
+
+
+def glob_to_regex(pattern: str) -> str:
+    parts = []
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == "*":
+            if pattern[i:i + 3] == "**/":
+                parts.append(r"(?:[^\n]*/)?")
+                i += 3
+                continue
+            parts.append(r"[^/\n]*")
+        elif char == "?":
+            parts.append(r"[^/\n]")
+        elif char == "[":
+            end = pattern.find("]", i + 2 if pattern[i + 1:i + 2] in ("!", "]") else i + 1)
+            if end == -1:
+                parts.append(re.escape(char))
+            else:
+                body = pattern[i + 1:end].replace("\\", "\\\\")
+                if body.startswith("!"):
+                    body = "^" + body[1:]
+                parts.append(f"[{body}]")
+                i = end
+        else:
+            parts.append(re.escape(char))
+        i += 1
+    return "".join(parts)
+
+
+class _IndexEventHandler(FileSystemEventHandler):
+    def __init__(self, index: "FileIndex"):
+        super().__init__()
+        self.index = index
+    
+    def on_created(self, event):
+        self.index.add(event.src_path, event.is_directory)
+    
+    def on_deleted(self, event):
+        self.index.remove(event.src_path)
+    
+    def on_moved(self, event):
+        self.index.remove(event.src_path)
+        self.index.add(event.dest_path, event.is_directory)
+        if event.is_directory:
+            self.index.add_tree(event.dest_path)
+
+
+class FileIndex:
+    def __init__(
+        self,
+        roots: Iterable[str],
+        index_path: str,
+        exclude: Iterable[str] = (),
+        snapshot_interval: float = 60.0
+    ):
+        self.roots = [str(Path(root).expanduser().resolve()) for root in roots]
+        self.index_path = Path(index_path).expanduser()
+        self.exclude: Set[str] = set(exclude)
+        self.snapshot_interval = snapshot_interval
+        self.entries: Dict[str, bool] = {}
+        self.ready = False
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._blob: Optional[str] = None
+        self._journal: Optional[List[tuple]] = None
+        self._observer = None
+        self._tasks: List[asyncio.Task] = []
+    
+    async def start(self):
+        loaded = await asyncio.to_thread(self._load_snapshot)
+        if loaded:
+            self.ready = True
+            logger.info(f"Loaded file index snapshot with {len(self.entries)} entries")
+        
+        self._start_watching()
+        self._tasks.append(asyncio.create_task(self._rebuild()))
+        self._tasks.append(asyncio.create_task(self._snapshot_loop()))
+    
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        if self._observer:
+            self._observer.stop()
+        if self._dirty:
+            await asyncio.to_thread(self._save_snapshot)
+    
+    def covers(self, path: str) -> bool:
+        if not self.ready:
+            return False
+        return any(
+            (path == root or path.startswith(root.rstrip("/") + "/"))
+            and not self._is_excluded(path[len(root):])
+            for root in self.roots
+        )
+    
+    def search(
+        self,
+        base: str,
+        pattern: str,
+        substring: bool = False,
+        max_results: Optional[int] = None,
+        files_only: bool = False
+    ) -> List[str]:
+        prefix = base.rstrip("/") + "/"
+        if substring:
+            tail = r"[^\n]*?(?i:" + re.escape(pattern) + ")"
+        else:
+            tail = r"(?:[^\n]*/)?" + glob_to_regex(pattern) + r"$"
+        regex = re.compile(re.escape(prefix) + tail, re.MULTILINE)
+        
+        blob = self._get_blob()
+        results = []
+        position = 0
+        while max_results is None or len(results) < max_results:
+            match = regex.search(blob, position)
+            if match is None:
+                break
+            
+            line_end = blob.find("\n", match.end())
+            if line_end == -1:
+                line_end = len(blob)
+            
+            start = match.start()
+            if start == 0 or blob[start - 1] == "\n":
+                path = blob[start:line_end]
+                if not files_only or self.entries.get(path) is False:
+                    results.append(path)
+                position = line_end + 1
+            else:
+                position = start + 1
+        
+        results.sort()
+        return results
+    
+    def add(self, path: str, is_dir: bool):
+        if "\n" in path or self._is_excluded(path):
+            return
+        with self._lock:
+            if self._journal is not None:
+                self._journal.append(("add", path, is_dir))
+            self.entries[path] = is_dir
+            self._changed()
+    
+    def add_tree(self, path: str):
+        for entry_path, is_dir in self._walk(path):
+            self.add(entry_path, is_dir)
+    
+    def remove(self, path: str):
+        with self._lock:
+            if self._journal is not None:
+                self._journal.append(("remove", path, None))
+            self._remove_locked(path)
+            self._changed()
+    
+    def _remove_locked(self, path: str):
+        if self.entries.pop(path, False):
+            prefix = path + "/"
+            for child in [p for p in self.entries if p.startswith(prefix)]:
+                del self.entries[child]
+    
+    def _changed(self):
+        self._dirty = True
+        self._blob = None
+    
+    def _get_blob(self) -> str:
+        with self._lock:
+            if self._blob is None:
+                self._blob = "\n".join(self.entries)
+            return self._blob
+    
+    def _is_excluded(self, path: str) -> bool:
+        return bool(self.exclude) and not self.exclude.isdisjoint(path.split("/"))
+    
+    def _walk(self, root: str) -> Iterable[tuple]:
+        pending = [root]
+        while pending:
+            directory = pending.pop()
+            try:
+                with os.scandir(directory) as it:
+                    for entry in it:
+                        if entry.name in self.exclude or "\n" in entry.name:
+                            continue
+                        try:
+                            is_dir = entry.is_dir(follow_symlinks=False)
+                        except OSError:
+                            continue
+                        if is_dir:
+                            pending.append(entry.path)
+                        yield entry.path, is_dir
+            except OSError:
+                continue
+    
+    def _scan(self) -> Dict[str, bool]:
+        entries: Dict[str, bool] = {}
+        for root in self.roots:
+            entries.update(self._walk(root))
+        return entries
+    
+    async def _rebuild(self):
+        with self._lock:
+            self._journal = []
+        
+        try:
+            entries = await asyncio.to_thread(self._scan)
+        except Exception as e:
+            logger.error(f"Error building file index: {e}")
+            with self._lock:
+                self._journal = None
+            return
+        
+        with self._lock:
+            journal, self._journal = self._journal, None
+            self.entries = entries
+            for action, path, is_dir in journal:
+                if action == "add":
+                    self.entries[path] = is_dir
+                else:
+                    self._remove_locked(path)
+            self._changed()
+        
+        self.ready = True
+        logger.info(f"File index built with {len(self.entries)} entries")
+        await asyncio.to_thread(self._save_snapshot)
+    
+    async def _snapshot_loop(self):
+        while True:
+            await asyncio.sleep(self.snapshot_interval)
+            if self._dirty and self._journal is None:
+                try:
+                    await asyncio.to_thread(self._save_snapshot)
+                except Exception as e:
+                    logger.error(f"Error saving file index: {e}")
+    
+    def _start_watching(self):
+        if Observer is None:
+            logger.warning("watchdog not installed; file index will not track changes")
+            return
+        
+        self._observer = Observer()
+        handler = _IndexEventHandler(self)
+        for root in self.roots:
+            try:
+                self._observer.schedule(handler, root, recursive=True)
+            except OSError as e:
+                logger.warning(f"Cannot watch {root}: {e}")
+        self._observer.daemon = True
+        self._observer.start()
+    
+    def _load_snapshot(self) -> bool:
+        if not self.index_path.exists():
+            return False
+        try:
+            with gzip.open(self.index_path, "rt", encoding="utf-8", errors="surrogateescape") as f:
+                roots = f.readline().rstrip("\n").split("\t")
+                if roots != self.roots:
+                    return False
+                entries = {line[1:-1]: line[0] == "D" for line in f}
+        except (OSError, EOFError) as e:
+            logger.warning(f"Ignoring unreadable file index snapshot: {e}")
+            return False
+        
+        with self._lock:
+            self.entries = entries
+            self._changed()
+            self._dirty = False
+        return True
+    
+    def _save_snapshot(self):
+        with self._lock:
+            items = list(self.entries.items())
+            self._dirty = False
+        
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.index_path.with_suffix(".tmp")
+        with gzip.open(temp_path, "wt", encoding="utf-8", errors="surrogateescape", compresslevel=1) as f:
+            f.write("\t".join(self.roots) + "\n")
+            for path, is_dir in items:
+                f.write(("D" if is_dir else "F") + path + "\n")
+        os.replace(temp_path, self.index_path)
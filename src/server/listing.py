@@ -0,0 +1,84 @@
+import itertools
+import os
+import secrets
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+CURSOR_TTL = 300.0
+MAX_CURSORS_PER_SESSION = 32
+
+
+def walk_entries(root: str, recursive: bool = False) -> Iterator[Dict[str, Any]]:
+    pending = [root]
+    while pending:
+        directory = pending.pop()
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    try:
+                        is_file = entry.is_file()
+                        item = {
+                            "name": entry.name,
+                            "path": entry.path,
+                            "type": "file" if is_file else "directory",
+                            "size": None
+                        }
+                        if is_file:
+                            stat = entry.stat()
+                            item["size"] = stat.st_size
+                            item["mtime"] = stat.st_mtime
+                        elif recursive and entry.is_dir(follow_symlinks=False):
+                            pending.append(entry.path)
+                    except OSError:
+                        continue
+                    yield item
+        except OSError:
+            if directory == root:
+                raise
+
+
+class ListingCursor:
+    def __init__(self, root: str, recursive: bool):
+        self.cursor_id = secrets.token_urlsafe(16)
+        self.last_used = time.monotonic()
+        self._entries = walk_entries(root, recursive)
+        self._lookahead: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+    
+    def next_page(self, page_size: int) -> Tuple[List[Dict[str, Any]], bool]:
+        if not self._lock.acquire(blocking=False):
+            raise RuntimeError(f"Cursor {self.cursor_id} is already serving another page")
+        try:
+            self.last_used = time.monotonic()
+            wanted = page_size + 1 - len(self._lookahead)
+            items = self._lookahead + list(itertools.islice(self._entries, max(wanted, 0)))
+            page, self._lookahead = items[:page_size], items[page_size:]
+            return page, bool(self._lookahead)
+        finally:
+            self._lock.release()
+
+
+class CursorStore:
+    def __init__(self):
+        self.cursors: Dict[str, ListingCursor] = {}
+    
+    def add(self, cursor: ListingCursor):
+        self.prune()
+        if len(self.cursors) >= MAX_CURSORS_PER_SESSION:
+            oldest = min(self.cursors.values(), key=lambda c: c.last_used)
+            self.cursors.pop(oldest.cursor_id, None)
+        self.cursors[cursor.cursor_id] = cursor
+    
+    def get(self, cursor_id: str) -> Optional[ListingCursor]:
+        self.prune()
+        return self.cursors.get(cursor_id)
+    
+    def discard(self, cursor_id: str):
+        self.cursors.pop(cursor_id, None)
+    
+    def prune(self):
+        deadline = time.monotonic() - CURSOR_TTL
+        for cursor_id, cursor in list(self.cursors.items()):
+            if cursor.last_used < deadline:
+                self.cursors.pop(cursor_id, None)
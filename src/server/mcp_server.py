@@ -1,33 +1,99 @@
 import asyncio
+import codecs
+import contextlib
+import hashlib
+import itertools
 import json
+import os
+import signal
+import struct
+import time
+import uuid
+import zlib
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, List, Optional
 import websockets
 from websockets.server import WebSocketServerProtocol
 import jwt
 from datetime import datetime, timedelta
 
 from ..core.config import settings
+from ..core.compression import Compressor, negotiate_algorithm
+from ..core.protocol import MAX_CHUNK_SIZE, Frame, ProtocolError, is_chunk_frame, negotiate_codec, unpack_chunk
+from ..utils.delta import apply_delta, compute_delta, file_signatures
 from ..utils.logger import setup_logger
+from ..utils.manifest import scan_manifest
+from .content_search import ContentSearchEngine, iter_candidate_files
+from .document_index import TrigramIndex
+from .executor import ToolExecutor, blocking_io, cpu_bound, tool_kind
+from .file_index import FileIndex
+from .listing import ListingCursor, walk_entries
+from .metrics import ServerMetrics, serve_prometheus
+from .session import ClientSession, ResponseStream, current_session
+from .uploads import UploadError, UploadManager
 
 logger = setup_logger("mcp_server", settings.log.level, settings.log.log_file)
 
+COMMAND_READ_SIZE = 64 * 1024
+DEFAULT_PAGE_SIZE = 500
+
 class MCPServer:
     def __init__(self):
         self.host = settings.mcp.server_host
         self.port = settings.mcp.server_port
         self.secret_key = settings.mcp.secret_key
         self.clients: Dict[str, WebSocketServerProtocol] = {}
+        self.sessions: Dict[str, ClientSession] = {}
+        self.metrics = ServerMetrics()
+        self.executor = ToolExecutor(settings.mcp.io_workers, settings.mcp.cpu_workers)
         self.tools = self._register_tools()
+        self.stream_tools = self._register_stream_tools()
+        self.uploads = UploadManager()
+        self.file_index = FileIndex(
+            settings.index.file_index_roots,
+            settings.index.file_index_path,
+            settings.index.file_index_exclude
+        ) if settings.index.file_index_enabled else None
+        self.document_index = TrigramIndex(
+            settings.index.document_roots,
+            settings.index.document_index_path,
+            settings.index.document_extensions,
+            settings.index.document_max_file_size,
+            settings.index.document_refresh_interval
+        ) if settings.index.document_index_enabled else None
+        self.content_search = ContentSearchEngine(self.executor, settings.search.content_max_file_size)
     
     def _register_tools(self) -> Dict[str, callable]:
-        return {
+        tools = {
             "list_files": self.list_files,
             "read_file": self.read_file,
             "write_file": self.write_file,
             "execute_command": self.execute_command,
             "get_system_info": self.get_system_info,
             "search_files": self.search_files,
+            "document_search": self.document_search,
+            "refresh_document_index": self.refresh_document_index,
+            "upload_open": self.upload_open,
+            "upload_commit": self.upload_commit,
+            "upload_abort": self.upload_abort,
+            "file_signatures": self.file_signatures,
+            "file_delta": self.file_delta,
+            "apply_delta": self.apply_delta,
+            "directory_manifest": self.directory_manifest,
+            "remove_files": self.remove_files,
+            "signal_command": self.signal_command,
+            "get_connection_stats": self.get_connection_stats,
+            "get_metrics": self.get_metrics,
+            "batch": self.batch,
+        }
+        return {name: self.executor.bind(tool) for name, tool in tools.items()}
+    
+    def _register_stream_tools(self) -> Dict[str, callable]:
+        return {
+            "read_file_stream": self.read_file_stream,
+            "execute_command_stream": self.execute_command_stream,
+            "search_content": self.search_content,
+            "batch_stream": self.batch_stream,
         }
     
     def generate_token(self, client_id: str) -> str:
@@ -48,8 +114,24 @@ class MCPServer:
             logger.warning("Invalid token")
             return None
     
-    async def list_files(self, path: str, recursive: bool = False) -> Dict[str, Any]:
+    @blocking_io
+    def list_files(
+        self,
+        path: str,
+        recursive: bool = False,
+        page_size: Optional[int] = None,
+        cursor: Optional[str] = None,
+        if_none_match: Optional[str] = None
+    ) -> Dict[str, Any]:
         try:
+            session = current_session.get()
+            
+            if cursor is not None:
+                listing = session.cursors.get(cursor)
+                if listing is None:
+                    return {"error": f"Cursor expired or unknown: {cursor}"}
+                return self._listing_page(session, listing, page_size or DEFAULT_PAGE_SIZE)
+            
             target_path = Path(path).expanduser()
             if not target_path.exists():
                 return {"error": f"Path does not exist: {path}"}
@@ -61,22 +143,38 @@ class MCPServer:
                     "size": target_path.stat().st_size
                 }
             
-            files = []
-            pattern = "**/*" if recursive else "*"
-            for item in target_path.glob(pattern):
-                files.append({
-                    "name": item.name,
-                    "path": str(item),
-                    "type": "file" if item.is_file() else "directory",
-                    "size": item.stat().st_size if item.is_file() else None
-                })
+            if page_size is None:
+                files = list(walk_entries(str(target_path), recursive))
+                etag = _content_etag(files)
+                if etag == if_none_match:
+                    return {"etag": etag, "not_modified": True}
+                return {"files": files, "count": len(files), "etag": etag}
             
-            return {"files": files, "count": len(files)}
+            listing = ListingCursor(str(target_path), recursive)
+            session.cursors.add(listing)
+            return self._listing_page(session, listing, page_size)
         except Exception as e:
             logger.error(f"Error listing files: {e}")
             return {"error": str(e)}
     
-    async def read_file(self, path: str, encoding: str = "utf-8") -> Dict[str, Any]:
+    def _listing_page(self, session: ClientSession, listing: ListingCursor, page_size: int) -> Dict[str, Any]:
+        files, has_more = listing.next_page(page_size)
+        if not has_more:
+            session.cursors.discard(listing.cursor_id)
+        
+        return {
+            "files": files,
+            "count": len(files),
+            "next_cursor": listing.cursor_id if has_more else None
+        }
+    
+    @blocking_io
+    def read_file(
+        self,
+        path: str,
+        encoding: str = "utf-8",
+        if_none_match: Optional[str] = None
+    ) -> Dict[str, Any]:
         try:
             target_path = Path(path).expanduser()
             if not target_path.exists():
@@ -85,21 +183,72 @@ class MCPServer:
             if not target_path.is_file():
                 return {"error": f"Path is not a file: {path}"}
             
-            content = target_path.read_text(encoding=encoding)
+            with open(target_path, "rb") as f:
+                etag = _file_etag(os.fstat(f.fileno()))
+                if etag == if_none_match:
+                    return {"path": str(target_path), "etag": etag, "not_modified": True}
+                content = f.read().decode(encoding)
+            
             return {
                 "path": str(target_path),
                 "content": content,
-                "size": len(content)
+                "size": len(content),
+                "etag": etag
             }
         except Exception as e:
             logger.error(f"Error reading file: {e}")
             return {"error": str(e)}
     
-    async def write_file(self, path: str, content: str, encoding: str = "utf-8") -> Dict[str, Any]:
+    async def read_file_stream(
+        self,
+        stream: ResponseStream,
+        path: str,
+        offset: int = 0,
+        length: Optional[int] = None,
+        chunk_size: Optional[int] = None
+    ) -> Dict[str, Any]:
+        try:
+            target_path = Path(path).expanduser()
+            if not target_path.is_file():
+                return {"error": f"File does not exist: {path}"}
+            
+            chunk_size = min(chunk_size or settings.mcp.stream_chunk_size, MAX_CHUNK_SIZE)
+            
+            with open(target_path, "rb") as f:
+                size = os.fstat(f.fileno()).st_size
+                start = min(max(offset, 0), size)
+                end = size if length is None else min(start + max(length, 0), size)
+                
+                position = start
+                while position < end:
+                    chunk = await self.executor.run_io(os.pread, f.fileno(), min(chunk_size, end - position), position)
+                    if not chunk:
+                        end = position
+                        break
+                    await stream.send_chunk(position, chunk)
+                    position += len(chunk)
+            
+            return {
+                "path": str(target_path),
+                "offset": start,
+                "length": end - start,
+                "size": size
+            }
+        except Exception as e:
+            logger.error(f"Error streaming file: {e}")
+            return {"error": str(e)}
+    
+    @blocking_io
+    def write_file(self, path: str, content: str, encoding: str = "utf-8") -> Dict[str, Any]:
         try:
             target_path = Path(path).expanduser()
             target_path.parent.mkdir(parents=True, exist_ok=True)
-            target_path.write_text(content, encoding=encoding)
+            temp_path = target_path.parent / f".{target_path.name}.{uuid.uuid4().hex}.tmp"
+            try:
+                temp_path.write_text(content, encoding=encoding)
+                os.replace(temp_path, target_path)
+            finally:
+                temp_path.unlink(missing_ok=True)
             return {
                 "path": str(target_path),
                 "size": len(content),
@@ -109,6 +258,197 @@ class MCPServer:
             logger.error(f"Error writing file: {e}")
             return {"error": str(e)}
     
+    @blocking_io
+    def upload_open(self, path: str, upload_id: Optional[str] = None) -> Dict[str, Any]:
+        try:
+            upload = self.uploads.open(path, current_session.get().session_id, upload_id)
+            return {
+                "upload_id": upload.upload_id,
+                "path": str(upload.target_path),
+                "offset": upload.offset
+            }
+        except Exception as e:
+            logger.error(f"Error opening upload: {e}")
+            return {"error": str(e)}
+    
+    @blocking_io
+    def upload_commit(
+        self,
+        upload_id: str,
+        size: Optional[int] = None,
+        sha256: Optional[str] = None,
+        mtime_ns: Optional[int] = None
+    ) -> Dict[str, Any]:
+        try:
+            return self.uploads.commit(upload_id, size, sha256, mtime_ns)
+        except Exception as e:
+            logger.error(f"Error committing upload: {e}")
+            return {"error": str(e)}
+    
+    @blocking_io
+    def upload_abort(self, upload_id: str) -> Dict[str, Any]:
+        return {"upload_id": upload_id, "aborted": self.uploads.abort(upload_id)}
+    
+    @cpu_bound
+    async def file_signatures(self, path: str, block_size: Optional[int] = None) -> Dict[str, Any]:
+        try:
+            target_path = Path(path).expanduser()
+            if not await self.executor.run_io(target_path.is_file):
+                return {"error": f"File does not exist: {path}"}
+            
+            signatures = await self.executor.run_cpu(file_signatures, target_path, block_size)
+            return {"path": str(target_path), **signatures}
+        except Exception as e:
+            logger.error(f"Error computing file signatures: {e}")
+            return {"error": str(e)}
+    
+    @cpu_bound
+    async def file_delta(self, path: str, signatures: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            target_path = Path(path).expanduser()
+            if not await self.executor.run_io(target_path.is_file):
+                return {"error": f"File does not exist: {path}"}
+            
+            ops, literal_bytes, sha256 = await self.executor.run_cpu(compute_delta, target_path, signatures)
+            if literal_bytes > settings.mcp.max_message_size // 2:
+                return {"path": str(target_path), "too_large": True, "literal_bytes": literal_bytes}
+            
+            return {
+                "path": str(target_path),
+                "block_size": signatures["block_size"],
+                "ops": ops,
+                "literal_bytes": literal_bytes,
+                "sha256": sha256
+            }
+        except Exception as e:
+            logger.error(f"Error computing file delta: {e}")
+            return {"error": str(e)}
+    
+    @blocking_io
+    def apply_delta(
+        self,
+        path: str,
+        ops: List[Any],
+        block_size: int,
+        sha256: str,
+        mtime_ns: Optional[int] = None
+    ) -> Dict[str, Any]:
+        try:
+            target_path = Path(path).expanduser()
+            target_path.parent.mkdir(parents=True, exist_ok=True)
+            basis_path = target_path if target_path.is_file() else None
+            
+            size = apply_delta(basis_path, ops, block_size, target_path, sha256, mtime_ns)
+            return {
+                "path": str(target_path),
+                "size": size,
+                "success": True
+            }
+        except Exception as e:
+            logger.error(f"Error applying delta: {e}")
+            return {"error": str(e)}
+    
+    @blocking_io
+    def directory_manifest(
+        self,
+        path: str,
+        include: Optional[List[str]] = None,
+        exclude: Optional[List[str]] = None,
+        checksum: bool = False
+    ) -> Dict[str, Any]:
+        try:
+            root = Path(path).expanduser()
+            if root.exists() and not root.is_dir():
+                return {"error": f"Path is not a directory: {path}"}
+            
+            entries = scan_manifest(root, include, exclude, checksum)
+            return {
+                "path": str(root),
+                "exists": root.exists(),
+                "entries": entries,
+                "count": len(entries)
+            }
+        except Exception as e:
+            logger.error(f"Error building directory manifest: {e}")
+            return {"error": str(e)}
+    
+    @blocking_io
+    def remove_files(self, path: str, files: List[str]) -> Dict[str, Any]:
+        try:
+            root = Path(path).expanduser().resolve()
+            removed = 0
+            errors = {}
+            
+            for rel_path in files:
+                target = (root / rel_path).resolve()
+                if not target.is_relative_to(root) or target == root:
+                    errors[rel_path] = "Path escapes sync root"
+                    continue
+                try:
+                    target.unlink()
+                    removed += 1
+                except OSError as e:
+                    errors[rel_path] = str(e)
+            
+            return {"path": str(root), "removed": removed, "errors": errors}
+        except Exception as e:
+            logger.error(f"Error removing files: {e}")
+            return {"error": str(e)}
+    
+    async def batch(self, calls: List[Dict[str, Any]], max_concurrency: Optional[int] = None) -> Dict[str, Any]:
+        results: List[Optional[Dict[str, Any]]] = [None] * len(calls)
+        
+        async def store(index: int, item: Dict[str, Any]):
+            results[index] = item
+        
+        await self._run_batch(calls, max_concurrency, store)
+        return {"results": results, "count": len(results)}
+    
+    async def batch_stream(
+        self,
+        stream: ResponseStream,
+        calls: List[Dict[str, Any]],
+        max_concurrency: Optional[int] = None
+    ) -> Dict[str, Any]:
+        async def forward(index: int, item: Dict[str, Any]):
+            await stream.send_event({"index": index, **item})
+        
+        await self._run_batch(calls, max_concurrency, forward)
+        return {"count": len(calls)}
+    
+    async def _run_batch(self, calls: List[Dict[str, Any]], max_concurrency: Optional[int], on_result):
+        semaphore = asyncio.Semaphore(max_concurrency or settings.mcp.batch_concurrency)
+        
+        async def run(index: int, call: Dict[str, Any]):
+            tool_name = call.get("tool")
+            async with semaphore:
+                if tool_name not in self.tools or tool_name == "batch":
+                    item = {"error": f"Tool not allowed in batch: {tool_name}"}
+                else:
+                    started = self.metrics.request_started(tool_name)
+                    try:
+                        item = {"result": await self.tools[tool_name](**call.get("params", {}))}
+                    except Exception as e:
+                        item = {"error": str(e)}
+                    self.metrics.request_finished(tool_name, started, _is_error(item))
+            await on_result(index, item)
+        
+        await asyncio.gather(*(run(index, call) for index, call in enumerate(calls)))
+    
+    async def handle_upload_chunk(self, session: ClientSession, frame: bytes):
+        try:
+            upload_id, offset, data = unpack_chunk(frame)
+        except (ValueError, struct.error, UnicodeDecodeError):
+            await session.send({"error": "Invalid binary frame"})
+            return
+        
+        try:
+            acked = await self.executor.run_io(self.uploads.get(upload_id).write, offset, data)
+            await session.send({"type": "upload_ack", "upload_id": upload_id, "offset": acked})
+        except (UploadError, OSError) as e:
+            logger.error(f"Error writing upload chunk: {e}")
+            await session.send({"type": "upload_ack", "upload_id": upload_id, "error": str(e)})
+    
     async def execute_command(self, command: str, cwd: Optional[str] = None) -> Dict[str, Any]:
         try:
             process = await asyncio.create_subprocess_shell(
@@ -117,7 +457,12 @@ class MCPServer:
                 stderr=asyncio.subprocess.PIPE,
                 cwd=cwd
             )
-            stdout, stderr = await process.communicate()
+            try:
+                stdout, stderr = await process.communicate()
+            except asyncio.CancelledError:
+                with contextlib.suppress(ProcessLookupError):
+                    process.kill()
+                raise
             
             return {
                 "command": command,
@@ -129,12 +474,105 @@ class MCPServer:
             logger.error(f"Error executing command: {e}")
             return {"error": str(e)}
     
-    async def get_system_info(self) -> Dict[str, Any]:
+    async def execute_command_stream(
+        self,
+        stream: ResponseStream,
+        command: str,
+        cwd: Optional[str] = None,
+        timeout: Optional[float] = None,
+        max_output: Optional[int] = None
+    ) -> Dict[str, Any]:
+        session = current_session.get()
+        max_output = max_output or settings.mcp.max_command_output
+        sent = {"stdout": 0, "stderr": 0}
+        truncated = False
+        timed_out = False
+        
+        async def forward(name: str, reader: asyncio.StreamReader):
+            nonlocal truncated
+            decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+            while True:
+                data = await reader.read(COMMAND_READ_SIZE)
+                if not data:
+                    break
+                
+                remaining = max_output - sent["stdout"] - sent["stderr"]
+                if remaining <= 0:
+                    truncated = True
+                    continue
+                
+                data = data[:remaining]
+                sent[name] += len(data)
+                text = decoder.decode(data)
+                if text:
+                    await stream.send_event({"stream": name, "data": text})
+            
+            text = decoder.decode(b"", final=True)
+            if text:
+                await stream.send_event({"stream": name, "data": text})
+        
+        try:
+            process = await asyncio.create_subprocess_shell(
+                command,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                cwd=cwd,
+                start_new_session=True
+            )
+        except Exception as e:
+            logger.error(f"Error executing command: {e}")
+            return {"error": str(e)}
+        
+        session.processes[stream.request_id] = process
+        readers = asyncio.gather(
+            forward("stdout", process.stdout),
+            forward("stderr", process.stderr)
+        )
+        
+        try:
+            try:
+                await asyncio.wait_for(asyncio.shield(readers), timeout=timeout)
+            except asyncio.TimeoutError:
+                timed_out = True
+                _signal_process_group(process, signal.SIGKILL)
+                await readers
+            
+            returncode = await process.wait()
+        finally:
+            session.processes.pop(stream.request_id, None)
+            if process.returncode is None:
+                _signal_process_group(process, signal.SIGKILL)
+                readers.cancel()
+        
+        return {
+            "command": command,
+            "returncode": returncode,
+            "timed_out": timed_out,
+            "truncated": truncated,
+            "stdout_bytes": sent["stdout"],
+            "stderr_bytes": sent["stderr"]
+        }
+    
+    async def signal_command(self, request_id: str, signal_name: str = "SIGTERM") -> Dict[str, Any]:
+        process = current_session.get().processes.get(request_id)
+        if process is None:
+            return {"error": f"No running command for request: {request_id}"}
+        
+        try:
+            signum = signal.Signals[signal_name.upper()]
+        except KeyError:
+            return {"error": f"Unknown signal: {signal_name}"}
+        
+        _signal_process_group(process, signum)
+        return {"request_id": request_id, "signal": signum.name, "sent": True}
+    
+    @blocking_io
+    def get_system_info(self) -> Dict[str, Any]:
         try:
             import platform
             import psutil
             
-            return {
+            info = {
                 "platform": platform.system(),
                 "platform_release": platform.release(),
                 "platform_version": platform.version(),
@@ -149,64 +587,263 @@ class MCPServer:
                     "free": psutil.disk_usage('/').free
                 }
             }
+            return info
         except Exception as e:
             logger.error(f"Error getting system info: {e}")
             return {"error": str(e)}
     
-    async def search_files(self, path: str, pattern: str, content_search: bool = False) -> Dict[str, Any]:
+    async def get_connection_stats(self) -> Dict[str, Any]:
+        session = current_session.get()
+        return {
+            "client_id": session.client_id,
+            "session_id": session.session_id,
+            "encoding": session.codec.name,
+            "compression": session.compressor.algorithm,
+            "compression_stats": session.compressor.stats.to_dict()
+        }
+    
+    async def get_metrics(self) -> Dict[str, Any]:
+        return {
+            **self.metrics.snapshot(len(self.clients), len(self.sessions)),
+            "executor": {
+                **self.executor.stats(),
+                "tools": {name: tool_kind(tool) for name, tool in self.tools.items()}
+            }
+        }
+    
+    def _render_metrics(self) -> str:
+        return self.metrics.render_prometheus(len(self.clients), len(self.sessions))
+    
+    async def search_files(
+        self,
+        path: str,
+        pattern: str,
+        content_search: bool = False,
+        substring: bool = False,
+        max_results: Optional[int] = None,
+        query: Optional[str] = None,
+        regex: bool = False,
+        ignore_case: bool = False
+    ) -> Dict[str, Any]:
         try:
             target_path = Path(path).expanduser()
             if not target_path.exists():
                 return {"error": f"Path does not exist: {path}"}
             
-            results = []
-            for item in target_path.rglob(pattern):
-                if content_search and item.is_file():
-                    try:
-                        content = item.read_text()
-                        if pattern in content:
-                            results.append(str(item))
-                    except:
-                        pass
+            if not content_search:
+                resolved = str(target_path.resolve())
+                if self.file_index and self.file_index.covers(resolved):
+                    results = await self.executor.run_io(
+                        self.file_index.search, resolved, pattern, substring, max_results
+                    )
+                    source = "index"
                 else:
-                    results.append(str(item))
+                    results = await self.executor.run_io(
+                        self._walk_search, target_path, pattern, substring, max_results
+                    )
+                    source = "walk"
+                return {"results": results, "count": len(results), "source": source}
+            
+            if query is None:
+                query, pattern = pattern, "*"
             
-            return {"results": results, "count": len(results)}
+            matches = []
+            
+            async def collect(match):
+                matches.append({"path": match[0], "line": match[1], "snippet": match[2]})
+            
+            summary = await self.content_search.search(
+                await self.executor.run_io(self._content_candidates, target_path, pattern),
+                query,
+                regex,
+                ignore_case,
+                max_results or settings.search.content_max_results,
+                collect
+            )
+            results = list(dict.fromkeys(match["path"] for match in matches))
+            return {**summary, "results": results, "matches": matches, "count": len(results)}
         except Exception as e:
             logger.error(f"Error searching files: {e}")
             return {"error": str(e)}
     
-    async def handle_message(self, websocket: WebSocketServerProtocol, message: str):
+    async def search_content(
+        self,
+        stream: ResponseStream,
+        path: str,
+        query: str,
+        pattern: str = "*",
+        regex: bool = False,
+        ignore_case: bool = False,
+        max_results: Optional[int] = None
+    ) -> Dict[str, Any]:
         try:
-            data = json.loads(message)
-            tool_name = data.get("tool")
-            params = data.get("params", {})
-            request_id = data.get("request_id")
+            target_path = Path(path).expanduser()
+            if not target_path.exists():
+                return {"error": f"Path does not exist: {path}"}
             
-            if tool_name not in self.tools:
-                response = {
-                    "request_id": request_id,
-                    "error": f"Unknown tool: {tool_name}"
-                }
-            else:
-                result = await self.tools[tool_name](**params)
-                response = {
-                    "request_id": request_id,
-                    "result": result
-                }
+            async def forward(match):
+                await stream.send_event({"path": match[0], "line": match[1], "snippet": match[2]})
             
-            await websocket.send(json.dumps(response))
-            logger.info(f"Processed tool: {tool_name}")
+            return await self.content_search.search(
+                await self.executor.run_io(self._content_candidates, target_path, pattern),
+                query,
+                regex,
+                ignore_case,
+                max_results or settings.search.content_max_results,
+                forward
+            )
+        except Exception as e:
+            logger.error(f"Error searching content: {e}")
+            return {"error": str(e)}
+    
+    @blocking_io
+    def document_search(
+        self,
+        query: str,
+        base_path: Optional[str] = None,
+        regex: bool = False,
+        max_results: int = 20
+    ) -> Dict[str, Any]:
+        if self.document_index is None:
+            return {"error": "Document index is disabled on this server"}
+        try:
+            hits = self.document_index.search(query, base_path, regex, max_results)
+            return {"results": hits, "count": len(hits), "ready": self.document_index.ready}
+        except Exception as e:
+            logger.error(f"Error searching documents: {e}")
+            return {"error": str(e)}
+    
+    @blocking_io
+    def refresh_document_index(self) -> Dict[str, Any]:
+        if self.document_index is None:
+            return {"error": "Document index is disabled on this server"}
+        try:
+            return self.document_index.refresh()
+        except Exception as e:
+            logger.error(f"Error refreshing document index: {e}")
+            return {"error": str(e)}
+    
+    def _content_candidates(self, target_path: Path, pattern: str) -> Iterable[str]:
+        if target_path.is_file():
+            return [str(target_path)]
+        
+        resolved = str(target_path.resolve())
+        if self.file_index and self.file_index.covers(resolved):
+            return self.file_index.search(resolved, pattern, files_only=True)
+        return iter_candidate_files(str(target_path), pattern)
+    
+    def _walk_search(
+        self,
+        target_path: Path,
+        pattern: str,
+        substring: bool,
+        max_results: Optional[int]
+    ) -> List[str]:
+        if substring:
+            needle = pattern.lower()
+            matches = (
+                str(item) for item in target_path.rglob("*")
+                if needle in str(item.relative_to(target_path)).lower()
+            )
+        else:
+            matches = (str(item) for item in target_path.rglob(pattern))
+        return list(itertools.islice(matches, max_results))
+    
+    async def dispatch_message(self, session: ClientSession, message: Frame, wire_size: int = 0):
+        try:
+            data = session.codec.decode(message)
+        except ProtocolError as e:
+            await session.send({"error": str(e)})
+            return
+        
+        self.metrics.record_in(session.client_id, self._metric_name(data.get("tool"), data.get("type")), wire_size)
+        if data.get("type") == "credit":
+            stream = session.streams.get(data.get("request_id"))
+            if stream:
+                stream.grant(data.get("bytes", 0))
+            return
+        
+        if data.get("type") == "cancel":
+            if session.cancel(data.get("request_id")):
+                logger.info(f"Cancelled request {data.get('request_id')} from {session.client_id}")
+            return
+        
+        task = asyncio.create_task(self.handle_message(session, data))
+        session.track(data.get("request_id"), task)
+    
+    def _metric_name(self, tool_name: Optional[str], message_type: Optional[str] = None) -> str:
+        if message_type in ("cancel", "credit"):
+            return message_type
+        if tool_name in self.tools or tool_name in self.stream_tools:
+            return tool_name
+        return "unknown"
+    
+    async def handle_message(self, session: ClientSession, data: Dict[str, Any]):
+        current_session.set(session)
+        tool_name = data.get("tool")
+        params = data.get("params", {})
+        request_id = data.get("request_id")
+        metric_name = self._metric_name(tool_name)
+        started = self.metrics.request_started(metric_name, session.client_id)
+        error = True
+        cancelled = False
+        
+        try:
+            async with session.semaphore:
+                if tool_name in self.stream_tools:
+                    stream = ResponseStream(session, request_id, data.get("window"))
+                    session.streams[request_id] = stream
+                    try:
+                        result = await self.stream_tools[tool_name](stream, **params)
+                    finally:
+                        session.streams.pop(request_id, None)
+                    response = {
+                        "request_id": request_id,
+                        "result": result
+                    }
+                elif tool_name not in self.tools:
+                    response = {
+                        "request_id": request_id,
+                        "error": f"Unknown tool: {tool_name}"
+                    }
+                else:
+                    result = await self.tools[tool_name](**params)
+                    response = {
+                        "request_id": request_id,
+                        "result": result
+                    }
             
-        except json.JSONDecodeError:
-            await websocket.send(json.dumps({"error": "Invalid JSON"}))
+            error = _is_error(response) or _is_error(response.get("result"))
+            await session.send(response)
+            logger.info(f"Processed tool: {tool_name}", extra={
+                "request_id": request_id,
+                "tool": tool_name,
+                "client_id": session.client_id,
+                "session_id": session.session_id,
+                "duration_ms": round((time.perf_counter() - started) * 1000, 3)
+            })
+        
+        except asyncio.CancelledError:
+            cancelled = True
+            with contextlib.suppress(websockets.exceptions.ConnectionClosed):
+                await session.send({
+                    "request_id": request_id,
+                    "error": "Request cancelled",
+                    "cancelled": True
+                })
+        except websockets.exceptions.ConnectionClosed:
+            pass
         except Exception as e:
             logger.error(f"Error handling message: {e}")
-            await websocket.send(json.dumps({"error": str(e)}))
+            with contextlib.suppress(websockets.exceptions.ConnectionClosed):
+                await session.send({"request_id": request_id, "error": str(e)})
+        finally:
+            self.metrics.request_finished(metric_name, started, error, cancelled)
     
     async def handle_client(self, websocket: WebSocketServerProtocol, path: str = "/"):
         client_id = f"{websocket.remote_address[0]}:{websocket.remote_address[1]}"
         logger.info(f"Client connected: {client_id}")
+        session: Optional[ClientSession] = None
         
         try:
             auth_message = await websocket.recv()
@@ -218,24 +855,151 @@ class MCPServer:
                 await websocket.close()
                 return
             
+            session = self._resume_session(auth_data.get("session_id"), websocket, client_id)
+            resumed = session is not None
+            if not resumed:
+                session = ClientSession(
+                    client_id,
+                    websocket,
+                    settings.mcp.max_concurrent_requests,
+                    settings.mcp.session_buffer_size
+                )
+                session.on_sent = self._sent_counter(session)
+                self.sessions[session.session_id] = session
+            
+            session.codec = negotiate_codec(auth_data.get("encodings"), settings.mcp.wire_encodings)
+            session.compressor = Compressor(
+                negotiate_algorithm(auth_data.get("compression"), settings.mcp.compression_algorithms),
+                max_size=settings.mcp.max_message_size
+            )
             self.clients[client_id] = websocket
-            await websocket.send(json.dumps({"status": "authenticated"}))
+            await websocket.send(json.dumps({
+                "status": "authenticated",
+                "encoding": session.codec.name,
+                "compression": session.compressor.algorithm,
+                "session_id": session.session_id,
+                "resumed": resumed,
+                "known_requests": session.known_requests() if resumed else []
+            }))
+            if resumed:
+                logger.info(f"Resumed session {session.session_id} for {client_id}")
+                await session.flush_backlog()
             
             async for message in websocket:
-                await self.handle_message(websocket, message)
+                wire_size = len(message)
+                try:
+                    message = session.compressor.decompress_frame(message)
+                except (ProtocolError, zlib.error) as e:
+                    await session.send({"error": str(e)})
+                    continue
                 
+                if is_chunk_frame(message):
+                    self.metrics.record_in(client_id, "upload_chunk", wire_size)
+                    await self.handle_upload_chunk(session, message)
+                else:
+                    await self.dispatch_message(session, message, wire_size)
+        
         except websockets.exceptions.ConnectionClosed:
             logger.info(f"Client disconnected: {client_id}")
         except Exception as e:
             logger.error(f"Error with client {client_id}: {e}")
         finally:
-            if client_id in self.clients:
+            if session is not None and session.websocket is websocket:
+                session.detach(settings.mcp.session_grace_period, self._expire_session)
+            if self.clients.get(client_id) is websocket:
                 del self.clients[client_id]
     
+    def _sent_counter(self, session: ClientSession):
+        def record(size: int):
+            self.metrics.record_out(session.client_id, size)
+        return record
+    
+    def _resume_session(
+        self,
+        session_id: Optional[str],
+        websocket: WebSocketServerProtocol,
+        client_id: str
+    ) -> Optional[ClientSession]:
+        session = self.sessions.get(session_id) if session_id else None
+        if session is None or session.closed or not session.resumable:
+            return None
+        
+        previous = session.websocket
+        session.attach(websocket, client_id)
+        if previous is not None:
+            asyncio.create_task(previous.close())
+        return session
+    
+    def _expire_session(self, session: ClientSession):
+        if not session.detached:
+            return
+        session.cancel_all()
+        self.uploads.release_owner(session.session_id)
+        self.sessions.pop(session.session_id, None)
+        logger.debug(f"Expired session {session.session_id}")
+    
+    async def _sweep_uploads(self):
+        ttl = settings.mcp.upload_part_ttl
+        while True:
+            await asyncio.sleep(max(60.0, ttl / 4))
+            removed = self.uploads.sweep(ttl)
+            if removed:
+                logger.info(f"Removed {removed} abandoned partial uploads")
+    
     async def start(self):
         logger.info(f"Starting MCP Server on {self.host}:{self.port}")
-        async with websockets.serve(self.handle_client, self.host, self.port):
-            await asyncio.Future()
+        if self.file_index:
+            await self.file_index.start()
+        if self.document_index:
+            await self.document_index.start()
+        
+        sweeper = asyncio.create_task(self._sweep_uploads()) if settings.mcp.upload_part_ttl > 0 else None
+        metrics_server = None
+        if settings.mcp.metrics_port:
+            metrics_server = await serve_prometheus(
+                self._render_metrics,
+                settings.mcp.metrics_host,
+                settings.mcp.metrics_port
+            )
+        
+        try:
+            async with websockets.serve(
+                self.handle_client,
+                self.host,
+                self.port,
+                max_size=settings.mcp.max_message_size,
+                compression=None
+            ):
+                await asyncio.Future()
+        finally:
+            if sweeper:
+                sweeper.cancel()
+            if metrics_server:
+                metrics_server.close()
+                await metrics_server.wait_closed()
+            if self.file_index:
+                await self.file_index.stop()
+            if self.document_index:
+                await self.document_index.stop()
+            self.executor.shutdown()
+
+def _is_error(value: Any) -> bool:
+    return isinstance(value, dict) and "error" in value
+
+def _file_etag(stat: os.stat_result) -> str:
+    return f"{stat.st_mtime_ns:x}-{stat.st_size:x}"
+
+def _content_etag(value: Any) -> str:
+    encoded = json.dumps(value, sort_keys=True, default=str).encode()
+    return hashlib.blake2b(encoded, digest_size=16).hexdigest()
+
+def _signal_process_group(process: asyncio.subprocess.Process, signum: int):
+    if process.returncode is not None:
+        return
+    try:
+        os.killpg(process.pid, signum)
+    except ProcessLookupError:
+        pass
 
 async def main():
     server = MCPServer()
@@ -0,0 +1,227 @@
+import asyncio
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from ..core.config import settings
+from ..utils.logger import setup_logger
+
+logger = setup_logger("metrics", settings.log.level, settings.log.log_file)
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SESSION_TOOL = "_session"
+
+current_tool: ContextVar[str] = ContextVar("current_tool", default=SESSION_TOOL)
+
+
+class Histogram:
+    __slots__ = ("counts", "count", "total")
+    
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+    
+    def observe(self, value: float):
+        self.counts[bisect_left(LATENCY_BUCKETS, value)] += 1
+        self.count += 1
+        self.total += value
+    
+    def cumulative(self) -> List[Tuple[str, int]]:
+        running = 0
+        buckets = []
+        for bound, count in zip([*LATENCY_BUCKETS, float("inf")], self.counts):
+            running += count
+            buckets.append(("+Inf" if bound == float("inf") else repr(bound), running))
+        return buckets
+    
+    def quantile(self, q: float) -> Optional[float]:
+        if not self.count:
+            return None
+        target = q * self.count
+        running = 0
+        for index, count in enumerate(self.counts):
+            running += count
+            if running >= target:
+                return LATENCY_BUCKETS[index] if index < len(LATENCY_BUCKETS) else float("inf")
+        return None
+
+
+class ToolMetrics:
+    __slots__ = ("requests", "errors", "cancelled", "in_flight", "bytes_in", "bytes_out", "latency")
+    
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.cancelled = 0
+        self.in_flight = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.latency = Histogram()
+    
+    def to_dict(self) -> Dict[str, Any]:
+        latency = self.latency
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "cancelled": self.cancelled,
+            "in_flight": self.in_flight,
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "latency_ms": {
+                "count": latency.count,
+                "avg": round(latency.total / latency.count * 1000, 3) if latency.count else None,
+                "p50": _ms(latency.quantile(0.5)),
+                "p95": _ms(latency.quantile(0.95)),
+                "p99": _ms(latency.quantile(0.99))
+            }
+        }
+
+
+class ClientMetrics:
+    __slots__ = ("requests", "bytes_in", "bytes_out")
+    
+    def __init__(self):
+        self.requests = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+    
+    def to_dict(self) -> Dict[str, int]:
+        return {"requests": self.requests, "bytes_in": self.bytes_in, "bytes_out": self.bytes_out}
+
+
+def _ms(seconds: Optional[float]) -> Optional[float]:
+    if seconds is None:
+        return None
+    return seconds * 1000 if seconds != float("inf") else seconds
+
+
+def client_host(client_id: str) -> str:
+    return client_id.rsplit(":", 1)[0]
+
+
+class ServerMetrics:
+    def __init__(self):
+        self.started = time.time()
+        self.tools: Dict[str, ToolMetrics] = {}
+        self.clients: Dict[str, ClientMetrics] = {}
+    
+    def _tool(self, tool: str) -> ToolMetrics:
+        metrics = self.tools.get(tool)
+        if metrics is None:
+            metrics = self.tools[tool] = ToolMetrics()
+        return metrics
+    
+    def _client(self, client_id: str) -> ClientMetrics:
+        host = client_host(client_id)
+        metrics = self.clients.get(host)
+        if metrics is None:
+            metrics = self.clients[host] = ClientMetrics()
+        return metrics
+    
+    def request_started(self, tool: str, client_id: Optional[str] = None) -> float:
+        metrics = self._tool(tool)
+        metrics.requests += 1
+        metrics.in_flight += 1
+        if client_id is not None:
+            self._client(client_id).requests += 1
+        current_tool.set(tool)
+        return time.perf_counter()
+    
+    def request_finished(self, tool: str, started: float, error: bool = False, cancelled: bool = False):
+        metrics = self._tool(tool)
+        metrics.in_flight -= 1
+        metrics.latency.observe(time.perf_counter() - started)
+        if cancelled:
+            metrics.cancelled += 1
+        elif error:
+            metrics.errors += 1
+    
+    def record_in(self, client_id: str, tool: str, size: int):
+        self._tool(tool).bytes_in += size
+        self._client(client_id).bytes_in += size
+    
+    def record_out(self, client_id: str, size: int):
+        self._tool(current_tool.get()).bytes_out += size
+        self._client(client_id).bytes_out += size
+    
+    def snapshot(self, connected_clients: int, sessions: int) -> Dict[str, Any]:
+        return {
+            "uptime": round(time.time() - self.started, 3),
+            "connected_clients": connected_clients,
+            "sessions": sessions,
+            "tools": {tool: metrics.to_dict() for tool, metrics in self.tools.items()},
+            "clients": {host: metrics.to_dict() for host, metrics in self.clients.items()}
+        }
+    
+    def render_prometheus(self, connected_clients: int, sessions: int) -> str:
+        lines = [
+            "# TYPE mcp_connected_clients gauge",
+            f"mcp_connected_clients {connected_clients}",
+            "# TYPE mcp_sessions gauge",
+            f"mcp_sessions {sessions}",
+            "# TYPE mcp_uptime_seconds gauge",
+            f"mcp_uptime_seconds {time.time() - self.started:.3f}"
+        ]
+        
+        counters = (
+            ("mcp_tool_requests_total", "counter", "requests"),
+            ("mcp_tool_errors_total", "counter", "errors"),
+            ("mcp_tool_cancelled_total", "counter", "cancelled"),
+            ("mcp_tool_in_flight", "gauge", "in_flight"),
+            ("mcp_tool_bytes_in_total", "counter", "bytes_in"),
+            ("mcp_tool_bytes_out_total", "counter", "bytes_out")
+        )
+        for name, kind, field in counters:
+            lines.append(f"# TYPE {name} {kind}")
+            for tool, metrics in self.tools.items():
+                lines.append(f'{name}{{tool="{tool}"}} {getattr(metrics, field)}')
+        
+        lines.append("# TYPE mcp_tool_latency_seconds histogram")
+        for tool, metrics in self.tools.items():
+            for bound, count in metrics.latency.cumulative():
+                lines.append(f'mcp_tool_latency_seconds_bucket{{tool="{tool}",le="{bound}"}} {count}')
+            lines.append(f'mcp_tool_latency_seconds_sum{{tool="{tool}"}} {metrics.latency.total:.6f}')
+            lines.append(f'mcp_tool_latency_seconds_count{{tool="{tool}"}} {metrics.latency.count}')
+        
+        for name, field in (
+            ("mcp_client_requests_total", "requests"),
+            ("mcp_client_bytes_in_total", "bytes_in"),
+            ("mcp_client_bytes_out_total", "bytes_out")
+        ):
+            lines.append(f"# TYPE {name} counter")
+            for host, metrics in self.clients.items():
+                lines.append(f'{name}{{client="{host}"}} {getattr(metrics, field)}')
+        
+        return "\n".join(lines) + "\n"
+
+
+async def serve_prometheus(render: Callable[[], str], host: str, port: int) -> asyncio.AbstractServer:
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), timeout=5)
+            while (await asyncio.wait_for(reader.readline(), timeout=5)).strip():
+                pass
+            
+            parts = request_line.decode("latin-1").split()
+            if len(parts) >= 2 and parts[0] == "GET" and parts[1].split("?")[0] in ("/", "/metrics"):
+                status, body = "200 OK", render().encode()
+            else:
+                status, body = "404 Not Found", b"not found\n"
+            
+            writer.write(
+                f"HTTP/1.1 {status}\r\n"
+                f"Content-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: close\r\n\r\n".encode() + body
+            )
+            await writer.drain()
+        except (asyncio.TimeoutError, ConnectionError) as e:
+            logger.debug(f"Metrics request failed: {e}")
+        finally:
+            writer.close()
+    
+    server = await asyncio.start_server(handle, host, port)
+    logger.info(f"Prometheus metrics on http://{host}:{port}/metrics")
+    return server
@@ -0,0 +1,178 @@
+import asyncio
+import uuid
+from collections import deque
+from contextvars import ContextVar
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+import websockets
+from websockets.server import WebSocketServerProtocol
+
+from ..core.compression import Compressor
+from ..core.protocol import DEFAULT_CODEC, Buffer, encode_fragments, pack_chunk
+from .listing import CursorStore
+
+current_session: ContextVar["ClientSession"] = ContextVar("current_session")
+
+
+class ClientSession:
+    def __init__(
+        self,
+        client_id: str,
+        websocket: WebSocketServerProtocol,
+        max_concurrent_requests: int,
+        buffer_size: int = 0
+    ):
+        self.session_id = uuid.uuid4().hex
+        self.client_id = client_id
+        self.websocket: Optional[WebSocketServerProtocol] = websocket
+        self.semaphore = asyncio.Semaphore(max_concurrent_requests)
+        self.tasks: Dict[str, asyncio.Task] = {}
+        self.streams: Dict[str, "ResponseStream"] = {}
+        self.processes: Dict[str, asyncio.subprocess.Process] = {}
+        self.cursors = CursorStore()
+        self.codec = DEFAULT_CODEC
+        self.compressor = Compressor()
+        self.closed = False
+        self.buffer_size = buffer_size
+        self.backlog: Deque[Tuple[Union[str, bytes], Optional[str]]] = deque()
+        self.backlog_bytes = 0
+        self.resumable = buffer_size > 0
+        self.expiry: Optional[asyncio.TimerHandle] = None
+        self.on_sent: Optional[Callable[[int], None]] = None
+        self._anonymous_tasks = 0
+    
+    @property
+    def detached(self) -> bool:
+        return self.websocket is None
+    
+    async def send(self, payload: Dict[str, Any]):
+        if self.closed:
+            return
+        if self.websocket is None or self.backlog:
+            self._buffer(self.codec.encode(payload), payload.get("request_id"))
+            return
+        
+        frames = encode_fragments(self.codec, payload)
+        try:
+            if isinstance(frames, (str, bytes)):
+                frame = self.compressor.compress_frame(frames)
+                await self.websocket.send(frame)
+                self._sent(len(frame))
+            else:
+                await self.websocket.send(self._counted(self.compressor.compress_fragments(frames)))
+        except websockets.exceptions.ConnectionClosed:
+            if not self.resumable:
+                raise
+            self._buffer(self.codec.encode(payload), payload.get("request_id"))
+    
+    async def send_binary(self, frame: bytes):
+        if self.closed:
+            return
+        if self.websocket is None or self.backlog:
+            self._buffer(bytes(frame), None)
+            return
+        
+        try:
+            compressed = self.compressor.compress_frame(frame)
+            await self.websocket.send(compressed)
+            self._sent(len(compressed))
+        except websockets.exceptions.ConnectionClosed:
+            if not self.resumable:
+                raise
+            self._buffer(bytes(frame), None)
+    
+    def _sent(self, size: int):
+        if self.on_sent is not None:
+            self.on_sent(size)
+    
+    def _counted(self, fragments: Iterable[Union[str, bytes]]) -> Iterator[Union[str, bytes]]:
+        for fragment in fragments:
+            self._sent(len(fragment))
+            yield fragment
+    
+    def _buffer(self, frame: Union[str, bytes], request_id: Optional[str]):
+        if not self.resumable:
+            raise websockets.exceptions.ConnectionClosed(None, None)
+        
+        self.backlog.append((frame, request_id))
+        self.backlog_bytes += len(frame)
+        if self.backlog_bytes > self.buffer_size:
+            self.resumable = False
+            self.backlog.clear()
+            self.backlog_bytes = 0
+            self.cancel_all()
+    
+    def known_requests(self) -> List[str]:
+        pending = [key for key in self.tasks if not key.startswith("_anonymous_")]
+        return pending + [request_id for _, request_id in self.backlog if request_id]
+    
+    def detach(self, grace_period: float, on_expire):
+        self.websocket = None
+        if not self.resumable or grace_period <= 0:
+            on_expire(self)
+            return
+        self.expiry = asyncio.get_running_loop().call_later(grace_period, on_expire, self)
+    
+    def attach(self, websocket: WebSocketServerProtocol, client_id: str):
+        if self.expiry:
+            self.expiry.cancel()
+            self.expiry = None
+        self.websocket = websocket
+        self.client_id = client_id
+    
+    async def flush_backlog(self):
+        while self.backlog and self.websocket is not None:
+            frame, _ = self.backlog[0]
+            compressed = self.compressor.compress_frame(frame)
+            await self.websocket.send(compressed)
+            self._sent(len(compressed))
+            self.backlog.popleft()
+            self.backlog_bytes -= len(frame)
+    
+    def track(self, request_id: Optional[str], task: asyncio.Task):
+        if request_id is None or request_id in self.tasks:
+            self._anonymous_tasks += 1
+            key = f"_anonymous_{self._anonymous_tasks}"
+        else:
+            key = request_id
+        
+        self.tasks[key] = task
+        task.add_done_callback(lambda _: self.tasks.pop(key, None))
+    
+    def cancel(self, request_id: Optional[str]) -> bool:
+        task = self.tasks.get(request_id) if request_id is not None else None
+        if task is None or task.done():
+            return False
+        task.cancel()
+        return True
+    
+    def cancel_all(self):
+        self.closed = True
+        for task in list(self.tasks.values()):
+            task.cancel()
+
+
+class ResponseStream:
+    def __init__(self, session: ClientSession, request_id: str, window: Optional[int] = None):
+        self.session = session
+        self.request_id = request_id
+        self.bytes_sent = 0
+        self.credit = window
+        self._credited = asyncio.Event()
+    
+    def grant(self, nbytes: int):
+        if self.credit is not None:
+            self.credit += nbytes
+            self._credited.set()
+    
+    async def send_event(self, event: Dict[str, Any]):
+        await self.session.send({"request_id": self.request_id, "event": event})
+    
+    async def send_chunk(self, offset: int, data: Buffer):
+        while self.credit is not None and self.credit <= 0:
+            self._credited.clear()
+            await self._credited.wait()
+        
+        await self.session.send_binary(pack_chunk(self.request_id, offset, data))
+        self.bytes_sent += len(data)
+        if self.credit is not None:
+            self.credit -= len(data)
@@ -0,0 +1,155 @@
+import hashlib
+import os
+import re
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+UPLOAD_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+
+class UploadError(Exception):
+    pass
+
+
+class UploadSession:
+    def __init__(self, upload_id: str, target_path: Path, owner: str):
+        self.upload_id = upload_id
+        self.target_path = target_path
+        self.part_path = target_path.parent / f".{target_path.name}.{upload_id}.part"
+        self.owner = owner
+        self.fd = os.open(self.part_path, os.O_WRONLY | os.O_CREAT, 0o644)
+        self.offset = os.fstat(self.fd).st_size
+        self.error: Optional[str] = None
+        self.last_active = time.monotonic()
+    
+    def write(self, offset: int, data: memoryview) -> int:
+        if self.error:
+            raise UploadError(self.error)
+        
+        self.last_active = time.monotonic()
+        end = offset + len(data)
+        if offset > self.offset:
+            self.error = f"Gap in upload {self.upload_id}: expected offset {self.offset}, got {offset}"
+            raise UploadError(self.error)
+        
+        if end > self.offset:
+            skip = self.offset - offset
+            os.pwrite(self.fd, data[skip:], self.offset)
+            self.offset = end
+        
+        return self.offset
+    
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+
+class UploadManager:
+    def __init__(self):
+        self.uploads: Dict[str, UploadSession] = {}
+        self.abandoned: Dict[Path, float] = {}
+    
+    def open(self, path: str, owner: str, upload_id: Optional[str] = None) -> UploadSession:
+        upload_id = upload_id or uuid.uuid4().hex
+        if not UPLOAD_ID_PATTERN.match(upload_id):
+            raise UploadError(f"Invalid upload id: {upload_id}")
+        
+        target_path = Path(path).expanduser()
+        existing = self.uploads.get(upload_id)
+        if existing:
+            if existing.target_path != target_path:
+                raise UploadError(f"Upload {upload_id} belongs to {existing.target_path}")
+            if existing.error is None:
+                existing.owner = owner
+                return existing
+            existing.close()
+        
+        target_path.parent.mkdir(parents=True, exist_ok=True)
+        upload = UploadSession(upload_id, target_path, owner)
+        self.uploads[upload_id] = upload
+        self.abandoned.pop(upload.part_path, None)
+        return upload
+    
+    def get(self, upload_id: str) -> UploadSession:
+        upload = self.uploads.get(upload_id)
+        if upload is None:
+            raise UploadError(f"Unknown upload: {upload_id}")
+        return upload
+    
+    def commit(
+        self,
+        upload_id: str,
+        size: Optional[int] = None,
+        sha256: Optional[str] = None,
+        mtime_ns: Optional[int] = None
+    ) -> Dict[str, Any]:
+        upload = self.get(upload_id)
+        if upload.error:
+            raise UploadError(upload.error)
+        if size is not None and upload.offset != size:
+            raise UploadError(f"Upload {upload_id} incomplete: {upload.offset} of {size} bytes received")
+        
+        os.fsync(upload.fd)
+        upload.close()
+        
+        if sha256 is not None:
+            digest = hashlib.sha256()
+            with open(upload.part_path, "rb") as f:
+                for block in iter(lambda: f.read(1024 * 1024), b""):
+                    digest.update(block)
+            if digest.hexdigest() != sha256:
+                self.abort(upload_id)
+                raise UploadError(f"Checksum mismatch for upload {upload_id}")
+        
+        if mtime_ns is not None:
+            os.utime(upload.part_path, ns=(mtime_ns, mtime_ns))
+        os.replace(upload.part_path, upload.target_path)
+        _fsync_directory(upload.target_path.parent)
+        del self.uploads[upload_id]
+        
+        return {
+            "path": str(upload.target_path),
+            "size": upload.offset,
+            "success": True
+        }
+    
+    def abort(self, upload_id: str) -> bool:
+        upload = self.uploads.pop(upload_id, None)
+        if upload is None:
+            return False
+        upload.close()
+        upload.part_path.unlink(missing_ok=True)
+        return True
+    
+    def release_owner(self, owner: str):
+        for upload_id, upload in list(self.uploads.items()):
+            if upload.owner == owner:
+                upload.close()
+                del self.uploads[upload_id]
+                self.abandoned[upload.part_path] = time.monotonic()
+    
+    def sweep(self, ttl: float) -> int:
+        deadline = time.monotonic() - ttl
+        removed = 0
+        for upload_id, upload in list(self.uploads.items()):
+            if upload.last_active < deadline and self.abort(upload_id):
+                removed += 1
+        for part_path, released in list(self.abandoned.items()):
+            if released < deadline:
+                del self.abandoned[part_path]
+                part_path.unlink(missing_ok=True)
+                removed += 1
+        return removed
+
+
+def _fsync_directory(path: Path):
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
@@ -0,0 +1,176 @@
+import hashlib
+import math
+import mmap
+import os
+import struct
+import uuid
+import zlib
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+MIN_BLOCK_SIZE = 2048
+MAX_BLOCK_SIZE = 128 * 1024
+STRONG_HASH_SIZE = 16
+ADLER_MOD = 65521
+READ_SIZE = 1024 * 1024
+
+DeltaOp = Union[List[int], bytes]
+
+
+class DeltaError(Exception):
+    pass
+
+
+def choose_block_size(size: int) -> int:
+    block_size = 1 << max(0, int(math.sqrt(size)) - 1).bit_length()
+    return max(MIN_BLOCK_SIZE, min(MAX_BLOCK_SIZE, block_size))
+
+
+def strong_hash(data: bytes) -> bytes:
+    return hashlib.blake2b(data, digest_size=STRONG_HASH_SIZE).digest()
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(READ_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def file_signatures(path: Path, block_size: Optional[int] = None) -> Dict[str, Any]:
+    size = path.stat().st_size
+    block_size = block_size or choose_block_size(size)
+    weak: List[int] = []
+    strong = bytearray()
+    digest = hashlib.sha256()
+    
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            weak.append(zlib.adler32(block))
+            strong += strong_hash(block)
+            digest.update(block)
+    
+    return {
+        "size": size,
+        "block_size": block_size,
+        "weak": struct.pack(f"<{len(weak)}I", *weak),
+        "strong": bytes(strong),
+        "sha256": digest.hexdigest()
+    }
+
+
+def compute_delta(path: Path, signatures: Dict[str, Any]) -> Tuple[List[DeltaOp], int, str]:
+    block_size = signatures["block_size"]
+    weak = struct.unpack(f"<{len(signatures['weak']) // 4}I", signatures["weak"])
+    strong = signatures["strong"]
+    
+    table: Dict[int, List[int]] = {}
+    for index, checksum in enumerate(weak):
+        table.setdefault(checksum, []).append(index)
+    
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return [], 0, hashlib.sha256().hexdigest()
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            ops, literal_bytes = _scan(data, block_size, table, strong)
+            return ops, literal_bytes, hashlib.sha256(data).hexdigest()
+
+
+def _scan(data: mmap.mmap, block_size: int, table: Dict[int, List[int]], strong: bytes) -> Tuple[List[DeltaOp], int]:
+    ops: List[DeltaOp] = []
+    literal_bytes = 0
+    literal_start = 0
+    position = 0
+    end = len(data)
+    checksum: Optional[int] = None
+    
+    def match(window_end: int, value: int) -> Optional[int]:
+        candidates = table.get(value)
+        if not candidates:
+            return None
+        block_hash = strong_hash(data[position:window_end])
+        for index in candidates:
+            if strong[index * STRONG_HASH_SIZE:(index + 1) * STRONG_HASH_SIZE] == block_hash:
+                return index
+        return None
+    
+    while position < end:
+        window_end = min(position + block_size, end)
+        if checksum is None:
+            checksum = zlib.adler32(data[position:window_end])
+        
+        index = match(window_end, checksum)
+        if index is not None:
+            if literal_start < position:
+                ops.append(data[literal_start:position])
+                literal_bytes += position - literal_start
+            if ops and isinstance(ops[-1], list) and ops[-1][0] + ops[-1][1] == index:
+                ops[-1][1] += 1
+            else:
+                ops.append([index, 1])
+            position = window_end
+            literal_start = position
+            checksum = None
+            continue
+        
+        if window_end - position < block_size or window_end >= end:
+            position = end
+            break
+        
+        outgoing = data[position]
+        incoming = data[window_end]
+        a = checksum & 0xFFFF
+        b = checksum >> 16
+        a = (a - outgoing + incoming) % ADLER_MOD
+        b = (b - block_size * outgoing + a - 1) % ADLER_MOD
+        checksum = (b << 16) | a
+        position += 1
+    
+    if literal_start < end:
+        ops.append(data[literal_start:end])
+        literal_bytes += end - literal_start
+    
+    return ops, literal_bytes
+
+
+def apply_delta(basis_path: Optional[Path], ops: List[DeltaOp], block_size: int, target_path: Path,
+                sha256: Optional[str] = None, mtime_ns: Optional[int] = None) -> int:
+    temp_path = target_path.parent / f".{target_path.name}.{uuid.uuid4().hex}.delta"
+    digest = hashlib.sha256()
+    written = 0
+    
+    try:
+        with open(temp_path, "wb") as out:
+            basis = open(basis_path, "rb") if basis_path is not None else None
+            try:
+                for op in ops:
+                    if isinstance(op, (bytes, bytearray)):
+                        chunk = bytes(op)
+                    else:
+                        if basis is None:
+                            raise DeltaError("Delta references blocks but no basis file exists")
+                        start, count = op
+                        basis.seek(start * block_size)
+                        chunk = basis.read(count * block_size)
+                    out.write(chunk)
+                    digest.update(chunk)
+                    written += len(chunk)
+            finally:
+                if basis is not None:
+                    basis.close()
+            out.flush()
+            os.fsync(out.fileno())
+        
+        if sha256 is not None and digest.hexdigest() != sha256:
+            raise DeltaError(f"Checksum mismatch after applying delta to {target_path}")
+        
+        if basis_path is not None and basis_path.exists():
+            os.chmod(temp_path, basis_path.stat().st_mode & 0o7777)
+        if mtime_ns is not None:
+            os.utime(temp_path, ns=(mtime_ns, mtime_ns))
+        os.replace(temp_path, target_path)
+    finally:
+        temp_path.unlink(missing_ok=True)
+    
+    return written
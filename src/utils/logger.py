@@ -1,51 +1,165 @@
+import atexit
+import json
 import logging
+import queue
+import random
 import sys
+import time
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, Optional, Tuple
 from rich.logging import RichHandler
 from rich.console import Console
 
+from ..core.config import settings
+
 console = Console()
 
-def setup_logger(
-    name: str,
-    log_level: str = "INFO",
-    log_file: Optional[str] = None
-) -> logging.Logger:
-    logger = logging.getLogger(name)
-    logger.setLevel(getattr(logging, log_level.upper()))
-    
-    if logger.handlers:
-        return logger
+STRUCTURED_FIELDS = ("request_id", "tool", "client_id", "session_id", "duration_ms", "suppressed")
+
+_listeners: Dict[Tuple[str, Optional[str], bool], Tuple[QueueHandler, QueueListener]] = {}
+
+
+class JsonLinesFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": round(record.created, 6),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage()
+        }
+        for field in STRUCTURED_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class RequestLogFilter(logging.Filter):
+    def __init__(self, rate: float, sample: float):
+        super().__init__()
+        self.rate = rate
+        self.sample = sample
+        self.tokens = rate
+        self.updated = time.monotonic()
+        self.suppressed = 0
     
-    logger.handlers.clear()
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.INFO or getattr(record, "request_id", None) is None:
+            return True
+        
+        if self.sample < 1.0 and random.random() >= self.sample:
+            self.suppressed += 1
+            return False
+        
+        if self.rate > 0:
+            now = time.monotonic()
+            self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens < 1:
+                self.suppressed += 1
+                return False
+            self.tokens -= 1
+        
+        if self.suppressed:
+            record.suppressed = self.suppressed
+            self.suppressed = 0
+        return True
+
+
+class LocalQueueHandler(QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+def _build_handlers(log_level: str, log_file: Optional[str], json_format: bool) -> List[logging.Handler]:
+    level = getattr(logging, log_level.upper())
     
     rich_handler = RichHandler(
         console=console,
         rich_tracebacks=True,
-        tracebacks_show_locals=True,
+        tracebacks_show_locals=settings.log.traceback_locals,
         markup=True
     )
-    rich_handler.setLevel(getattr(logging, log_level.upper()))
+    rich_handler.setLevel(level)
     
     formatter = logging.Formatter(
         "%(message)s",
         datefmt="[%X]"
     )
     rich_handler.setFormatter(formatter)
-    logger.addHandler(rich_handler)
+    handlers: List[logging.Handler] = [rich_handler]
     
     if log_file:
         log_path = Path(log_file)
         log_path.parent.mkdir(parents=True, exist_ok=True)
         
         file_handler = logging.FileHandler(log_file)
-        file_handler.setLevel(getattr(logging, log_level.upper()))
+        file_handler.setLevel(level)
         
-        file_formatter = logging.Formatter(
-            "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-        )
+        if json_format:
+            file_formatter = JsonLinesFormatter()
+        else:
+            file_formatter = logging.Formatter(
+                "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+            )
         file_handler.setFormatter(file_formatter)
-        logger.addHandler(file_handler)
+        handlers.append(file_handler)
+    
+    return handlers
+
+
+def _queue_handler(log_level: str, log_file: Optional[str], json_format: bool) -> QueueHandler:
+    key = (log_level.upper(), log_file, json_format)
+    if key not in _listeners:
+        records = queue.SimpleQueue()
+        listener = QueueListener(
+            records,
+            *_build_handlers(log_level, log_file, json_format),
+            respect_handler_level=True
+        )
+        listener.start()
+        _listeners[key] = (LocalQueueHandler(records), listener)
+    return _listeners[key][0]
+
+
+def stop_logging():
+    for _, listener in _listeners.values():
+        listener.stop()
+    _listeners.clear()
+
+
+atexit.register(stop_logging)
+
+
+def setup_logger(
+    name: str,
+    log_level: str = "INFO",
+    log_file: Optional[str] = None,
+    use_queue: Optional[bool] = None,
+    json_format: Optional[bool] = None
+) -> logging.Logger:
+    logger = logging.getLogger(name)
+    logger.setLevel(getattr(logging, log_level.upper()))
+    
+    if logger.handlers:
+        return logger
+    
+    logger.handlers.clear()
+    use_queue = settings.log.queue if use_queue is None else use_queue
+    json_format = settings.log.format == "json" if json_format is None else json_format
+    
+    if use_queue:
+        logger.addHandler(_queue_handler(log_level, log_file, json_format))
+    else:
+        for handler in _build_handlers(log_level, log_file, json_format):
+            logger.addHandler(handler)
+    
+    if settings.log.request_rate > 0 or settings.log.request_sample < 1.0:
+        logger.addFilter(RequestLogFilter(settings.log.request_rate, settings.log.request_sample))
     
     return logger
@@ -0,0 +1,50 @@
+import fnmatch
+import os
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .delta import file_sha256
+
+
+def matches_any(rel_path: str, patterns: List[str]) -> bool:
+    name = rel_path.rsplit("/", 1)[-1]
+    return any(fnmatch.fnmatch(rel_path, pattern) or fnmatch.fnmatch(name, pattern) for pattern in patterns)
+
+
+def scan_manifest(
+    root: Path,
+    include: Optional[List[str]] = None,
+    exclude: Optional[List[str]] = None,
+    checksum: bool = False
+) -> Dict[str, List]:
+    entries: Dict[str, List] = {}
+    if not root.is_dir():
+        return entries
+    
+    exclude = exclude or []
+    stack = [(str(root), "")]
+    while stack:
+        directory, prefix = stack.pop()
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    rel_path = f"{prefix}{entry.name}"
+                    if exclude and matches_any(rel_path, exclude):
+                        continue
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append((entry.path, f"{rel_path}/"))
+                        elif entry.is_file(follow_symlinks=False):
+                            if include and not matches_any(rel_path, include):
+                                continue
+                            stat = entry.stat(follow_symlinks=False)
+                            record = [stat.st_size, stat.st_mtime_ns]
+                            if checksum:
+                                record.append(file_sha256(Path(entry.path)))
+                            entries[rel_path] = record
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+    
+    return entries
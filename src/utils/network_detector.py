@@ -1,22 +1,47 @@
 import socket
-import subprocess
 import ipaddress
-from typing import Optional, Tuple
+import time
+from typing import Dict, List, Optional, Tuple
 import asyncio
 from dataclasses import dataclass
 
+PATH_RACE_DELAY = 0.1
+TAILSCALE_NETWORK = ipaddress.ip_network("100.64.0.0/10")
+
 @dataclass
 class NetworkStatus:
     is_local_network: bool
     local_ip: Optional[str]
     can_reach_ubuntu: bool
     connection_type: str
+    server_address: Optional[str] = None
+    rtt_ms: Optional[float] = None
+
+@dataclass
+class NetworkPath:
+    host: str
+    address: str
+    rtt_ms: float
+    connection_type: str
+
+_path_cache: Dict[Tuple[Tuple[str, ...], int], Tuple[NetworkPath, float]] = {}
 
 class NetworkDetector:
-    def __init__(self, local_subnet: str, ubuntu_ip: str, timeout: int = 5):
+    def __init__(
+        self,
+        local_subnet: str,
+        ubuntu_ip: str,
+        timeout: int = 5,
+        port: int = 8765,
+        candidates: Optional[List[str]] = None,
+        cache_ttl: float = 30.0
+    ):
         self.local_subnet = ipaddress.ip_network(local_subnet)
         self.ubuntu_ip = ubuntu_ip
         self.timeout = timeout
+        self.port = port
+        self.candidates = list(dict.fromkeys(host for host in [ubuntu_ip, *(candidates or [])] if host))
+        self.cache_ttl = cache_ttl
     
     def get_local_ip(self) -> Optional[str]:
         try:
@@ -59,39 +84,101 @@ class NetworkDetector:
         except Exception:
             return False
     
-    async def detect_network_status(self) -> NetworkStatus:
+    def classify_address(self, address: str) -> str:
+        try:
+            ip = ipaddress.ip_address(address)
+        except ValueError:
+            return "vpn"
+        if ip in TAILSCALE_NETWORK:
+            return "vpn"
+        if ip.is_loopback or ip in self.local_subnet:
+            return "local"
+        return "vpn"
+    
+    async def _probe(self, host: str) -> NetworkPath:
+        started = time.perf_counter()
+        reader, writer = await asyncio.open_connection(host, self.port)
+        rtt_ms = (time.perf_counter() - started) * 1000
+        address = writer.get_extra_info("peername")[0]
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except Exception:
+            pass
+        return NetworkPath(host, address, round(rtt_ms, 2), self.classify_address(address))
+    
+    async def _race(self) -> Optional[NetworkPath]:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.timeout
+        queue = list(self.candidates)
+        pending = set()
+        
+        try:
+            while queue or pending:
+                if queue:
+                    pending.add(asyncio.create_task(self._probe(queue.pop(0))))
+                
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    return None
+                
+                done, pending = await asyncio.wait(
+                    pending,
+                    timeout=min(PATH_RACE_DELAY, remaining) if queue else remaining,
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+                winners = [task.result() for task in done if not task.exception()]
+                if winners:
+                    return min(winners, key=lambda path: path.rtt_ms)
+            return None
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+    
+    async def select_path(self, refresh: bool = False) -> Optional[NetworkPath]:
+        key = (tuple(self.candidates), self.port)
+        cached = _path_cache.get(key)
+        if cached and not refresh and cached[1] > time.monotonic():
+            return cached[0]
+        
+        path = await self._race()
+        if path:
+            _path_cache[key] = (path, time.monotonic() + self.cache_ttl)
+        else:
+            _path_cache.pop(key, None)
+        return path
+    
+    def invalidate(self):
+        _path_cache.pop((tuple(self.candidates), self.port), None)
+    
+    async def detect_network_status(self, refresh: bool = False) -> NetworkStatus:
         local_ip = self.get_local_ip()
         is_local = False
         
         if local_ip:
             is_local = self.is_in_local_network(local_ip)
         
-        can_reach = await self.ping_host(self.ubuntu_ip)
-        
-        if is_local and can_reach:
-            connection_type = "local"
-        elif can_reach:
-            connection_type = "vpn"
-        else:
-            connection_type = "disconnected"
+        path = await self.select_path(refresh)
         
         return NetworkStatus(
             is_local_network=is_local,
             local_ip=local_ip,
-            can_reach_ubuntu=can_reach,
-            connection_type=connection_type
+            can_reach_ubuntu=path is not None,
+            connection_type=path.connection_type if path else "disconnected",
+            server_address=path.address if path else None,
+            rtt_ms=path.rtt_ms if path else None
         )
     
-    def is_tailscale_active(self) -> bool:
+    async def is_tailscale_active(self) -> bool:
         try:
-            result = subprocess.run(
-                ['tailscale', 'status'],
-                capture_output=True,
-                text=True,
-                timeout=5
+            process = await asyncio.create_subprocess_exec(
+                'tailscale', 'status',
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.DEVNULL
             )
-            return result.returncode == 0
-        except Exception:
+            return await asyncio.wait_for(process.wait(), timeout=5) == 0
+        except (asyncio.TimeoutError, Exception):
             return False
     
     async def ensure_connection(self) -> Tuple[bool, str]:
@@ -100,10 +187,9 @@ class NetworkDetector:
         if status.can_reach_ubuntu:
             return True, status.connection_type
         
-        if self.is_tailscale_active():
-            await asyncio.sleep(2)
-            status = await self.detect_network_status()
+        if await self.is_tailscale_active():
+            status = await self.detect_network_status(refresh=True)
             if status.can_reach_ubuntu:
-                return True, "vpn"
+                return True, status.connection_type
         
         return False, "failed"
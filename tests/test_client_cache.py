@@ -0,0 +1,21 @@
+from src.client.cache import ResponseCache
+
+
+def test_cache_round_trips_through_json(tmp_path):
+    path = tmp_path / "client_cache.json"
+    cache = ResponseCache(1024, str(path))
+    cache.put("read_file:a", "etag-a", {"content": "text", "raw": b"\x00\xff"})
+    cache.save()
+    
+    loaded = ResponseCache(1024, str(path))
+    loaded.load()
+    assert loaded.get("read_file:a") == ("etag-a", {"content": "text", "raw": b"\x00\xff"})
+
+
+def test_corrupt_cache_file_is_ignored(tmp_path):
+    path = tmp_path / "client_cache.json"
+    path.write_text('{"version": 2, "entries": {"read_file:a": ["etag-a"]}}')
+    
+    cache = ResponseCache(1024, str(path))
+    cache.load()
+    assert cache.stats()["entries"] == 0
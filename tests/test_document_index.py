@@ -0,0 +1,15 @@
+from src.server.document_index import TrigramIndex, required_literals
+
+
+def test_required_literals_skips_counted_quantifier_body():
+    assert required_literals("x{10,200}") == []
+    assert required_literals("abcx{10}def") == ["abc", "def"]
+
+
+def test_regex_search_with_counted_quantifier(tmp_path):
+    (tmp_path / "notes.txt").write_text("before xxxxxxxxxxxxxxx after\n")
+    index = TrigramIndex([str(tmp_path)], str(tmp_path / "index.sqlite"), [".txt"])
+    index.refresh()
+    
+    assert [hit["path"] for hit in index.search("x{10,20}", regex=True)] == [str(tmp_path / "notes.txt")]
+    assert index.search("x{30,40}", regex=True) == []